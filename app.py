@@ -14,28 +14,77 @@ It provides a professional PyQt5 interface with advanced features including:
 
 Usage:
     python app.py
+    python app.py --trace-startup startup.json   # phase timings as JSON
+    python app.py --check-startup                # fail if startup regressed
 
 Author: Hi Tech Versions Team
 """
 
+import argparse
 import sys
+import tempfile
 
-# type: ignore  # pylint: disable=no-name-in-module
-from PyQt5.QtWidgets import QApplication
+from app_dir_creator import set_app_folder
+from startup_trace import load_budgets, trace
 
-# Import the main YouTubeDownloader class from the renamed module
-from main_window import YouTubeDownloader
 
+def parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """Split the launcher's own options from the ones Qt handles."""
+    parser = argparse.ArgumentParser(description="YouTube Downloader")
+    parser.add_argument(
+        "--trace-startup", metavar="FILE",
+        help="write the startup phase timings to a JSON file")
+    parser.add_argument(
+        "--check-startup", nargs="?", const="", metavar="BUDGETS",
+        help="quit once started, without touching the user's data; exit "
+        "with 1 if a phase exceeded its budget (optional JSON file of "
+        "per-phase seconds)")
+    return parser.parse_known_args(argv[1:])
 
-def main():
+
+def main():  # pylint: disable=import-outside-toplevel
     """Main entry point for the application."""
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(True)
+    args, qt_args = parse_args(sys.argv)
+    checking = args.check_startup is not None
+    if checking:
+        # Start on an empty app folder, so the check neither reads nor
+        # migrates the user's history, queue and caches
+        state_dir = tempfile.TemporaryDirectory(  # pylint: disable=consider-using-with
+            prefix="startup-check-", ignore_cleanup_errors=True)
+        set_app_folder(state_dir.name)
+
+    # Heavy modules are imported here, so the trace can time them
+
+    with trace.phase("import PyQt5.QtWidgets"):
+        # type: ignore  # pylint: disable=no-name-in-module
+        from PyQt5.QtWidgets import QApplication
+    logger = trace.timed_import("loguru").logger
+    # Import the main YouTubeDownloader class from the renamed module
+    main_window = trace.timed_import("main_window")
+
+    with trace.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        app.setQuitOnLastWindowClosed(True)
 
     # Create and show the main window
-    window = YouTubeDownloader()
+    with trace.phase("YouTubeDownloader.__init__"):
+        window = main_window.YouTubeDownloader()
+    window.persist_settings = not checking
     window.show()
 
+    def on_started():
+        logger.info("Startup timings:\n" + trace.format_report())
+        if args.trace_startup:
+            trace.write_json(args.trace_startup)
+        if checking:
+            violations = trace.over_budget(load_budgets(args.check_startup))
+            for violation in violations:
+                print(f"Startup budget exceeded: {violation}", file=sys.stderr)
+            window.close()
+            app.exit(1 if violations else 0)
+
+    window.startup_finished.connect(on_started)
+
     # Start the application event loop
     sys.exit(app.exec_())
 
@@ -11,6 +11,17 @@ import sys
 APP_NAME = "My YT Downloads"
 FFMPEG_URL = "https://www.gyan.dev/ffmpeg/builds/ffmpeg-release-essentials.zip"
 
+# Set by set_app_folder() to run on another folder than the user's
+_app_folder_override: str | None = None
+
+
+def set_app_folder(path: str | None):
+    """
+    Use another folder as the application folder (None restores the default).
+    """
+    global _app_folder_override  # pylint: disable=global-statement
+    _app_folder_override = path
+
 
 def get_base_path() -> str:
     """
@@ -32,7 +43,7 @@ def get_app_folder() -> str:
         if getattr(sys, "frozen", False)
         else os.getcwd()
     )
-    app_folder = os.path.join(exe_dir, APP_NAME)
+    app_folder = _app_folder_override or os.path.join(exe_dir, APP_NAME)
     os.makedirs(app_folder, exist_ok=True)
     return app_folder
 
@@ -54,3 +65,17 @@ def get_database_path() -> str:
     app_folder = get_app_folder()
     db_path = os.path.join(app_folder, "downloads.db")
     return db_path
+
+
+def get_metadata_cache_path() -> str:
+    """
+    Returns path to the metadata cache database next to downloads.db.
+    """
+    return os.path.join(os.path.dirname(get_database_path()), "metadata_cache.db")
+
+
+def get_ffmpeg_cache_path() -> str:
+    """
+    Returns path to the file caching the validated FFmpeg location.
+    """
+    return os.path.join(get_app_folder(), "ffmpeg.json")
@@ -0,0 +1,119 @@
+"""Process-wide bandwidth limiting shared by all downloads.
+
+This module provides a BandwidthGovernor that splits one global bytes/sec
+budget evenly between the downloads currently transferring. Each download
+gets its own token bucket refilled at its share of the budget; the limit
+can be changed at any time and takes effect on the next received chunk,
+without restarting any transfer.
+"""
+import itertools
+import threading
+import time
+from typing import Callable
+
+# Longest single sleep, so limit changes and cancels are noticed quickly
+_MAX_SLEEP = 0.25
+# Bucket capacity, in seconds worth of the worker's share
+_BURST_SECONDS = 0.5
+
+
+class _Bucket:
+    """Token bucket of one registered download."""
+
+    def __init__(self):
+        self.tokens = 0.0
+        self.last = time.monotonic()
+
+
+class BandwidthGovernor:
+    """Shares a global bandwidth budget fairly across active downloads."""
+
+    def __init__(self, limit: int = 0):
+        """Initialize the governor.
+
+        Args:
+            limit (int): Global budget in bytes/sec; 0 means unlimited.
+        """
+        self.limit = max(0, int(limit))
+        self._buckets: dict[int, _Bucket] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def set_limit(self, limit: int):
+        """Change the global budget; running downloads adapt immediately.
+
+        Args:
+            limit (int): Global budget in bytes/sec; 0 means unlimited.
+        """
+        with self._lock:
+            self.limit = max(0, int(limit))
+
+    def register(self) -> int:
+        """Add a download to the fair share and return its handle."""
+        with self._lock:
+            handle = next(self._ids)
+            self._buckets[handle] = _Bucket()
+            return handle
+
+    def unregister(self, handle: int):
+        """Remove a download so its share goes to the others."""
+        with self._lock:
+            self._buckets.pop(handle, None)
+
+    def share(self) -> float:
+        """Return the current per-download rate in bytes/sec (0: unlimited)."""
+        with self._lock:
+            return self._share_locked()
+
+    def _share_locked(self) -> float:
+        if not self.limit or not self._buckets:
+            return 0.0
+        return self.limit / len(self._buckets)
+
+    def throttle(
+        self,
+        handle: int,
+        nbytes: int,
+        cancelled: Callable[[], bool] = lambda: False,
+    ):
+        """Account for received bytes, sleeping until they fit the share.
+
+        Args:
+            handle (int): Handle returned by :meth:`register`.
+            nbytes (int): Bytes received since the previous call.
+            cancelled (callable): Checked between sleeps to stop waiting.
+        """
+        with self._lock:
+            bucket = self._buckets.get(handle)
+            if bucket is None:
+                return
+            # Refill before charging, so idle time never earns more than
+            # one burst
+            self._refill_locked(bucket)
+            bucket.tokens -= nbytes
+
+        while not cancelled():
+            with self._lock:
+                rate = self._refill_locked(bucket)
+                if not rate or bucket.tokens >= 0:
+                    return
+                wait = -bucket.tokens / rate
+            time.sleep(min(wait, _MAX_SLEEP))
+
+    def _refill_locked(self, bucket: _Bucket) -> float:
+        """Add the tokens earned since the last refill; return the rate."""
+        rate = self._share_locked()
+        now = time.monotonic()
+        if rate:
+            bucket.tokens = min(
+                bucket.tokens + (now - bucket.last) * rate,
+                rate * _BURST_SECONDS,
+            )
+        else:
+            bucket.tokens = 0.0
+        bucket.last = now
+        return rate
+
+
+# Shared by every download in the process
+governor = BandwidthGovernor()
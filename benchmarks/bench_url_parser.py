@@ -0,0 +1,87 @@
+"""Micro-benchmark for url_parser.parse_url.
+
+Parses a corpus of generated URLs in every supported form (plus some
+that are rejected) and prints the time per URL, next to the regex and
+urllib based checks it replaced.
+
+Usage:
+    python benchmarks/bench_url_parser.py [URL_COUNT]
+"""
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from url_parser import parse_url  # noqa: E402
+
+TEMPLATES = [
+    "https://www.youtube.com/watch?v={id}",
+    "https://youtu.be/{id}?si={junk}",
+    "https://m.youtube.com/watch?v={id}&t={t}s&list=PL{junk}",
+    "https://www.youtube.com/shorts/{id}",
+    "https://www.youtube.com/live/{id}?feature=share",
+    "https://www.youtube.com/embed/{id}?start={t}",
+    "https://www.youtube.com/playlist?list=PL{junk}",
+    "https://www.youtube.com/@{junk}/videos",
+    "https://example.com/watch?v={id}",
+]
+
+_OLD_RE = (
+    r"^https?://(www\.)?"
+    r"(youtube\.com/(watch\?v=|shorts/|live/|embed/|v/)|youtu\.be/).+"
+)
+
+
+def old_parse(url: str):
+    """The previous validation plus video ID extraction."""
+    if not re.match(_OLD_RE, url, re.IGNORECASE):
+        return None
+    parsed = urlparse(url.strip())
+    path = parsed.path.strip("/").split("/")
+    if parsed.hostname == "youtu.be":
+        return path[0]
+    if path[0] == "watch":
+        return (parse_qs(parsed.query).get("v") or [""])[0]
+    return path[1] if len(path) > 1 else None
+
+
+def corpus(count: int) -> list[str]:
+    """Generate count URLs, reproducibly."""
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + "-_"
+    return [
+        rng.choice(TEMPLATES).format(
+            id="".join(rng.choices(alphabet, k=11)),
+            junk="".join(rng.choices(alphabet, k=16)),
+            t=rng.randrange(3600),
+        )
+        for _ in range(count)
+    ]
+
+
+def bench(name: str, func, urls: list[str]):
+    """Time func over urls and print microseconds per URL."""
+    start = time.perf_counter()
+    for url in urls:
+        func(url)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed * 1e6 / len(urls):6.2f} us/url "
+          f"({len(urls)} urls in {elapsed:.3f} s)")
+
+
+def main():
+    """Run the benchmark."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    urls = corpus(count)
+    bench("parse_url", parse_url, urls)
+    bench("regex+urllib", old_parse, urls)
+
+
+if __name__ == "__main__":
+    main()
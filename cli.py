@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+YouTube Downloader - Hi Tech Version
+Headless Command Line Launcher
+
+Runs the download queue without the GUI (and without PyQt5), using the
+same format presets, retry policy, bandwidth limit and history database as
+the desktop app. URLs are read from files or stdin, one per line; playlist
+and channel URLs are expanded as they are listed. Videos already in the
+download archive are skipped without network access. Progress is printed
+to stdout as JSON lines, logs go to stderr.
+
+Usage:
+    python cli.py urls.txt
+    cat urls.txt | python cli.py -f "Mp4-HD (1080p)" -j 4
+    python cli.py --watch inbox.txt   # daemon: keeps following the file
+
+Author: Hi Tech Versions Team
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Iterator, TextIO
+
+from loguru import logger
+
+import metadata
+from app_dir_creator import (
+    get_database_path,
+    get_download_folder,
+    get_ffmpeg_cache_path,
+    get_metadata_cache_path,
+)
+from bandwidth import governor
+from database_handler import init_db
+from db_writer import DatabaseWriter
+from download_archive import SKIPPED_MESSAGE, DownloadArchive
+from ffmpeg_utils import resolve_ffmpeg
+from fragment_tuning import (
+    DEFAULT_FRAGMENT_MODE,
+    DEFAULT_FRAGMENT_MODES,
+    FRAGMENT_MODES,
+)
+from metadata_cache import MetadataCache
+from playlist_listing import PlaylistListing, PlaylistOptions, is_collection_url
+from presets import FORMAT_PRESETS, build_ydl_opts
+from progress_events import ProgressEvent
+from queue_item import QueueItem, QueueStatus
+from scheduler import DEFAULT_MAX_WORKERS, MAX_WORKERS_LIMIT, DownloadScheduler
+from segmented_download import DEFAULT_CONNECTIONS
+
+if TYPE_CHECKING:
+    from download_engine import DownloadResult
+
+# How often a followed file is checked for new lines
+WATCH_INTERVAL = 1.0
+
+_SIZE_SUFFIXES = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_rate(text: str) -> int:
+    """Parse a bandwidth limit like "500K" or "2M" into bytes/sec."""
+    text = text.strip().upper().removesuffix("/S").removesuffix("B")
+    factor = _SIZE_SUFFIXES.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * factor)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid rate: {text!r}") from e
+
+
+def parse_preset(text: str) -> str:
+    """Match a preset name case-insensitively."""
+    for name in FORMAT_PRESETS:
+        if name.lower() == text.strip().lower():
+            return name
+    raise argparse.ArgumentTypeError(
+        f"unknown preset {text!r} (see --list-presets)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        description="Download YouTube videos without the GUI. "
+        "Prints one JSON object per line on stdout.")
+    parser.add_argument(
+        "inputs", nargs="*", metavar="FILE",
+        help="files with one URL per line ('-' or nothing: stdin)")
+    parser.add_argument(
+        "-u", "--url", action="append", default=[],
+        help="URL to download (can be repeated)")
+    parser.add_argument(
+        "-f", "--format", type=parse_preset,
+        help="format preset, as in the GUI's dropdown")
+    parser.add_argument(
+        "-o", "--output", help="download folder (default: app folder)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_MAX_WORKERS,
+        choices=range(1, MAX_WORKERS_LIMIT + 1), metavar="N",
+        help=f"parallel downloads (1-{MAX_WORKERS_LIMIT}, "
+        f"default {DEFAULT_MAX_WORKERS})")
+    parser.add_argument(
+        "--limit", type=parse_rate, default=0,
+        help="total bandwidth limit, e.g. 500K or 2M (default: none)")
+    parser.add_argument(
+        "--fragments", choices=FRAGMENT_MODES,
+        help="fragment parallelism for DASH/HLS formats")
+    parser.add_argument(
+        "--connections", type=int, default=DEFAULT_CONNECTIONS,
+        help="connections per single-file download (1 disables segmenting)")
+    parser.add_argument(
+        "--items", default="",
+        help="playlist items to queue, e.g. 1-20,25")
+    parser.add_argument(
+        "--match-title", default="", help="only queue playlist entries "
+        "whose title matches this regex")
+    parser.add_argument(
+        "--max-duration", type=int, default=0, metavar="SECONDS",
+        help="skip playlist entries longer than this")
+    parser.add_argument(
+        "--ffmpeg", help="path of the FFmpeg executable")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="daemon mode: keep following the input files for new URLs")
+    parser.add_argument(
+        "--no-history", action="store_true",
+        help="don't record downloads in the history database")
+    parser.add_argument(
+        "--no-archive", action="store_true",
+        help="download videos again even if they are in the archive")
+    parser.add_argument(
+        "--list-presets", action="store_true",
+        help="print the format presets and exit")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="log info to stderr")
+    return parser
+
+
+class JsonPrinter:
+    """Writes events as JSON lines, one writer at a time."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        """Print one event."""
+        line = json.dumps({"event": event, "time": round(time.time(), 3),
+                           **fields})
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def read_lines(
+    stream: TextIO, follow: bool, stop: threading.Event
+) -> Iterator[str]:
+    """Yield URL lines, skipping blanks and # comments.
+
+    Args:
+        stream: Open file or stdin
+        follow: Keep waiting for lines appended after EOF
+        stop: Ends following when set
+    """
+    while not stop.is_set():
+        line = stream.readline()
+        if not line:
+            if not follow:
+                return
+            stop.wait(WATCH_INTERVAL)
+            continue
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def feed(
+    args: argparse.Namespace,
+    scheduler: DownloadScheduler,
+    out: JsonPrinter,
+    stop: threading.Event,
+):
+    """Queue every input URL, expanding playlists as they are listed."""
+    options = PlaylistOptions(args.items, args.match_title, args.max_duration)
+    queued: set[str] = set()  # canonical keys, so URL variants count once
+
+    def queue(url: str, title: str = ""):
+        key = metadata.canonical_key(url)
+        if key in queued:
+            return
+        queued.add(key)
+        if scheduler.archive and scheduler.archive.contains(url):
+            out.emit("skipped", url=url, title=title or url,
+                     message=SKIPPED_MESSAGE)
+            return
+        item = QueueItem(
+            url=url, title=title or url, format_selection=args.format or "",
+            status=QueueStatus.WAITING)
+        out.emit("queued", item=item.item_id, url=url, title=item.title)
+        scheduler.add(item)
+
+    def urls() -> Iterator[str]:
+        yield from args.url
+        sources = args.inputs or ([] if args.url else ["-"])
+        for source in sources:
+            if source == "-":
+                yield from read_lines(sys.stdin, False, stop)
+                continue
+            with open(source, encoding="utf-8") as f:
+                yield from read_lines(f, args.watch, stop)
+
+    try:
+        for url in urls():
+            if stop.is_set():
+                break
+            if not is_collection_url(url):
+                queue(url)
+                continue
+            listing = PlaylistListing(url, options)
+            try:
+                for entry in listing.entries(stop.is_set):
+                    queue(entry.url, entry.title)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                out.emit("error", url=url, message=f"Listing failed: {e}")
+    except OSError as e:
+        out.emit("error", message=str(e))
+    finally:
+        scheduler.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the queue headlessly. Returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    if args.list_presets:
+        for name in FORMAT_PRESETS:
+            print(name)
+        return 0
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO" if args.verbose else "WARNING")
+    out = JsonPrinter(sys.stdout)
+
+    output_folder = args.output or get_download_folder()
+    ffmpeg_path = args.ffmpeg
+    if not ffmpeg_path:
+        try:
+            ffmpeg_path = resolve_ffmpeg(get_ffmpeg_cache_path()).path
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"FFmpeg not available, merging will fail: {e}")
+
+    db_path = get_database_path()
+    if not args.no_history:
+        init_db(db_path)
+    metadata.configure_cache(MetadataCache(get_metadata_cache_path()))
+    governor.set_limit(args.limit)
+    # Workers finish concurrently; one thread does all the writing
+    writer = DatabaseWriter(db_path)
+    writer.start()
+    archive = None
+    if not args.no_archive:
+        archive = DownloadArchive(db_path, writer)
+        archive.scan(output_folder)
+
+    def opts_factory(item: QueueItem) -> dict:
+        mode = args.fragments or DEFAULT_FRAGMENT_MODES.get(
+            item.format_selection, DEFAULT_FRAGMENT_MODE)
+        return build_ydl_opts(
+            item.format_selection, output_folder, ffmpeg_path, mode,
+            args.connections)
+
+    def on_progress(event: ProgressEvent):
+        out.emit(
+            "progress", item=event.item_id, downloaded=event.downloaded,
+            total=event.total, percent=event.percent, speed=event.speed,
+            eta=event.eta, fragment=event.fragment_index,
+            fragments=event.fragment_count)
+
+    def on_status(item_id: int, message: str):
+        out.emit("status", item=item_id, message=message)
+
+    def on_finished(item: QueueItem, result: "DownloadResult"):
+        out.emit(
+            "finished", item=item.item_id, success=result.success,
+            url=result.url, title=result.title, path=result.path,
+            status=result.status, message=result.message, notes=result.notes)
+        if not args.no_history:
+            writer.record_history(
+                result.url, result.title, result.path, result.status,
+                result.notes)
+        if archive and result.status == "Completed":
+            archive.add(result.url, result.title, result.path)
+
+    scheduler = DownloadScheduler(
+        opts_factory, args.jobs, on_progress, on_status, on_finished,
+        archive=archive)
+    stop = threading.Event()
+
+    def interrupt(_signum, _frame):
+        stop.set()
+        scheduler.cancel_all()
+
+    signal.signal(signal.SIGINT, interrupt)
+    signal.signal(signal.SIGTERM, interrupt)
+
+    feeder = threading.Thread(
+        target=feed, args=(args, scheduler, out, stop), name="url-feeder",
+        daemon=True)
+    feeder.start()
+    results = scheduler.run()
+    writer.close()
+
+    completed = sum(1 for r in results if r.success)
+    out.emit("summary", completed=completed,
+             failed=len(results) - completed)
+    if stop.is_set():
+        return 130
+    return 0 if completed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,100 @@
 """Module for handling SQLite database operations.
 
 This module provides a DatabaseManager class to handle SQLite connections
-safely using context managers.
+safely using context managers, and the schema migrations applied by
+init_db. Writes made while downloads run go through a DatabaseWriter
+(see db_writer.py) instead of opening a connection each time.
 """
 import sqlite3
-from typing import Optional
+from typing import Callable, Optional
+
+import metadata
+
+
+def _create_tables(cursor: sqlite3.Cursor):
+    """Version 1: history, archive and folder scan tables."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            url TEXT,
+            title TEXT,
+            path TEXT,
+            status TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT
+        )
+    """)
+    # Databases created before retry notes were recorded
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(history)")]
+    if "notes" not in columns:
+        cursor.execute("ALTER TABLE history ADD COLUMN notes TEXT")
+
+    # Videos known to be downloaded (see download_archive.py)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS archive (
+            video_id TEXT PRIMARY KEY,
+            path TEXT,
+            title TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_archive_path ON archive (path)")
+    # Files seen by the last scan of the download folder
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scanned_files (
+            path TEXT PRIMARY KEY,
+            mtime REAL,
+            size INTEGER
+        )
+    """)
+
+
+def _index_history(cursor: sqlite3.Cursor):
+    """Version 2: history video IDs and indexes for lookups."""
+    cursor.execute("ALTER TABLE history ADD COLUMN video_id TEXT")
+    rows = cursor.execute("SELECT id, url FROM history").fetchall()
+    cursor.executemany(
+        "UPDATE history SET video_id = ? WHERE id = ?",
+        [(metadata.video_id_from_url(url or ""), row_id)
+         for row_id, url in rows],
+    )
+    cursor.execute("CREATE INDEX idx_history_url ON history (url)")
+    cursor.execute("CREATE INDEX idx_history_video_id ON history (video_id)")
+    cursor.execute("CREATE INDEX idx_history_timestamp ON history (timestamp)")
+
+
+def _create_queue(cursor: sqlite3.Cursor):
+    """Version 3: the persistent download queue (see queue_store.py)."""
+    cursor.execute("""
+        CREATE TABLE queue (
+            key TEXT PRIMARY KEY,
+            position REAL,
+            url TEXT,
+            title TEXT,
+            format_selection TEXT,
+            status TEXT,
+            error_message TEXT,
+            partial_path TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_queue_position ON queue (position)")
+
+
+def _queue_ignore_archive(cursor: sqlite3.Cursor):
+    """Version 4: queued videos downloaded again despite the archive."""
+    cursor.execute(
+        "ALTER TABLE queue ADD COLUMN ignore_archive INTEGER NOT NULL DEFAULT 0")
+
+
+# Schema migrations; applying the first n gives schema version n. Only ever
+# append to this list.
+MIGRATIONS: list[Callable[[sqlite3.Cursor], None]] = [
+    _create_tables,
+    _index_history,
+    _create_queue,
+    _queue_ignore_archive,
+]
 
 
 class DatabaseManager:
@@ -33,23 +123,47 @@ class DatabaseManager:
                 self.conn.commit()
             self.conn.close()
 
-    def create_table(self):
-        """Create the history table if it doesn't exist."""
-        if not self.cursor:
+    def migrate(self):
+        """Bring the schema up to date.
+
+        The schema version is kept in SQLite's ``user_version``. Every
+        migration after it is applied in order, each in its own transaction
+        together with the new version, so an interrupted upgrade leaves the
+        schema at the last completed version and resumes from there.
+        """
+        if not self.conn or not self.cursor:
             raise RuntimeError("Database connection not open")
 
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS history (
-                id INTEGER PRIMARY KEY,
-                url TEXT,
-                title TEXT,
-                path TEXT,
-                status TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-    def record_history(self, url: str, title: str, path: str, status: str):
+        # WAL lets readers (folder scans, lookups) run while the writer
+        # commits; the mode is stored in the database file
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        # sqlite3 doesn't open transactions for DDL, so an ALTER TABLE would
+        # commit on its own: manage them here instead
+        isolation_level = self.conn.isolation_level
+        self.conn.isolation_level = None
+        try:
+            while True:
+                # IMMEDIATE: another process migrating the same file waits,
+                # then sees the version it reached
+                self.cursor.execute("BEGIN IMMEDIATE")
+                try:
+                    version = self.cursor.execute(
+                        "PRAGMA user_version").fetchone()[0]
+                    if version >= len(MIGRATIONS):
+                        self.cursor.execute("COMMIT")
+                        return
+                    MIGRATIONS[version](self.cursor)
+                    self.cursor.execute(f"PRAGMA user_version = {version + 1}")
+                    self.cursor.execute("COMMIT")
+                except BaseException:
+                    self.cursor.execute("ROLLBACK")
+                    raise
+        finally:
+            self.conn.isolation_level = isolation_level
+
+    def record_history(
+        self, url: str, title: str, path: str, status: str, notes: str = ""
+    ):
         """Insert a new download record into the history table.
 
         Args:
@@ -57,21 +171,155 @@ class DatabaseManager:
             title (str): The video title.
             path (str): The download file path.
             status (str): The download status (e.g., 'Completed').
+            notes (str): Retry decisions taken during the download.
         """
         if not self.cursor:
             raise RuntimeError("Database connection not open")
 
         self.cursor.execute(
-            "INSERT INTO history (url, title, path, status) VALUES (?, ?, ?, ?)",
-            (url, title, path, status),
+            "INSERT INTO history (url, video_id, title, path, status, notes) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, metadata.video_id_from_url(url), title, path, status, notes),
+        )
+
+    def archive_video(self, video_id: str, path: str, title: str = ""):
+        """Record a downloaded video in the archive.
+
+        Args:
+            video_id (str): Canonical video ID.
+            path (str): Normalized path of the downloaded file.
+            title (str): The video title.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO archive (video_id, path, title) "
+            "VALUES (?, ?, ?)",
+            (video_id, path, title),
+        )
+
+    def archived_videos(self) -> dict[str, str]:
+        """Return the path of every archived video, by video ID."""
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        return dict(self.cursor.execute("SELECT video_id, path FROM archive"))
+
+    def history_files(self) -> list[tuple[str, str]]:
+        """Return (video_id, path) of every completed video download."""
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        return self.cursor.execute(
+            "SELECT video_id, path FROM history WHERE status = 'Completed' "
+            "AND video_id IS NOT NULL AND path != ''"
+        ).fetchall()
+
+    def scanned_files(self) -> dict[str, tuple[float, int]]:
+        """Return the (mtime, size) recorded for each scanned file."""
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        return {
+            path: (mtime, size)
+            for path, mtime, size in self.cursor.execute(
+                "SELECT path, mtime, size FROM scanned_files")
+        }
+
+    def record_scan(
+        self,
+        changed: list[tuple[str, float, int]],
+        removed: list[str],
+    ):
+        """Update the scan index and drop archive entries of removed files.
+
+        Args:
+            changed (list): (path, mtime, size) of new or modified files.
+            removed (list): Paths of files that no longer exist.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO scanned_files (path, mtime, size) "
+            "VALUES (?, ?, ?)",
+            changed,
+        )
+        self.cursor.executemany(
+            "DELETE FROM scanned_files WHERE path = ?",
+            [(path,) for path in removed],
+        )
+        self.cursor.executemany(
+            "DELETE FROM archive WHERE path = ?",
+            [(path,) for path in removed],
+        )
+
+    def queue_rows(self) -> list[tuple]:
+        """Return the persisted queue, in queue order.
+
+        Returns:
+            list: (key, position, url, title, format_selection, status,
+            error_message, partial_path, ignore_archive) tuples.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        return self.cursor.execute(
+            "SELECT key, position, url, title, format_selection, status, "
+            "error_message, partial_path, ignore_archive FROM queue "
+            "ORDER BY position"
+        ).fetchall()
+
+    def save_queue_rows(self, rows: list[tuple]):
+        """Insert or replace queue rows.
+
+        Args:
+            rows (list): Tuples in the order returned by queue_rows.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO queue (key, position, url, title, "
+            "format_selection, status, error_message, partial_path, "
+            "ignore_archive) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
         )
 
+    def set_queue_positions(self, positions: list[tuple[float, str]]):
+        """Move queue rows.
+
+        Args:
+            positions (list): (position, key) pairs.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        self.cursor.executemany(
+            "UPDATE queue SET position = ? WHERE key = ?", positions)
+
+    def delete_queue_rows(self, keys: list[str] | None = None):
+        """Delete queue rows.
+
+        Args:
+            keys (list): Keys of the rows to delete; None deletes them all.
+        """
+        if not self.cursor:
+            raise RuntimeError("Database connection not open")
+
+        if keys is None:
+            self.cursor.execute("DELETE FROM queue")
+        else:
+            self.cursor.executemany(
+                "DELETE FROM queue WHERE key = ?", [(key,) for key in keys])
+
 
 def init_db(db_path: str):
-    """Ensure the database table exists on startup.
+    """Create or upgrade the database on startup.
 
     Args:
         db_path (str): Path to the database file.
     """
     with DatabaseManager(db_path) as db:
-        db.create_table()
+        db.migrate()
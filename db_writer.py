@@ -0,0 +1,155 @@
+"""Single writer thread for the history database.
+
+This module provides a DatabaseWriter that owns one long-lived connection
+to the history database and applies the writes submitted from the GUI
+thread or the download workers on its own thread. Writes arriving close
+together are committed as one transaction, and the GUI never waits for
+the disk.
+"""
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from loguru import logger
+
+from database_handler import DatabaseManager
+
+# Most writes committed in one transaction
+MAX_BATCH = 200
+# How long the writer lets further writes arrive before committing
+DEFAULT_BATCH_DELAY = 0.05
+
+Write = Callable[[DatabaseManager], None]
+
+
+class DatabaseWriter:
+    """Applies database writes in batches on a background thread."""
+
+    def __init__(self, db_path: str, batch_delay: float = DEFAULT_BATCH_DELAY):
+        """Initialize the writer. Writes queue up until start() is called.
+
+        Args:
+            db_path (str): Path to the database file.
+            batch_delay (float): Seconds to wait for more writes to batch.
+        """
+        self.db_path = db_path
+        self.batch_delay = batch_delay
+        self._pending: deque[Write] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._writing = False
+        self._closed = False
+
+    def start(self):
+        """Start the writer thread, e.g. once the schema is up to date."""
+        with self._cond:
+            if self._thread:
+                return
+            self._thread = threading.Thread(
+                target=self._work, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, write: Write):
+        """Queue a write.
+
+        Writes submitted after close() (e.g. by downloads cancelled while
+        the app quits) are dropped.
+
+        Args:
+            write (callable): Called on the writer thread with an open
+                DatabaseManager; it must not commit.
+        """
+        with self._cond:
+            if self._closed:
+                logger.warning("Database write dropped: writer is closed")
+                return
+            self._pending.append(write)
+            self._cond.notify()
+
+    def record_history(
+        self, url: str, title: str, path: str, status: str, notes: str = ""
+    ):
+        """Queue a history record (see DatabaseManager.record_history)."""
+        self.submit(
+            lambda db: db.record_history(url, title, path, status, notes))
+
+    def archive_video(self, video_id: str, path: str, title: str = ""):
+        """Queue an archive entry (see DatabaseManager.archive_video)."""
+        self.submit(lambda db: db.archive_video(video_id, path, title))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued write is committed.
+
+        Args:
+            timeout (float): Seconds to wait at most; None waits forever.
+
+        Returns:
+            True if everything was written in time
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout: float | None = None):
+        """Write what is queued, then stop the thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread at most.
+        """
+        self.start()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _work(self):
+        with DatabaseManager(self.db_path) as db:
+            if db.conn:
+                # With WAL, a commit only has to reach the log; the database
+                # stays consistent if the app is killed
+                db.conn.execute("PRAGMA synchronous=NORMAL")
+            while True:
+                with self._cond:
+                    while not self._pending and not self._closed:
+                        self._cond.wait()
+                    if not self._pending:
+                        return
+                    closing = self._closed
+                if self.batch_delay and not closing:
+                    time.sleep(self.batch_delay)
+                with self._cond:
+                    batch = [
+                        self._pending.popleft()
+                        for _ in range(min(len(self._pending), MAX_BATCH))
+                    ]
+                    self._writing = True
+                try:
+                    self._write(db, batch)
+                finally:
+                    with self._cond:
+                        self._writing = False
+                        self._cond.notify_all()
+
+    @staticmethod
+    def _write(db: DatabaseManager, batch: list[Write]):
+        # A failing write is logged and skipped; the writer has to keep
+        # going for the rest of the session
+        for write in batch:
+            try:
+                write(db)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error(f"Database write failed: {e}")
+        try:
+            if not db.conn:
+                raise RuntimeError("Database connection not open")
+            db.conn.commit()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Database commit failed: {e}")
+            try:
+                if db.conn:
+                    db.conn.rollback()
+            except sqlite3.Error as rollback_error:
+                logger.error(f"Database rollback failed: {rollback_error}")
@@ -0,0 +1,173 @@
+"""Archive of downloaded videos, checked before any network call.
+
+This module provides a DownloadArchive that keeps the video IDs of what has
+already been downloaded in the ``archive`` table of the history database,
+and in memory, so checking a URL costs no more than parsing it. Downloads
+are archived as they complete, and the archive is seeded by scanning the
+download folder: a file is matched to its video through a ``[video_id]``
+in its name or the history row that produced it. The scan remembers the
+mtime and size of every file, so later scans only look at new or changed
+files; deleting a file makes its video downloadable again.
+"""
+import os
+import re
+import threading
+from typing import TYPE_CHECKING
+
+import metadata
+from database_handler import DatabaseManager
+
+if TYPE_CHECKING:
+    from db_writer import DatabaseWriter
+
+# Status and message of queue items skipped because they are archived
+SKIPPED_STATUS = "Skipped"
+SKIPPED_MESSAGE = "Already downloaded"
+
+# Files yt-dlp is still writing
+_PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp")
+# yt-dlp's default file names end with "[video_id]"
+_FILENAME_ID_RE = re.compile(r"\[([A-Za-z0-9_-]{11})\]")
+
+
+def normalize_path(path: str) -> str:
+    """Return the form under which paths are stored and compared."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class DownloadArchive:
+    """Video IDs already downloaded, kept in the history database."""
+
+    def __init__(self, db_path: str, writer: "DatabaseWriter | None" = None):
+        """Load the archive, creating its tables if needed.
+
+        Args:
+            db_path (str): Path to the history database file.
+            writer (DatabaseWriter): Applies add() writes in the
+                background; without one they are written right away.
+        """
+        self.db_path = db_path
+        self.writer = writer
+        self._lock = threading.Lock()
+        with DatabaseManager(db_path) as db:
+            db.migrate()
+            # video_id -> path of the downloaded file
+            self._paths = db.archived_videos()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._paths)
+
+    def contains(self, url: str) -> bool:
+        """Check whether the video behind a URL was already downloaded.
+
+        Args:
+            url: Any URL form of the video
+
+        Returns:
+            True if the video is archived
+        """
+        video_id = metadata.video_id_from_url(url)
+        with self._lock:
+            return video_id is not None and video_id in self._paths
+
+    def add(self, url: str, title: str, path: str):
+        """Archive a completed download.
+
+        Args:
+            url: URL of the video
+            title: The video title
+            path: Path of the downloaded file
+        """
+        video_id = metadata.video_id_from_url(url)
+        if not video_id:
+            return
+        path = normalize_path(path) if path else ""
+        if self.writer:
+            self.writer.archive_video(video_id, path, title)
+        else:
+            with DatabaseManager(self.db_path) as db:
+                db.archive_video(video_id, path, title)
+        with self._lock:
+            self._paths[video_id] = path
+
+    def scan(self, folder: str) -> int:
+        """Bring the archive up to date with the files in a folder.
+
+        Only files whose mtime or size changed since the last scan are
+        matched to videos, and videos whose file is gone are dropped. The
+        database is only read here; the results are written through the
+        writer, if there is one.
+
+        Args:
+            folder: The download folder
+
+        Returns:
+            The number of videos newly archived
+        """
+        if not os.path.isdir(folder):
+            return 0
+        folder = normalize_path(folder)
+        files: dict[str, tuple[float, int]] = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(_PARTIAL_SUFFIXES) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                files[normalize_path(entry.path)] = (stat.st_mtime, stat.st_size)
+
+        with DatabaseManager(self.db_path) as db:
+            known = db.scanned_files()
+            with self._lock:
+                archived_paths = set(self._paths.values())
+            removed = [
+                path for path in known.keys() | archived_paths
+                if path and os.path.dirname(path) == folder
+                and path not in files
+            ]
+            changed = [
+                (path, mtime, size)
+                for path, (mtime, size) in files.items()
+                if known.get(path) != (mtime, size)
+            ]
+            found = self._identify(db, [path for path, _, _ in changed])
+
+        def record(db: DatabaseManager):
+            for path, video_id in found.items():
+                db.archive_video(
+                    video_id, path, os.path.splitext(os.path.basename(path))[0])
+            db.record_scan(changed, removed)
+
+        if self.writer:
+            self.writer.submit(record)
+        else:
+            with DatabaseManager(self.db_path) as db:
+                record(db)
+
+        gone = set(removed)
+        with self._lock:
+            for video_id, path in list(self._paths.items()):
+                if path in gone:
+                    del self._paths[video_id]
+            added = sum(
+                1 for video_id in found.values() if video_id not in self._paths)
+            for path, video_id in found.items():
+                self._paths[video_id] = path
+        return added
+
+    @staticmethod
+    def _identify(db: DatabaseManager, paths: list[str]) -> dict[str, str]:
+        """Match files to the videos they contain, by name or history."""
+        if not paths:
+            return {}
+        from_history = {
+            normalize_path(path): video_id
+            for video_id, path in db.history_files()
+        }
+        found = {}
+        for path in paths:
+            match = _FILENAME_ID_RE.search(os.path.basename(path))
+            video_id = match.group(1) if match else from_history.get(path)
+            if video_id:
+                found[path] = video_id
+        return found
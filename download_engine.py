@@ -0,0 +1,299 @@
+"""Qt-free download engine wrapping yt-dlp.
+
+This module provides DownloadJob, which runs one download with retries,
+pause/resume, the global bandwidth limit and rate-limited progress
+reporting. It reports through plain callbacks, so it can be driven by the
+GUI's DownloadThread as well as by the headless scheduler.
+
+A job can leave its post-processing (merging, audio conversion) for later,
+so the caller can hand it to a processing stage and free the download slot
+as soon as the streams are on disk.
+"""
+import copy
+import threading
+import time
+from dataclasses import astuple, dataclass
+from typing import Callable
+
+import yt_dlp
+from loguru import logger
+
+import metadata
+from bandwidth import governor
+from fragment_tuning import DEFAULT_FRAGMENT_MODE
+from progress_events import ProgressCoalescer, ProgressEvent
+from retry_policy import (
+    ErrorKind,
+    RetryAction,
+    RetryDecision,
+    RetryPolicy,
+    relaxed_format,
+)
+from ydl_extensions import AppYoutubeDL, FragmentTuningPP
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a download, as recorded in the history."""
+    success: bool
+    message: str
+    url: str
+    title: str = ""
+    path: str = ""
+    status: str = ""
+    notes: str = ""  # retry decisions taken on the way
+
+    def as_tuple(self) -> tuple:
+        """Return the fields in declaration order."""
+        return astuple(self)
+
+
+class DownloadJob:
+    """Downloads one URL, retrying according to the RetryPolicy."""
+
+    def __init__(
+        self,
+        url: str,
+        ydl_opts: dict,
+        info: dict | None = None,
+        item_id: int = 0,
+        on_progress: Callable[[ProgressEvent], None] | None = None,
+        on_status: Callable[[str], None] | None = None,
+        defer_postprocessing: bool = False,
+    ):
+        """Initialize the job.
+
+        Args:
+            url: The URL of the video to download.
+            ydl_opts: yt-dlp configuration options, plus the app's own
+                ``max_retries`` and ``fragment_mode`` keys.
+            info: Previously extracted metadata to reuse instead of
+                extracting the URL again.
+            item_id: Queue item identifier carried by progress events.
+            on_progress: Called with a ProgressEvent, at most 10 Hz.
+            on_status: Called with status messages (retries, pause).
+            defer_postprocessing: Leave merging and conversion to a later
+                call of process() instead of running them in run().
+        """
+        self.url = url
+        self.ydl_opts = dict(ydl_opts)  # copy to avoid shared mutations
+        self.info = info
+        self.item_id = item_id
+        self.on_progress = on_progress or (lambda event: None)
+        self.on_status = on_status or (lambda message: None)
+        self._cancelled = False
+        self._resume = threading.Event()  # cleared while paused
+        self._resume.set()
+        self._bandwidth_handle: int | None = None
+        self.defer_postprocessing = defer_postprocessing
+        # Downloader holding the deferred post-processing, and the result
+        # of the download to complete once it has run
+        self._pending: tuple[AppYoutubeDL, DownloadResult] | None = None
+
+    def run(self) -> DownloadResult:
+        """Execute the download process."""
+        coalescer = ProgressCoalescer(self.item_id, self.on_progress)
+        received = {"file": None, "bytes": 0}
+        # Fragment downloads call the hook from several threads
+        received_lock = threading.Lock()
+
+        def hook(d):
+            if self._cancelled:
+                # type: ignore[attr-defined]
+                raise yt_dlp.utils.DownloadCancelled()
+            if not self._resume.is_set():
+                coalescer.flush()
+                self._hold()
+
+            # Charge the bytes received since the last call to our share of
+            # the global bandwidth budget. A new output file starts from its
+            # resumed size, which was not transferred now, and a fragment
+            # thread reporting an older count is charged nothing.
+            downloaded = d.get("downloaded_bytes") or 0
+            handle = None
+            with received_lock:
+                if d.get("filename") != received["file"]:
+                    received["file"] = d.get("filename")
+                    received["bytes"] = downloaded
+                delta = downloaded - received["bytes"]
+                if delta > 0:
+                    received["bytes"] = downloaded
+                if delta > 0 and d.get("status") == "downloading":
+                    if self._bandwidth_handle is None:
+                        self._bandwidth_handle = governor.register()
+                    handle = self._bandwidth_handle
+            if handle is not None:
+                governor.throttle(handle, delta, lambda: self._cancelled)
+
+            # Called for every chunk: keep it cheap, the GUI formats text
+            coalescer.offer(d, force=d.get("status") == "finished")
+
+        self.ydl_opts["progress_hooks"] = [hook]
+        self.ydl_opts["defer_postprocessing"] = self.defer_postprocessing
+
+        policy = RetryPolicy(int(self.ydl_opts.pop("max_retries", 3)))
+        fragment_mode = self.ydl_opts.pop(
+            "fragment_mode", DEFAULT_FRAGMENT_MODE)
+
+        def on_tuned(workers, fragment_count):
+            coalescer.fragment_workers = workers
+            if workers > 1:
+                logger.info(
+                    f"{self.url}: {fragment_count} fragments, "
+                    f"{workers} in parallel")
+
+        notes: list[str] = []  # retry decisions, recorded in the history
+        format_relaxed = False
+        attempt = 0
+        while True:
+            try:
+                # type: ignore[arg-type]
+                with AppYoutubeDL(self.ydl_opts) as ydl:
+                    # Picks the fragment concurrency once formats are known
+                    ydl.add_post_processor(
+                        FragmentTuningPP(ydl, fragment_mode, on_tuned),
+                        when="before_dl")
+                    if not metadata.is_fresh(self.info):
+                        # Shared with any title fetch of the same video;
+                        # retries bypass the cache in case it went stale
+                        self.info = metadata.extract_info(
+                            self.url, refresh=attempt > 0)
+                    info = None
+                    if self.info is not None:
+                        # Only formats are selected and downloaded here
+                        info = ydl.process_ie_result(
+                            copy.deepcopy(self.info), download=True)
+                    if info is None:
+                        return DownloadResult(
+                            False,
+                            "Failed to extract video information",
+                            self.url,
+                            status="Failed",
+                            notes="; ".join(notes),
+                        )
+
+                    title = info.get("title", "Unknown Title")
+                    output_path = ydl.prepare_filename(info)
+
+                message = "Download complete!"
+                if format_relaxed:
+                    message = "Download complete (best available format)"
+                result = DownloadResult(
+                    True,
+                    message,
+                    self.url,
+                    title,
+                    output_path,
+                    "Completed",
+                    "; ".join(notes),
+                )
+                if ydl.deferred_postprocessing:
+                    self._pending = (ydl, result)
+                return result
+
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                attempt += 1
+                decision = policy.decide(attempt, e, format_relaxed)
+                if self._cancelled:
+                    decision = RetryDecision(
+                        RetryAction.GIVE_UP, ErrorKind.CANCELLED,
+                        reason=ErrorKind.CANCELLED.value)
+                notes.append(decision.reason)
+                logger.error(
+                    f"Download attempt {attempt} failed for {self.url} "
+                    f"({decision.reason}): {e}")
+
+                if decision.action == RetryAction.GIVE_UP:
+                    cancelled = decision.kind == ErrorKind.CANCELLED
+                    return DownloadResult(
+                        False,
+                        "Download cancelled" if cancelled
+                        else f"Download failed ({decision.reason}): {e}",
+                        self.url,
+                        status="Cancelled" if cancelled else "Failed",
+                        notes="; ".join(notes),
+                    )
+
+                self.on_status(f"Retrying: {decision.reason}")
+                if decision.action == RetryAction.RELAX_FORMAT:
+                    self.ydl_opts["format"] = relaxed_format(
+                        self.ydl_opts.get("format", ""))
+                    format_relaxed = True
+                else:
+                    # Stream URLs may have gone stale; extract again
+                    self.info = None
+                    self._sleep(decision.delay)
+            finally:
+                coalescer.flush()
+                self._release_bandwidth()
+
+    def needs_processing(self) -> bool:
+        """Return True if run() left post-processing for process()."""
+        return self._pending is not None
+
+    def process(self) -> DownloadResult:
+        """Run the post-processing deferred by run().
+
+        Returns:
+            The final result; a failed one if FFmpeg failed
+        """
+        if self._pending is None:
+            raise RuntimeError("no post-processing pending")
+        ydl, result = self._pending
+        self._pending = None
+        self.on_status("Processing")
+        try:
+            info = ydl.run_deferred_postprocessing()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Post-processing failed for {self.url}: {e}")
+            result.success = False
+            result.message = f"Post-processing failed: {e}"
+            result.status = "Failed"
+            return result
+        if info and info.get("filepath"):
+            result.path = info["filepath"]
+        return result
+
+    def _release_bandwidth(self):
+        """Give this download's bandwidth share back to the others."""
+        if self._bandwidth_handle is not None:
+            governor.unregister(self._bandwidth_handle)
+            self._bandwidth_handle = None
+
+    def _hold(self):
+        """Block the transfer inside the progress hook while paused.
+
+        The connection stays open; if the server drops it meanwhile,
+        yt-dlp's own retries pick the .part file up at its current offset
+        (``continuedl``) once the download is resumed.
+        """
+        self.on_status("Paused")
+        self._release_bandwidth()
+        while not self._resume.wait(0.2):
+            if self._cancelled:
+                # type: ignore[attr-defined]
+                raise yt_dlp.utils.DownloadCancelled()
+
+    def _sleep(self, seconds: float):
+        """Wait before the next attempt, waking up early on cancel."""
+        deadline = time.monotonic() + seconds
+        while not self._cancelled and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def pause(self):
+        """Hold the transfer at the next received chunk."""
+        self._resume.clear()
+
+    def resume(self):
+        """Continue a paused transfer."""
+        self._resume.set()
+
+    def is_paused(self) -> bool:
+        """Return True while the download is paused."""
+        return not self._resume.is_set()
+
+    def cancel(self):
+        """Request the download to be cancelled."""
+        self._cancelled = True
+        self._resume.set()
+        self.on_status("Cancelled")
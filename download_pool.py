@@ -0,0 +1,325 @@
+"""Parallel download worker pool.
+
+This module provides a dispatcher that feeds waiting items from the
+QueueManager into a fixed number of DownloadThread worker slots and routes
+each worker's progress back to the QueueItem it is downloading. Downloads
+that still need merging or converting free their slot and are finished by
+a ProcessingStage. Items whose video is in the DownloadArchive are finished
+as skipped instead of being started.
+"""
+from typing import TYPE_CHECKING, Callable
+
+from loguru import logger
+from PyQt5.QtCore import QObject, pyqtSignal  # type: ignore
+
+from download_archive import SKIPPED_MESSAGE, SKIPPED_STATUS
+from postprocessing import ProcessingStage
+from queue_item import QueueItem
+from queue_manager import QueueManager
+from scheduler import (  # noqa: F401  (re-exported for the GUI)
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PREFETCH_DEPTH,
+    MAX_WORKERS_LIMIT,
+)
+
+if TYPE_CHECKING:
+    from download_archive import DownloadArchive
+    from download_thread import DownloadThread
+
+# How long shutdown() waits for each cancelled download to stop, in ms
+WORKER_STOP_TIMEOUT = 5000
+
+
+class DownloadPool(QObject):
+    """Dispatches queued downloads onto a bounded set of worker slots."""
+
+    # Signal emitted when a worker reports progress: (ProgressEvent)
+    item_progress = pyqtSignal(object)
+    # Signal emitted when a worker reports a status line: (item_id, message)
+    item_status = pyqtSignal(int, str)
+    # Signal emitted when a worker is done:
+    # (item_id, success, message, url, title, path, status, retry notes)
+    item_finished = pyqtSignal(int, bool, str, str, str, str, str, str)
+    # Signal emitted when a download moves on to post-processing: (item_id)
+    item_processing = pyqtSignal(int)
+    # Signal emitted when the queue has drained and no worker is active
+    all_finished = pyqtSignal()
+    # Post-processing results, carried from the pool threads: (item_id, result)
+    _processed = pyqtSignal(int, object)
+
+    def __init__(
+        self,
+        queue_manager: QueueManager,
+        opts_factory: Callable[[QueueItem], dict],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        parent=None,
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+    ):
+        """Initialize the pool.
+
+        Args:
+            queue_manager: Source of waiting queue items
+            opts_factory: Builds the yt-dlp options for a queue item
+            max_workers: Number of downloads allowed to run at once
+            parent: Parent QObject
+            prefetch_depth: Number of upcoming items to extract in advance
+        """
+        super().__init__(parent)
+        self.queue_manager = queue_manager
+        self.opts_factory = opts_factory
+        self.max_workers = self._clamp(max_workers)
+        self.prefetch_depth = max(0, prefetch_depth)
+        self.running = False
+        self.paused = False  # whole queue paused: no new downloads start
+        self.workers: dict[int, "DownloadThread"] = {}
+        # Paused downloads the user resumed while every slot was busy; they
+        # continue, in order, as slots free up
+        self.resume_waiting: list[int] = []
+        # Sources still adding items (playlist listings); the queue isn't
+        # finished while any is open
+        self.open_feeds = 0
+        # Items whose post-processing is queued or running
+        self.processing_ids: set[int] = set()
+        self.processing = ProcessingStage()
+        self._closed = False  # see shutdown()
+        # Set once the database is open; archived videos are not downloaded
+        self.archive: "DownloadArchive | None" = None
+
+        self.queue_manager.item_removed.connect(self.cancel)
+        self._processed.connect(self._on_processed)
+
+    @staticmethod
+    def _clamp(value: int) -> int:
+        return max(1, min(int(value), MAX_WORKERS_LIMIT))
+
+    def start(self):
+        """Start dispatching waiting items until the queue drains."""
+        self.running = True
+        self.dispatch()
+
+    def feed_opened(self):
+        """Note that a source will keep adding items to the queue."""
+        self.open_feeds += 1
+
+    def feed_closed(self):
+        """Note that a source has added its last item."""
+        self.open_feeds = max(0, self.open_feeds - 1)
+        if self.running:
+            self.dispatch()
+
+    def set_max_workers(self, value: int):
+        """Change the number of worker slots.
+
+        Growing the pool takes effect immediately; shrinking lets running
+        downloads finish and simply stops refilling the extra slots.
+
+        Args:
+            value: New number of concurrent downloads
+        """
+        self.max_workers = self._clamp(value)
+        if self.running:
+            self.dispatch()
+
+    def active_count(self) -> int:
+        """Return the number of downloads currently running."""
+        return len(self.workers)
+
+    def transferring_count(self) -> int:
+        """Return the number of running downloads that are not paused."""
+        return sum(
+            1 for thread in self.workers.values() if not thread.is_paused())
+
+    def dispatch(self):
+        """Fill free worker slots with the next waiting items.
+
+        Paused downloads don't occupy a slot, so pausing one lets the next
+        waiting item start. Resumed downloads waiting for a slot go first.
+        """
+        while (
+            self.running
+            and not self.paused
+            and self.transferring_count() < self.max_workers
+        ):
+            if self.resume_waiting:
+                thread = self.workers.get(self.resume_waiting.pop(0))
+                if thread:
+                    thread.resume()
+                continue
+            item = self.queue_manager.pop_next()
+            if not item:
+                break
+            if (self.archive and not item.ignore_archive
+                    and self.archive.contains(item.url)):
+                self.item_finished.emit(
+                    item.item_id, True, SKIPPED_MESSAGE, item.url, item.title,
+                    "", SKIPPED_STATUS, "")
+                continue
+            self._start_worker(item)
+
+        if self.running and self.prefetch_depth:
+            # Overlap the next items' extraction with the running downloads
+            self.queue_manager.prefetch_ahead(self.prefetch_depth)
+
+        if (self.running and not self.paused and not self.workers
+                and not self.processing_ids and not self.open_feeds):
+            self.running = False
+            self.all_finished.emit()
+
+    def _start_worker(self, item: QueueItem):
+        # Imported on first use: it loads yt-dlp, which the window doesn't
+        # need to show up
+        # pylint: disable=import-outside-toplevel
+        from download_thread import DownloadThread
+
+        item_id = item.item_id
+        thread = DownloadThread(
+            item.url, self.opts_factory(item), item.info, item_id,
+            defer_postprocessing=True)
+        thread.progress.connect(self.item_progress)
+        thread.status.connect(
+            lambda message, i=item_id: self.item_status.emit(i, message))
+        thread.finished.connect(
+            lambda *result, i=item_id: self._on_worker_finished(i, *result))
+        self.workers[item_id] = thread
+        logger.info(
+            f"Worker slot {len(self.workers)}/{self.max_workers} "
+            f"started for {item.url}")
+        thread.start()
+
+    def _on_worker_finished(
+        self, item_id, success, message, url, title, path, status, notes
+    ):
+        thread = self.workers.pop(item_id, None)
+        if thread:
+            thread.wait()  # run() has already emitted; let it return
+        if self._closed:
+            return
+        if thread and thread.job.needs_processing():
+            # The slot is free; the merge/conversion finishes in the stage
+            self.processing_ids.add(item_id)
+            self.item_processing.emit(item_id)
+            if not self._closed:
+                self.processing.submit(
+                    thread.job,
+                    lambda result: self._emit_processed(item_id, result))
+        else:
+            self.item_finished.emit(
+                item_id, success, message, url, title, path, status, notes)
+        self._after_finished()
+
+    def _emit_processed(self, item_id: int, result):
+        # Called on a pool thread, possibly after the pool was shut down
+        if not self._closed:
+            self._processed.emit(item_id, result)
+
+    def _on_processed(self, item_id: int, result):
+        if self._closed:
+            return
+        self.processing_ids.discard(item_id)
+        self.item_finished.emit(item_id, *result.as_tuple())
+        self._after_finished()
+
+    def _after_finished(self):
+        if self.running:
+            self.dispatch()
+        elif not self.workers and not self.processing_ids:
+            self.all_finished.emit()
+
+    def pause(self, item_id: int) -> bool:
+        """Pause a running download, keeping its partial file.
+
+        Args:
+            item_id: Identifier of the item to pause
+
+        Returns:
+            True if the item had a running download
+        """
+        thread = self.workers.get(item_id)
+        if not thread:
+            return False
+        if item_id in self.resume_waiting:
+            self.resume_waiting.remove(item_id)
+        thread.pause()
+        self.dispatch()
+        return True
+
+    def resume(self, item_id: int) -> bool:
+        """Resume a paused download, once a slot is free.
+
+        If every slot is busy, the download stays on hold and continues
+        before any new item starts.
+
+        Args:
+            item_id: Identifier of the item to resume
+
+        Returns:
+            True if the item had a running download
+        """
+        thread = self.workers.get(item_id)
+        if not thread:
+            return False
+        if not thread.is_paused() or item_id in self.resume_waiting:
+            return True
+        if self.transferring_count() < self.max_workers:
+            thread.resume()
+        else:
+            self.resume_waiting.append(item_id)
+            self.item_status.emit(item_id, "Waiting for a free slot")
+        return True
+
+    def pause_all(self):
+        """Pause every running download and stop starting new ones."""
+        self.paused = True
+        self.resume_waiting.clear()
+        for thread in self.workers.values():
+            thread.pause()
+
+    def resume_all(self):
+        """Resume every paused download and continue dispatching."""
+        self.paused = False
+        for item_id in list(self.workers):
+            self.resume(item_id)
+        if self.running:
+            self.dispatch()
+
+    def cancel(self, item_id: int):
+        """Cancel the download of a single item if it is running.
+
+        Args:
+            item_id: Identifier of the item to cancel
+        """
+        thread = self.workers.get(item_id)
+        if item_id in self.resume_waiting:
+            self.resume_waiting.remove(item_id)
+        if thread and thread.isRunning():
+            thread.cancel()
+
+    def shutdown(self, timeout: int = WORKER_STOP_TIMEOUT):
+        """Stop every download and drop the post-processing still to do.
+
+        Called when the app quits. Running downloads are cancelled and
+        waited for; post-processing jobs not started yet are cancelled.
+        Results still to come are discarded, so nothing reaches the closed
+        window or database. The items keep the downloading or processing
+        status saved with the queue and are put back in line next session,
+        where yt-dlp resumes the partial files or finds the downloaded
+        streams and only post-processes them.
+
+        Args:
+            timeout: Milliseconds to wait for each download to stop
+        """
+        self._closed = True
+        self.cancel_all()
+        for item_id, thread in list(self.workers.items()):
+            if not thread.wait(timeout):
+                logger.warning(f"Download of item {item_id} did not stop")
+        self.processing.shutdown(wait=False, cancel_futures=True)
+
+    def cancel_all(self):
+        """Stop dispatching and cancel every running download."""
+        self.running = False
+        self.paused = False
+        self.resume_waiting.clear()
+        for thread in list(self.workers.values()):
+            if thread.isRunning():
+                thread.cancel()
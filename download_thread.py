@@ -1,135 +1,59 @@
 """Module for handling background video downloads using QThread.
 
-This module provides a threaded downloader class that wraps yt-dlp
-to perform downloads without freezing the main GUI.
+This module provides a threaded downloader class that runs a DownloadJob
+(see download_engine.py) without freezing the main GUI.
 """
-import time
-
-import yt_dlp
-from loguru import logger
 from PyQt5.QtCore import QThread, pyqtSignal  # pylint: disable=no-name-in-module
 
+from download_engine import DownloadJob
+
 
 class DownloadThread(QThread):
     """Background thread for downloading YouTube videos using yt-dlp."""
 
-    progress = pyqtSignal(int)  # emits 0-100
+    progress = pyqtSignal(object)  # emits ProgressEvent, at most 10 Hz
     status = pyqtSignal(str)  # emits status messages
-    finished = pyqtSignal(bool, str, str, str, str, str)
-    # success, message, url, title, path, status
+    finished = pyqtSignal(bool, str, str, str, str, str, str)
+    # success, message, url, title, path, status, retry notes
 
-    def __init__(self, url, ydl_opts):
+    def __init__(self, url, ydl_opts, info=None, item_id=0,
+                 defer_postprocessing=False):
         """Initialize the download thread.
 
         Args:
             url (str): The URL of the video to download.
-            ydl_opts (dict): yt-dlp configuration options.
+            ydl_opts (dict): yt-dlp configuration options, plus the app's
+                own ``max_retries`` and ``fragment_mode`` keys.
+            info (dict, optional): Previously extracted metadata to reuse
+                instead of extracting the URL again.
+            item_id (int): Queue item identifier carried by progress events.
+            defer_postprocessing (bool): Leave merging and conversion to
+                ``job.process()``, run after this thread has finished.
         """
 
         super().__init__()
         self.url = url
-        self.ydl_opts = dict(ydl_opts)  # copy to avoid shared mutations
-        self._cancelled = False
-        self._paused = False
+        self.item_id = item_id
+        self.job = DownloadJob(
+            url, ydl_opts, info, item_id, self.progress.emit, self.status.emit,
+            defer_postprocessing)
 
     def run(self):
         """Execute the download process."""
-        def hook(d):
-            try:
-                if self._cancelled:
-                    # type: ignore[attr-defined]
-                    raise yt_dlp.utils.DownloadCancelled()
-                # Get total and downloaded bytes
-                total = (
-                    d.get("total_bytes")
-                    or d.get(
-                        "total_bytes_estimate",
-                    )
-                    or 1
-                )
-                downloaded = d.get("downloaded_bytes", 0)
-                # Clamp percent between 0 and 100
-                percent = min(max(int(downloaded / total * 100), 0), 100)
-                self.progress.emit(percent)  # visual progress bar update
-                # self.status.emit(f"Downloading: {percent}%") can delete this line
-
-                # Calculate additional info
-                speed = d.get("speed", 0)  # bytes/sec
-                eta = d.get("eta", 0)  # seconds remaining
-
-                # Format human-readable
-                def format_bytes(b):
-                    for unit in ["B", "KB", "MB", "GB"]:
-                        if b < 1024:
-                            return f"{b:.1f}{unit}"
-                        b /= 1024
-                    return f"{b:.1f}TB"
-
-                downloaded_str = format_bytes(downloaded)
-                total_str = format_bytes(total)
-                speed_str = format_bytes(speed) + "/s"
-                eta_str = f"{int(eta // 60)}m {int(eta % 60)}s" if eta else "--"
-
-                status_msg = (
-                    f"{percent}% | {downloaded_str}/{total_str} "
-                    f"| Speed: {speed_str} | ETA: {eta_str}"
-                )
-                self.status.emit(status_msg)
-
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                self.status.emit(f"Hook error: {e}")
-
-        self.ydl_opts["progress_hooks"] = [hook]
-
-        max_retries = int(self.ydl_opts.pop("max_retries", 3))
-        attempt = 0
-        while attempt < max_retries:
-            try:
-                # type: ignore[arg-type]
-                with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                    info = ydl.extract_info(self.url, download=True)
-                    if info is None:
-                        self.finished.emit(
-                            False,
-                            "Failed to extract video information",
-                            self.url,
-                            "",
-                            "",
-                            "Failed",
-                        )
-                        return
+        self.finished.emit(*self.job.run().as_tuple())
 
-                    title = info.get("title", "Unknown Title")
-                    output_path = ydl.prepare_filename(info)
-                    status_text = "Completed"
+    def pause(self):
+        """Hold the transfer at the next received chunk."""
+        self.job.pause()
 
-                self.finished.emit(
-                    True,
-                    "Download complete!",
-                    self.url,
-                    title,
-                    output_path,
-                    status_text,
-                )
-                return
+    def resume(self):
+        """Continue a paused transfer."""
+        self.job.resume()
 
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                attempt += 1
-                logger.error(
-                    f"Download attempt {attempt} failed for {self.url}: {e}")
-                if attempt >= max_retries:
-                    self.finished.emit(
-                        False,
-                        f"Download failed after {max_retries} attempts: {e}",
-                        self.url,
-                        "",
-                        "",
-                        "Failed",
-                    )
-                    return
-                time.sleep(3)
+    def is_paused(self) -> bool:
+        """Return True while the download is paused."""
+        return self.job.is_paused()
 
     def cancel(self):
         """Request the download to be cancelled."""
-        self._cancelled = True
-        self.status.emit("Cancelled")
+        self.job.cancel()
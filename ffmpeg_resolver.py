@@ -0,0 +1,39 @@
+"""Background FFmpeg discovery.
+
+This module provides an FFmpegResolver thread that finds FFmpeg at startup
+(see ffmpeg_utils.resolve_ffmpeg), so the first download doesn't freeze the
+window while static-ffmpeg looks for, or downloads, the binaries.
+"""
+from loguru import logger
+from PyQt5.QtCore import QThread, pyqtSignal  # pylint: disable=no-name-in-module
+
+from ffmpeg_utils import resolve_ffmpeg
+
+
+class FFmpegResolver(QThread):
+    """Background thread resolving the FFmpeg binary."""
+
+    # Signal emitted when FFmpeg is usable: (path, version)
+    resolved = pyqtSignal(str, str)
+    # Signal emitted when no FFmpeg could be found: (error)
+    failed = pyqtSignal(str)
+
+    def __init__(self, cache_path: str):
+        """Initialize the resolver.
+
+        Args:
+            cache_path: JSON file caching the validated FFmpeg location
+        """
+        super().__init__()
+        self.cache_path = cache_path
+
+    def run(self):
+        """Resolve FFmpeg and report the outcome."""
+        try:
+            info = resolve_ffmpeg(self.cache_path)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"FFmpeg not available: {e}")
+            self.failed.emit(str(e))
+            return
+        logger.info(f"Using FFmpeg {info.version} at {info.path}")
+        self.resolved.emit(info.path, info.version)
@@ -1,7 +1,26 @@
 """
 FFmpeg utilities - Uses static-ffmpeg package for guaranteed FFmpeg availability.
+
+Finding (or fetching) the binaries can take seconds, so the validated path
+and version are cached in a small JSON file in the app folder. Later
+launches only check that the binary is still there, unchanged, with a stat.
 """
-import static_ffmpeg
+
+import json
+import os
+import subprocess
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+
+
+@dataclass
+class FFmpegInfo:
+    """A validated FFmpeg binary, as stored in the cache file."""
+    path: str
+    version: str
+    size: int = 0
+    mtime: float = 0.0
 
 
 def get_ffmpeg_path() -> str:
@@ -9,9 +28,66 @@ def get_ffmpeg_path() -> str:
     Returns a guaranteed usable FFmpeg path using static-ffmpeg package.
     This automatically downloads FFmpeg binaries on first use.
     """
+    # Imported here: static-ffmpeg is slow to import and only needed once
+    import static_ffmpeg  # pylint: disable=import-outside-toplevel
+
     # static_ffmpeg.add_paths() adds ffmpeg to PATH and returns the paths
     (
         ffmpeg_path,
         _,
     ) = static_ffmpeg.run.get_or_fetch_platform_executables_else_raise()
     return ffmpeg_path
+
+
+def get_ffmpeg_version(ffmpeg_path: str) -> str:
+    """
+    Returns the version reported by ``ffmpeg -version``, e.g. "7.1".
+    Raises OSError if the binary can't be run.
+    """
+    result = subprocess.run(
+        [ffmpeg_path, "-version"],
+        capture_output=True,
+        text=True,
+        timeout=15,
+        check=True,
+    )
+    # "ffmpeg version 7.1-essentials_build-www.gyan.dev Copyright ..."
+    words = result.stdout.split()
+    return words[2] if len(words) > 2 and words[1] == "version" else ""
+
+
+def load_cached_ffmpeg(cache_path: str) -> FFmpegInfo | None:
+    """
+    Returns the cached FFmpeg if the binary is still in place and unchanged,
+    without running it. None if there is no usable cache entry.
+    """
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            info = FFmpegInfo(**json.load(f))
+        stat = os.stat(info.path)
+    except (OSError, ValueError, TypeError):
+        return None
+    if stat.st_size != info.size or stat.st_mtime != info.mtime:
+        return None
+    return info
+
+
+def resolve_ffmpeg(cache_path: str) -> FFmpegInfo:
+    """
+    Returns a usable FFmpeg, from the cache when it is still valid, else
+    found (or fetched) with static-ffmpeg, validated and cached.
+    """
+    cached = load_cached_ffmpeg(cache_path)
+    if cached:
+        return cached
+
+    path = get_ffmpeg_path()
+    version = get_ffmpeg_version(path)
+    stat = os.stat(path)
+    info = FFmpegInfo(path, version, stat.st_size, stat.st_mtime)
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(info), f)
+    except OSError as e:
+        logger.warning(f"Could not cache the FFmpeg location: {e}")
+    return info
@@ -0,0 +1,53 @@
+"""Per-preset concurrent fragment downloading for DASH/HLS formats.
+
+Fragmented formats are fetched one fragment at a time unless yt-dlp's
+``concurrent_fragment_downloads`` is raised. This module maps a preset's
+fragment mode ("Auto", "Off" or a fixed number) to a concurrency; the
+FragmentTuningPP post-processor in ydl_extensions.py applies it once the
+formats for an item have been selected and their fragment count is known.
+
+yt-dlp stages every fragment in its own temporary file and appends them in
+order, so only one fragment is held in memory at a time; together with the
+concurrency cap below that keeps memory flat however long the stream is.
+"""
+import math
+
+FRAGMENT_MODES = ["Auto", "Off", "2", "4", "8"]
+DEFAULT_FRAGMENT_MODE = "Auto"
+# Presets whose streams gain nothing from parallel fragments
+DEFAULT_FRAGMENT_MODES = {"Audio Only (MP3)": "Off", "Audio Only (M4A)": "Off"}
+
+MAX_FRAGMENT_WORKERS = 8
+# Auto mode adds one worker per this many fragments
+FRAGMENTS_PER_WORKER = 20
+# Typical HLS segment length, used when the fragment list isn't known yet
+HLS_SEGMENT_SECONDS = 5
+
+
+def concurrency_for(mode: str, fragment_count: int) -> int:
+    """Return the number of fragments to fetch in parallel.
+
+    Args:
+        mode: "Auto", "Off" or a fixed number of workers
+        fragment_count: Fragments in the largest selected format
+
+    Returns:
+        Concurrency between 1 and MAX_FRAGMENT_WORKERS
+    """
+    if fragment_count <= 1 or mode == "Off":
+        return 1
+    if mode == "Auto":
+        workers = math.ceil(fragment_count / FRAGMENTS_PER_WORKER)
+    else:
+        workers = int(mode) if mode.isdigit() else 1
+    return max(1, min(workers, fragment_count, MAX_FRAGMENT_WORKERS))
+
+
+def count_fragments(fmt: dict, duration: float | None) -> int:
+    """Return (or estimate) the number of fragments of a selected format."""
+    fragments = fmt.get("fragments")
+    if fragments:
+        return len(fragments)
+    if str(fmt.get("protocol", "")).startswith("m3u8") and duration:
+        return math.ceil(duration / HLS_SEGMENT_SECONDS)
+    return 0
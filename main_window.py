@@ -3,30 +3,37 @@
 This module contains the YouTubeDownloader class which provides the main
 GUI interface for downloading YouTube videos using PyQt5.
 """
-import os
 import re
+import sqlite3
 import sys
+import threading
 
-import yt_dlp
 from loguru import logger
 
+import metadata
+
 # pylint: disable=no-name-in-module
-from PyQt5.QtCore import QSettings, Qt, QTimer  # type: ignore
+from PyQt5.QtCore import QSettings, Qt, QTimer, pyqtSignal  # type: ignore
 
 # pylint: disable=no-name-in-module
 from PyQt5.QtWidgets import (  # type: ignore
     QAction,
     QApplication,
     QComboBox,
+    QDialog,
+    QDialogButtonBox,
     QFileDialog,
+    QFormLayout,
     QHBoxLayout,
     QLabel,
-    QListWidget,
+    QLineEdit,
+    QListView,
     QMenu,
     QMessageBox,
     QProgressBar,
     QPushButton,
     QSizePolicy,
+    QSpinBox,
     QStyle,
     QSystemTrayIcon,
     QVBoxLayout,
@@ -35,17 +42,52 @@ from PyQt5.QtWidgets import (  # type: ignore
 )
 from PyQt5.QtGui import QColor
 
-from app_dir_creator import get_database_path, get_download_folder
-from database_handler import DatabaseManager, init_db
-from download_thread import DownloadThread
-from ffmpeg_utils import get_ffmpeg_path as find_ffmpeg
+from app_dir_creator import (
+    get_database_path,
+    get_download_folder,
+    get_ffmpeg_cache_path,
+    get_metadata_cache_path,
+)
+from bandwidth import governor
+from database_handler import init_db
+from db_writer import DatabaseWriter
+from download_archive import DownloadArchive
+from download_pool import DEFAULT_MAX_WORKERS, MAX_WORKERS_LIMIT, DownloadPool
+from ffmpeg_resolver import FFmpegResolver
+from fragment_tuning import (
+    DEFAULT_FRAGMENT_MODE,
+    DEFAULT_FRAGMENT_MODES,
+    FRAGMENT_MODES,
+)
+from metadata_cache import MetadataCache
+from playlist_expander import PlaylistExpander
+from playlist_listing import PlaylistOptions, is_collection_url
+from presets import FORMAT_PRESETS, build_ydl_opts, preset_name
+from progress_events import ProgressEvent
+from progress_events import describe as describe_progress
 from queue_item import QueueItem, QueueStatus
 from queue_manager import QueueManager
+from queue_store import QueueStore
+from segmented_download import DEFAULT_CONNECTIONS
 from smart_paste_utils import UrlLineEdit
+from startup_trace import trace
 from theme import MAIN_STYLESHEET
+from url_parser import parse_url
 
 logger.add("downloader.log", rotation="500 KB")
 
+# Global bandwidth budgets offered in the UI, in bytes/sec (0 = unlimited)
+BANDWIDTH_LIMITS = [
+    ("Unlimited", 0),
+    ("512 KB/s", 512 * 1024),
+    ("1 MB/s", 1024 * 1024),
+    ("2 MB/s", 2 * 1024 * 1024),
+    ("5 MB/s", 5 * 1024 * 1024),
+    ("10 MB/s", 10 * 1024 * 1024),
+]
+# How long closing waits for each playlist listing to stop, in ms
+EXPANDER_STOP_TIMEOUT = 3000
+
 
 # class UrlLineEdit(QLineEdit, SmartPasteMixin):
 #     def __init__(self, *args, **kwargs):
@@ -73,12 +115,7 @@ def validate_url(url: str) -> bool:
     Validate if the URL is a valid YouTube URL.
     Returns True if valid, False otherwise.
     """
-    # Basic URL pattern for YouTube
-    youtube_pattern = (
-        r"^https?://(www\.)?"
-        r"(youtube\.com/(watch\?v=|shorts/|live/|embed/|v/)|youtu\.be/).+"
-    )
-    return bool(re.match(youtube_pattern, url, re.IGNORECASE))
+    return parse_url(url) is not None
 
 
 # ======================= Main App =======================
@@ -89,6 +126,11 @@ class YouTubeDownloader(QWidget):
     format selection, and system tray integration.
     """
 
+    # Signal emitted once the window is painted and fully set up
+    startup_finished = pyqtSignal()
+    # Signal carrying the saved queue from init_backend: (items, interrupted)
+    queue_loaded = pyqtSignal(object, bool)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("YouTube Downloader")
@@ -102,90 +144,173 @@ class YouTubeDownloader(QWidget):
         # Apply Windows 7 Aero Blue Theme
         self.setStyleSheet(MAIN_STYLESHEET)
 
-        # Initialize app environment
-        self.output_folder = get_download_folder()
+        # Initialize app environment. The database, the metadata cache and
+        # yt-dlp are loaded in the background so the window paints first.
         self.db_path = get_database_path()
-        init_db(self.db_path)
-
-        # FFmpeg will be loaded lazily on first download (for faster startup)
+        # History and archive writes, applied off the GUI thread
+        self.db_writer = DatabaseWriter(self.db_path)
+        # Videos already downloaded; opened by init_backend
+        self.archive: DownloadArchive | None = None
+        # Saves the queue for the next session; opened by init_backend
+        self.queue_store: QueueStore | None = None
+
+        # FFmpeg is resolved in the background once the window is shown
         self.ffmpeg_path = None
+        self.ffmpeg_resolver: FFmpegResolver | None = None
+        self.ffmpeg_ready = False  # resolved, or known to be missing
+        # Start was clicked while FFmpeg was still being resolved
+        self.start_pending = False
+
+        # (url, info) of the last format preview, reused when it is enqueued
+        self.pasted_info: tuple[str, dict] | None = None
+        # Playlist and channel listings still running
+        self.expanders: list[PlaylistExpander] = []
 
         # ---------------------------------------------------
 
         # Queue manager handles all queue operations
         self.queue_manager: QueueManager | None = None  # Initialized in init_ui
-        self.download_thread = None
-        self.downloading = False
+        self.download_pool: DownloadPool | None = None  # Initialized in init_ui
 
         self.settings = QSettings("YouTubeDownloader", "Settings")
+        # Cleared for runs that must leave the user's settings alone
+        self.persist_settings = True
         # self.output_folder = self.settings.value("output_folder", os.getcwd())
 
         # Only overwrite output_folder if user has previously saved a folder
         saved_folder = self.settings.value("output_folder")
-        if saved_folder:
-            self.output_folder = saved_folder
-
-        # -------------video + audio codec number defined here
-        # --------------------------Added the format mapping here
-        self.format_map = {
-            "Mp4-High (720p)": {"video": "136", "audio": "140"},
-            "Mp4-HD (1080p)": {"video": "137", "audio": "251"},
-            "Mkv-High (720p)": {"video": "247", "audio": "251"},
-            "Mkv-HD (1080p)": {"video": "248", "audio": "251"},
-            "WebM-High (720p)": {"video": "247", "audio": "251"},
-            "WebM-HD (1080p)": {"video": "248", "audio": "251"},
-            "Super High WebM": "bestvideo+bestaudio",
-            "Audio Only (MP3)": "bestaudio",
-        }
+        self.output_folder = saved_folder or get_download_folder()
+        self.max_workers = int(
+            self.settings.value("max_workers", DEFAULT_MAX_WORKERS))
+        self.bandwidth_limit = int(self.settings.value("bandwidth_limit", 0))
+        governor.set_limit(self.bandwidth_limit)
+        # Connections per plain HTTP(S) download (1 disables segmenting)
+        self.segment_connections = int(
+            self.settings.value("segment_connections", DEFAULT_CONNECTIONS))
+
+        # Metadata of videos seen in earlier sessions, stored next to the DB
+        self.metadata_cache_mb = int(
+            self.settings.value("metadata_cache_mb", 64))
+
+        # Presets shared with the command line (see presets.py)
+        self.format_map = dict(FORMAT_PRESETS)
         # -------------------------------------------
 
-        self.init_ui()
-        self.init_tray()
+        with trace.phase("init_ui"):
+            self.init_ui()
+        self.tray_icon: QSystemTrayIcon | None = None  # see finish_startup
+        self.painted = False
+        self.queue_loaded.connect(self.restore_queue)
+        threading.Thread(
+            target=self.init_backend, name="backend-init", daemon=True
+        ).start()
+
+    def init_backend(self):
+        """Open the database and the metadata cache, then preload yt-dlp.
+
+        Runs on a background thread started by __init__. Until it is done,
+        lookups simply miss the metadata cache; history writes wait in the
+        database writer, which starts once the schema is up to date.
+        """
+        try:
+            with trace.phase("init_db"):
+                init_db(self.db_path)
+                metadata.configure_cache(MetadataCache(
+                    get_metadata_cache_path(),
+                    self.metadata_cache_mb * 1024 * 1024))
+                self.archive = DownloadArchive(self.db_path, self.db_writer)
+                if self.download_pool:
+                    self.download_pool.archive = self.archive
+                self.queue_store = QueueStore(self.db_writer)
+                self.queue_loaded.emit(*self.queue_store.load(self.db_path))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Failed to open the database: {e}")
+        finally:
+            self.db_writer.start()
+        with trace.phase("archive_scan"):
+            self.scan_archive(self.output_folder)
+        # Warm up the import of yt-dlp, so the first preview or download
+        # doesn't pay for it
+        trace.timed_import("download_engine")
+
+    def restore_queue(self, items: list, interrupted: bool):
+        """Put back the queue saved by the last session.
+
+        If downloads were running when it ended, the queue starts again;
+        their partial files are resumed.
+        """
+        if not self.queue_manager or not self.queue_store:
+            return
+        self.queue_manager.restore(items, self.queue_store)
+        if items:
+            self.status_label.setText(
+                f"Status: Restored {len(items)} queued item(s)")
+        if interrupted and self.queue_manager.has_waiting():
+            self.start_queue()
+
+    def scan_archive(self, folder: str):
+        """Archive the videos found in a download folder.
+
+        Only new or changed files are looked at (see download_archive.py).
+        Called on a background thread.
+        """
+        if not self.archive:
+            return
+        try:
+            added = self.archive.scan(folder)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Failed to scan {folder}: {e}")
+            return
+        if added:
+            logger.info(f"Archived {added} video(s) found in {folder}")
+
+    # type: ignore[override]  # pylint: disable=invalid-name
+    def paintEvent(self, event):
+        """Finish the startup once the window has been painted."""
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            trace.mark("first paint")
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Set up what the first paint doesn't need: tray and shadows."""
+        with trace.phase("finish_startup"):
+            with trace.phase("init_tray"):
+                self.init_tray()
+            for button in (self.enqueue_button, self.download_button,
+                           self.pause_button, self.cancel_button):
+                self.add_shadow(button)
+            self.resolve_ffmpeg()
+        self.startup_finished.emit()
 
     # ------------------Shows Dropwnlist format - size------------
 
     def fetch_format_sizes(self, url):
         """Fetch available format sizes for a given YouTube URL."""
-        ydl_opts = {"quiet": True, "skip_download": True}
-        formats_list = []
+        # pylint: disable=import-outside-toplevel
+        from yt_dlp.utils import DownloadError
+
+        if is_collection_url(url):
+            return []  # never resolve a whole playlist for a preview
+
+        cached = metadata.lookup(url)
+        if cached:
+            if cached.info:
+                self.pasted_info = (url, cached.info)
+            return cached.formats
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:  # type: ignore[arg-type]
-                info = ydl.extract_info(url, download=False)
-                if not info:
-                    return []
-                formats = info.get("formats", [])
-
-                for f in formats:  # type: ignore[union-attr]
-                    fmt_id = f["format_id"]
-                    ext = f["ext"]
-                    res = f.get("height") or "audio"
-
-                    # Calculate approximate size
-                    size = f.get("filesize") or f.get("filesize_approx")
-                    if not size:
-                        duration = f.get("duration")
-                        tbr = f.get("tbr")  # total bitrate in kbps
-                        if duration and tbr:
-                            size = (
-                                duration * tbr * 1000 / 8
-                            )  # convert kbps * sec → bytes
-
-                    # ensure numeric
-                    size_mb = round(size / (1024 * 1024), 1) if size else 0
-
-                    formats_list.append(
-                        {
-                            "format_id": fmt_id,
-                            "ext": ext,
-                            "resolution": res,
-                            "size_mb": size_mb,
-                        }
-                    )
-        except (yt_dlp.utils.DownloadError, KeyError, TypeError) as e:
+            info = metadata.extract_info(url)
+            if not info:
+                return []
+            # Keep the extraction so enqueueing this URL doesn't repeat it
+            self.pasted_info = (url, info)
+            return metadata.format_sizes(info)
+        except (DownloadError, KeyError, TypeError) as e:
             self.status_label.setText(f"Error fetching formats: {e}")
 
-        return formats_list
+        return []
 
     def update_format_dropdown(self):
         """Update the format dropdown with sizes for the current URL."""
@@ -222,7 +347,7 @@ class YouTubeDownloader(QWidget):
                 if largest:
                     size_mb = largest["size_mb"]
 
-            elif display_name == "Audio Only (MP3)":
+            elif codes == "bestaudio":
                 best_audio = max(
                     (
                         f
@@ -339,6 +464,38 @@ class YouTubeDownloader(QWidget):
             QSizePolicy.Expanding, QSizePolicy.Fixed)
         format_layout.addWidget(self.format_quality_combo)
 
+        format_layout.addWidget(QLabel("Fragments:"))
+        self.fragment_combo = QComboBox()
+        self.fragment_combo.addItems(FRAGMENT_MODES)
+        self.fragment_combo.setToolTip(
+            "Fragments of DASH/HLS streams fetched in parallel for the "
+            "selected format (Auto: based on the fragment count)")
+        self.fragment_combo.currentTextChanged.connect(
+            self.set_fragment_mode)
+        self.format_quality_combo.currentTextChanged.connect(
+            self.show_fragment_mode)
+        format_layout.addWidget(self.fragment_combo)
+
+        format_layout.addWidget(QLabel("Parallel:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, MAX_WORKERS_LIMIT)
+        self.workers_spin.setValue(self.max_workers)
+        self.workers_spin.setToolTip("Number of downloads to run at once")
+        self.workers_spin.valueChanged.connect(self.set_max_workers)
+        format_layout.addWidget(self.workers_spin)
+
+        format_layout.addWidget(QLabel("Limit:"))
+        self.bandwidth_combo = QComboBox()
+        for label, limit in BANDWIDTH_LIMITS:
+            self.bandwidth_combo.addItem(label, limit)
+        index = self.bandwidth_combo.findData(self.bandwidth_limit)
+        self.bandwidth_combo.setCurrentIndex(max(index, 0))
+        self.bandwidth_combo.setToolTip(
+            "Total download speed shared by all running downloads")
+        self.bandwidth_combo.currentIndexChanged.connect(
+            self.set_bandwidth_limit)
+        format_layout.addWidget(self.bandwidth_combo)
+
         content_layout.addLayout(format_layout)
 
         # ---------------- Queue Buttons ----------------
@@ -355,48 +512,64 @@ class YouTubeDownloader(QWidget):
         self.download_button.setToolTip("Start downloading all queued videos")
         self.download_button.clicked.connect(self.start_queue)
 
+        self.pause_button = QPushButton("⏸ Pause All")
+        self.pause_button.setObjectName("blueButton")
+        self.pause_button.setToolTip("Pause or resume the whole queue")
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.toggle_pause_all)
+
         self.cancel_button = QPushButton("⏹ Cancel")
         self.cancel_button.setObjectName("redButton")
-        self.cancel_button.setToolTip("Cancel the current download")
+        self.cancel_button.setToolTip("Cancel all running downloads")
         self.cancel_button.setEnabled(False)
         self.cancel_button.clicked.connect(self.cancel_download)
 
         queue_content_layout.addWidget(self.enqueue_button)
         queue_content_layout.addWidget(self.download_button)
+        queue_content_layout.addWidget(self.pause_button)
         queue_content_layout.addWidget(self.cancel_button)
         content_layout.addLayout(queue_content_layout)
 
         # ---------------- Queue List ----------------
-        self.queue_list = QListWidget()
+        self.queue_list = QListView()
         self.queue_list.setSizePolicy(
             QSizePolicy.Expanding, QSizePolicy.Expanding)
 
         # Fix selection colors so text is visible when selected
         self.queue_list.setStyleSheet("""
-            QListWidget::item {
+            QListView::item {
                 border-bottom: 1px solid #E0E0E0;
                 padding: 2px;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #E5F3FF;
                 color: black;
                 border: 1px solid #99D1FF;
             }
-            QListWidget::item:selected:active {
+            QListView::item:selected:active {
                 background-color: #E5F3FF;
                 color: black;
             }
-            QListWidget::item:selected:!active {
+            QListView::item:selected:!active {
                 background-color: #F0F8FF;
                 color: black;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #F5F5F5;
                 color: black;
             }
         """)
-        # Initialize queue manager
+        # Initialize queue manager and the download workers it feeds
         self.queue_manager = QueueManager(self.queue_list, self)
+        self.download_pool = DownloadPool(
+            self.queue_manager, self.build_ydl_opts, self.max_workers, self)
+        self.download_pool.item_progress.connect(self.on_item_progress)
+        self.download_pool.item_status.connect(self.on_item_status)
+        self.download_pool.item_processing.connect(
+            self.queue_manager.mark_processing)
+        self.download_pool.item_finished.connect(self.download_finished)
+        self.download_pool.all_finished.connect(self.on_all_finished)
+        self.queue_manager.pause_requested.connect(self.set_item_paused)
 
         # Enable right-click context menu
         self.queue_list.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -418,23 +591,29 @@ class YouTubeDownloader(QWidget):
         self.status_label.setContentsMargins(5, 5, 5, 5)
         self.status_label.setSizePolicy(
             QSizePolicy.Expanding, QSizePolicy.Fixed)
-        content_layout.addWidget(self.status_label, 0)
 
-        # ---------------- Drop Shadow Effects ----------------
-        def add_shadow(widget, color=QColor(0, 0, 0, 100), blur=15, offset=(0, 5)):
-            shadow = QGraphicsDropShadowEffect(self)
-            shadow.setBlurRadius(blur)
-            shadow.setColor(color)
-            shadow.setOffset(*offset)
-            widget.setGraphicsEffect(shadow)
+        # FFmpeg readiness, updated by the background resolver
+        self.ffmpeg_label = QLabel("FFmpeg: checking...")
+        self.ffmpeg_label.setContentsMargins(5, 5, 5, 5)
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.status_label, 1)
+        status_layout.addWidget(self.ffmpeg_label, 0)
+        content_layout.addLayout(status_layout, 0)
 
-        add_shadow(self.enqueue_button)
-        add_shadow(self.download_button)
-        add_shadow(self.cancel_button)
+        # Drop shadows are added by finish_startup, after the first paint
 
         layout.addWidget(content)
         self.setLayout(layout)  # Finalize the layout
 
+    # ---------------- Drop Shadow Effects ----------------
+    def add_shadow(self, widget, color=QColor(0, 0, 0, 100), blur=15, offset=(0, 5)):
+        """Give a widget a drop shadow."""
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(blur)
+        shadow.setColor(color)
+        shadow.setOffset(*offset)
+        widget.setGraphicsEffect(shadow)
+
     def toggle_maximize(self):
         """Toggle between maximized and normal window state."""
         if self.isMaximized():
@@ -494,8 +673,28 @@ class YouTubeDownloader(QWidget):
     # type: ignore[override]  # pylint: disable=invalid-name
     def closeEvent(self, event):
         """Handle window close event, saving settings."""
-        self.settings.setValue("output_folder", self.output_folder)
-        self.tray_icon.hide()
+        if self.persist_settings:
+            self.settings.setValue("output_folder", self.output_folder)
+            self.settings.setValue("max_workers", self.max_workers)
+            self.settings.setValue("bandwidth_limit", self.bandwidth_limit)
+            self.settings.setValue(
+                "segment_connections", self.segment_connections)
+        # Listings still running must not add to the queue or outlive the
+        # window; they stop after their current entry
+        for expander in self.expanders:
+            expander.page_ready.disconnect()
+            expander.listing_finished.disconnect()
+            expander.cancel()
+        for expander in self.expanders:
+            if not expander.wait(EXPANDER_STOP_TIMEOUT):
+                logger.warning(f"Listing {expander.url} did not stop in time")
+        if self.queue_manager:
+            self.queue_manager.metadata_pool.shutdown()
+        if self.download_pool:
+            self.download_pool.shutdown()
+        self.db_writer.close(timeout=5)
+        if self.tray_icon:
+            self.tray_icon.hide()
         if event:
             event.accept()
 
@@ -506,6 +705,10 @@ class YouTubeDownloader(QWidget):
         if folder:
             self.output_folder = folder
             self.saved_folder_label.setText(f"📁 {self.output_folder}")
+            threading.Thread(
+                target=self.scan_archive, args=(folder,), name="archive-scan",
+                daemon=True,
+            ).start()
 
     # ----------------------- Queue -----------------------
     def enqueue_download(self):
@@ -524,10 +727,21 @@ class YouTubeDownloader(QWidget):
                 "- https://youtube.com/watch?v=...\n"
                 "- https://youtu.be/...\n"
                 "- https://youtube.com/shorts/...\n"
-                "- https://youtube.com/live/...",
+                "- https://youtube.com/live/...\n"
+                "- https://youtube.com/playlist?list=...\n"
+                "- https://youtube.com/@channel",
             )
             return
 
+        # Get current format selection
+        selected_format = self.format_quality_combo.currentText()
+        if selected_format.startswith("🎬"):
+            selected_format = ""
+
+        if is_collection_url(url):
+            self.enqueue_collection(url, selected_format)
+            return
+
         # Check for duplicates
         if self.queue_manager and self.queue_manager.has_duplicate(url):
             QMessageBox.warning(
@@ -536,19 +750,32 @@ class YouTubeDownloader(QWidget):
                 "This URL is already in the queue.",
             )
             return
-
-        # Get current format selection
-        selected_format = self.format_quality_combo.currentText()
-        if selected_format.startswith("🎬"):
-            selected_format = ""
+        download_again = False
+        if self.archive and self.archive.contains(url):
+            box = QMessageBox(
+                QMessageBox.Information,
+                "Already Downloaded",
+                "This video has already been downloaded.",
+                QMessageBox.Cancel,
+                self,
+            )
+            again = box.addButton("Download Anyway", QMessageBox.AcceptRole)
+            box.exec_()
+            if box.clickedButton() is not again:
+                return
+            download_again = True
 
         # Create queue item
         queue_item = QueueItem(
             url=url,
             title="Fetching title...",
             format_selection=selected_format,
-            status=QueueStatus.WAITING
+            status=QueueStatus.WAITING,
+            ignore_archive=download_again,
         )
+        if self.pasted_info and self.pasted_info[0] == url:
+            queue_item.info = self.pasted_info[1]
+            self.pasted_info = None
 
         # Add to queue via queue manager
         if self.queue_manager:
@@ -557,146 +784,327 @@ class YouTubeDownloader(QWidget):
         # Clear input
         self.url_input.clear()
 
+    def ask_playlist_options(self) -> PlaylistOptions | None:
+        """Ask which entries of a playlist or channel to queue.
+
+        Returns:
+            The chosen options, or None if the user cancelled
+        """
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Add Playlist")
+        form = QFormLayout(dialog)
+        items_input = QLineEdit()
+        items_input.setPlaceholderText("All (e.g. 1-20,25)")
+        title_input = QLineEdit()
+        title_input.setPlaceholderText("Any title (regex)")
+        duration_spin = QSpinBox()
+        duration_spin.setRange(0, 24 * 60)
+        duration_spin.setSuffix(" min")
+        duration_spin.setSpecialValueText("No limit")
+        form.addRow("Items:", items_input)
+        form.addRow("Title matches:", title_input)
+        form.addRow("Max duration:", duration_spin)
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+
+        while dialog.exec_() == QDialog.Accepted:
+            options = PlaylistOptions(
+                items_input.text().replace(" ", ""),
+                title_input.text().strip(),
+                duration_spin.value() * 60,
+            )
+            try:
+                if options.items:
+                    # pylint: disable=import-outside-toplevel
+                    from yt_dlp.utils import PlaylistEntries
+                    list(PlaylistEntries.parse_playlist_items(options.items))
+                if options.title_filter:
+                    re.compile(options.title_filter)
+                return options
+            except (ValueError, re.error) as e:
+                QMessageBox.warning(self, "Invalid Option", str(e))
+        return None
+
+    def enqueue_collection(self, url: str, selected_format: str):
+        """List a playlist or channel in the background and queue its videos.
+
+        Entries are added page by page while the listing runs; if the queue
+        is downloading, the first entries start right away.
+        """
+        options = self.ask_playlist_options()
+        if options is None:
+            return
+        expander = PlaylistExpander(url, options, selected_format)
+        expander.page_ready.connect(
+            lambda page, e=expander: self.on_playlist_page(e, page))
+        expander.listing_finished.connect(
+            lambda title, count, error, e=expander:
+                self.on_listing_finished(e, title, count, error))
+        self.expanders.append(expander)
+        if self.download_pool:
+            self.download_pool.feed_opened()
+        expander.start()
+        self.url_input.clear()
+        self.status_label.setText("Status: Listing playlist...")
+
+    def on_playlist_page(self, expander: PlaylistExpander, page: list):
+        """Queue one page of playlist entries."""
+        if not self.queue_manager:
+            return
+        added = self.queue_manager.add_items([
+            QueueItem(
+                url=entry.url,
+                title=entry.title or entry.url,
+                format_selection=expander.format_selection,
+                status=QueueStatus.WAITING,
+            )
+            for entry in page
+            if not (self.archive and self.archive.contains(entry.url))
+        ])
+        expander.queued += added
+        if added and self.download_pool and self.download_pool.running:
+            self.download_pool.dispatch()
+
+    def on_listing_finished(
+        self, expander: PlaylistExpander, title: str, count: int, error: str
+    ):
+        """Close a finished playlist listing."""
+        if expander in self.expanders:
+            self.expanders.remove(expander)
+        expander.wait()
+        if self.download_pool:
+            self.download_pool.feed_closed()
+        if error:
+            self.status_label.setText(f"Status: Listing failed: {error}")
+        elif expander.queued < count:
+            # The others were already queued or downloaded
+            self.status_label.setText(
+                f"Status: Queued {expander.queued} of {count} videos "
+                f"from {title}")
+        else:
+            self.status_label.setText(
+                f"Status: Queued {count} videos from {title}")
+
     def start_queue(self):
         """Start downloading all items in the queue."""
-        if not self.queue_manager or self.queue_manager.is_empty():
+        if not self.queue_manager or not self.queue_manager.has_waiting():
             QMessageBox.information(self, "Info", "No URLs in the queue.")
             return
 
-        if not self.downloading:
-            self.download_next()  # Start the first download
-            self.cancel_button.setEnabled(True)
+        if self.download_pool and not self.download_pool.running:
+            if not self.ffmpeg_ready:
+                # Started by on_ffmpeg_resolved / on_ffmpeg_failed
+                self.start_pending = True
+                self.status_label.setText("Status: Waiting for FFmpeg...")
+                return
+
+            if not self.ffmpeg_path:
+                QMessageBox.warning(
+                    self,
+                    "FFmpeg Missing",
+                    "FFmpeg codec not found.\n"
+                    "Please click 'Update FFmpeg Codec' to download it.",
+                )
 
-    def download_next(self):
-        """Download the next URL in the queue."""
-        if not self.queue_manager:
+            self.download_pool.start()
+            self.cancel_button.setEnabled(self.download_pool.running)
+            self.pause_button.setEnabled(self.download_pool.running)
+            self.update_overall_progress()
+
+    # ----------------------- FFmpeg -----------------------
+    def resolve_ffmpeg(self):
+        """Find FFmpeg in the background; the cached location is reused."""
+        self.ffmpeg_resolver = FFmpegResolver(get_ffmpeg_cache_path())
+        self.ffmpeg_resolver.resolved.connect(self.on_ffmpeg_resolved)
+        self.ffmpeg_resolver.failed.connect(self.on_ffmpeg_failed)
+        self.ffmpeg_resolver.start()
+
+    def on_ffmpeg_resolved(self, path: str, version: str):
+        """Use the FFmpeg found by the resolver."""
+        self.ffmpeg_path = path
+        self.ffmpeg_label.setText(f"FFmpeg {version} ✔" if version else "FFmpeg ✔")
+        self.ffmpeg_label.setToolTip(path)
+        self._start_pending_queue()
+
+    def on_ffmpeg_failed(self, error: str):
+        """Show that FFmpeg is missing; downloads run without merging."""
+        self.ffmpeg_label.setText("FFmpeg missing ✖")
+        self.ffmpeg_label.setToolTip(error)
+        self._start_pending_queue()
+
+    def _start_pending_queue(self):
+        self.ffmpeg_ready = True
+        if self.start_pending:
+            self.start_pending = False
+            self.start_queue()
+
+    def set_item_paused(self, item_id: int, paused: bool):
+        """Pause or resume a single queue item."""
+        if not self.queue_manager or not self.download_pool:
             return
-
-        queue_item = self.queue_manager.pop_next()
-        if not queue_item:
-            self.status_label.setText("Status: All downloads complete.")
-            self.downloading = False
+        item = self.queue_manager.get_item(item_id)
+        if not item:
             return
-
-        url = queue_item.url
+        if paused:
+            if item.status == QueueStatus.DOWNLOADING:
+                self.download_pool.pause(item_id)
+            elif item.status != QueueStatus.WAITING:
+                return
+            item.status = QueueStatus.PAUSED
+        else:
+            if item.status != QueueStatus.PAUSED:
+                return
+            if self.download_pool.resume(item_id):
+                item.status = QueueStatus.DOWNLOADING
+            else:
+                self.queue_manager.requeue(item_id)
+                self.download_pool.dispatch()
+        self.queue_manager.refresh_item(item_id)
+
+    def toggle_pause_all(self):
+        """Pause or resume every running download and the dispatcher."""
+        if not self.queue_manager or not self.download_pool:
+            return
+        pausing = not self.download_pool.paused
+        if pausing:
+            self.download_pool.pause_all()
+        else:
+            self.download_pool.resume_all()
+        for item_id in list(self.download_pool.workers):
+            item = self.queue_manager.get_item(item_id)
+            if item:
+                item.status = (
+                    QueueStatus.PAUSED if pausing else QueueStatus.DOWNLOADING)
+                self.queue_manager.refresh_item(item_id)
+        self.pause_button.setText("▶ Resume All" if pausing else "⏸ Pause All")
         self.status_label.setText(
-            f"Status: Downloading {queue_item.title or url}")
-        self.downloading = True
-
-        # --- Use new combined dropdown ---
-        selected_item = self.format_quality_combo.currentText()
-        if "~" in selected_item:
-            selected_item = selected_item.split(" ~")[0]  # remove size suffix
-
-        codes = self.format_map.get(selected_item)
+            "Status: Queue paused" if pausing else "Status: Queue resumed")
+
+    def set_bandwidth_limit(self, index: int):
+        """Apply the selected global bandwidth limit to all downloads."""
+        self.bandwidth_limit = int(self.bandwidth_combo.itemData(index) or 0)
+        governor.set_limit(self.bandwidth_limit)
+
+    def set_max_workers(self, value: int):
+        """Change how many downloads run in parallel."""
+        self.max_workers = value
+        if self.download_pool:
+            self.download_pool.set_max_workers(value)
+
+    def fragment_mode_for(self, preset: str) -> str:
+        """Return the fragment parallelism mode saved for a preset."""
+        default = DEFAULT_FRAGMENT_MODES.get(preset, DEFAULT_FRAGMENT_MODE)
+        mode = str(self.settings.value(f"fragment_mode/{preset}", default))
+        return mode if mode in FRAGMENT_MODES else default
+
+    def show_fragment_mode(self, selection: str):
+        """Show the fragment mode of the preset selected in the dropdown."""
+        mode = self.fragment_mode_for(preset_name(selection))
+        self.fragment_combo.blockSignals(True)
+        self.fragment_combo.setCurrentText(mode)
+        self.fragment_combo.blockSignals(False)
+
+    def set_fragment_mode(self, mode: str):
+        """Save the fragment mode for the preset selected in the dropdown."""
+        preset = preset_name(self.format_quality_combo.currentText())
+        if preset in self.format_map:
+            self.settings.setValue(f"fragment_mode/{preset}", mode)
+
+    def build_ydl_opts(self, queue_item: QueueItem) -> dict:
+        """Build the yt-dlp options for a queue item's selected format."""
+        # --- Use the format chosen when the item was queued ---
+        selected_item = preset_name(
+            queue_item.format_selection
+            or self.format_quality_combo.currentText()
+        )
 
-        # Lazy-load FFmpeg on first download (speeds up app startup)
-        if not self.ffmpeg_path:
-            self.ffmpeg_path = find_ffmpeg()
+        return build_ydl_opts(
+            selected_item,
+            self.output_folder,
+            self.ffmpeg_path,
+            self.fragment_mode_for(selected_item),
+            self.segment_connections,
+        )
 
-        if not self.ffmpeg_path:
-            QMessageBox.warning(
-                self,
-                "FFmpeg Missing",
-                "FFmpeg codec not found.\n"
-                "Please click 'Update FFmpeg Codec' to download it.",
-            )
+    def on_item_progress(self, event: ProgressEvent):
+        """Route a worker's progress event to its queue item."""
+        if not self.queue_manager:
+            return
+        item = self.queue_manager.get_item(event.item_id)
+        if item:
+            item.progress = event.percent
+            item.status_text = describe_progress(event)
+            item.partial_path = event.partial_path or item.partial_path
+            self.queue_manager.refresh_item(event.item_id)
+            self.update_overall_progress()
+
+    def on_item_status(self, item_id: int, message: str):
+        """Route a worker's status line to its queue item."""
+        if not self.queue_manager:
+            return
+        item = self.queue_manager.get_item(item_id)
+        if item:
+            item.status_text = message
+            self.queue_manager.refresh_item(item_id)
+
+    def update_overall_progress(self):
+        """Show the average progress of all running downloads."""
+        if not self.queue_manager or not self.download_pool:
+            return
+        active = [
+            item
+            for item_id in self.download_pool.workers
+            if (item := self.queue_manager.get_item(item_id))
+        ]
+        processing = len(self.download_pool.processing_ids)
+        if not active:
+            if processing:
+                self.status_label.setText(
+                    f"Status: Processing {processing} item(s)")
+            return
+        self.progress_bar.setValue(
+            sum(item.progress for item in active) // len(active))
+        self.status_label.setText(
+            f"Status: Downloading {len(active)} item(s) "
+            f"({self.download_pool.max_workers} slots)"
+            + (f", processing {processing}" if processing else ""))
 
-        ydl_opts = {
-            "outtmpl": os.path.join(self.output_folder, "%(title).200B.%(ext)s"),
-            "restrictfilenames": True,  # Sanitize filenames to prevent path traversal
-            "quiet": True,
-            "noprogress": False,  # enables the progress hooks
-            # <-- directory only
-            "ffmpeg_location": (
-                os.path.dirname(self.ffmpeg_path) if self.ffmpeg_path else None
-            ),
-            "logger": logger,
-            "continuedl": True,
-            "retries": 10,
-            "fragment_retries": 10,
-            "max_retries": 3,
-        }
-
-        # --- Map selection to yt-dlp format codes ---
-        if selected_item == "Super High WebM":
-            ydl_opts["format"] = "bestvideo+bestaudio/best"
-        elif selected_item == "Audio Only (MP3)":
-            ydl_opts["format"] = "bestaudio/best"
-            ydl_opts["postprocessors"] = [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }
-            ]
-        else:
-            # Use flexible format selection with fallback
-            # Instead of hardcoded format IDs, use quality-based selection
-            if isinstance(codes, dict):
-                # Try specific format codes first, but fall back to quality selector
-                video_code = codes.get("video", "")
-                audio_code = codes.get("audio", "")
-
-                # Determine target resolution from selection
-                if "1080p" in selected_item:
-                    quality_fallback = (
-                        "bestvideo[height<=1080]+bestaudio/"
-                        "best[height<=1080]"
-                    )
-                elif "720p" in selected_item:
-                    quality_fallback = (
-                        "bestvideo[height<=720]+bestaudio/"
-                        "best[height<=720]"
-                    )
-                else:
-                    quality_fallback = "bestvideo+bestaudio/best"
-
-                # Try specific codes first, then fall back
-                if video_code and audio_code:
-                    ydl_opts["format"] = f"{video_code}+{audio_code}/{quality_fallback}"
-                else:
-                    ydl_opts["format"] = quality_fallback
-
-        # Start download thread
-        self.download_thread = DownloadThread(url, ydl_opts)
-        self.download_thread.progress.connect(self.progress_bar.setValue)
-        self.download_thread.status.connect(self.status_label.setText)
-        self.download_thread.finished.connect(self.download_finished)
-        self.download_thread.start()
-
-    def download_thread_hook(self, d):
-        """Hook for yt-dlp progress updates during download."""
-        if d["status"] == "downloading":
-            total = d.get("total_bytes") or d.get("total_bytes_estimate", 0)
-            downloaded = d.get("downloaded_bytes", 0)
-            if total > 0:
-                progress = int(downloaded / total * 100)
-                if self.download_thread:
-                    self.download_thread.progress.emit(progress)
-
-    def download_finished(self, _success, message, url, title, path, status):
+    def download_finished(
+        self, item_id, success, message, url, title, path, status, notes
+    ):
         """Handle download completion and record to history."""
-        self.downloading = False
-        with DatabaseManager(self.db_path) as db:
-            db.record_history(url, title, path, status)
-        self.progress_bar.setValue(0)
-        self.cancel_button.setEnabled(False)
+        self.db_writer.record_history(url, title, path, status, notes)
+        if self.archive and status == "Completed":
+            self.archive.add(url, title, path)
+        if self.queue_manager:
+            self.queue_manager.mark_finished(item_id, success, message)
 
         # Check if file already existed
         if "has already been downloaded" in message:
             self.status_label.setText("Status: File already downloaded")
         else:
             self.status_label.setText(f"Status: {message}")
+        self.update_overall_progress()
 
-        QTimer.singleShot(100, self.download_next)
+    def on_all_finished(self):
+        """Reset the controls once every worker is idle."""
+        self.progress_bar.setValue(0)
+        self.cancel_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.pause_button.setText("⏸ Pause All")
+        self.status_label.setText("Status: All downloads complete.")
 
     def cancel_download(self):
-        """Cancel the currently running download."""
-        if self.download_thread and self.download_thread.isRunning():
-            self.download_thread.cancel()
+        """Cancel all running downloads."""
+        if self.download_pool and self.download_pool.active_count():
+            self.download_pool.cancel_all()
             self.status_label.setText("Status: Cancel requested...")
             self.cancel_button.setEnabled(False)
+            self.pause_button.setEnabled(False)
+            self.pause_button.setText("⏸ Pause All")
 
 
 # ----------------------- Main -----------------------
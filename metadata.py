@@ -0,0 +1,291 @@
+"""Helpers for extracting video metadata once and reusing it.
+
+A single yt-dlp extraction produces everything the app needs about a video:
+its title, the format table used for the size preview and the stream URLs
+used for the download itself. The helpers here return that result in a form
+that can be handed back to ``YoutubeDL.process_ie_result`` later, and tell
+whether its stream URLs are still usable. When a MetadataCache is configured,
+results are also persisted across sessions.
+
+Concurrent requests for the same video share a single extraction, and
+definitive failures (private or removed videos) are remembered for a few
+minutes so repeated attempts fail without touching the network.
+
+yt-dlp is only imported once something has to be extracted, so importing
+this module stays cheap at startup.
+"""
+import re
+import threading
+import time
+
+from metadata_cache import CachedMetadata, MetadataCache
+from url_parser import parse_url
+
+EXTRACT_OPTS = {
+    "quiet": True,
+    "skip_download": True,
+    "no_warnings": True,
+}
+
+# Don't start a download from stream URLs that expire within this window
+EXPIRY_MARGIN = 30 * 60
+# Cached or prefetched stream URLs must stay valid this long, so they are
+# still fresh when the item reaches a download slot
+PREFETCH_MARGIN = 2 * EXPIRY_MARGIN
+# Assumed lifetime of stream URLs that don't advertise an expiry
+DEFAULT_STREAM_TTL = 5 * 60 * 60
+# How long a definitive extraction failure is remembered
+NEGATIVE_TTL = 10 * 60
+
+# Error messages meaning the video can't be extracted no matter how often
+# we ask
+PERMANENT_ERRORS = (
+    "video unavailable",
+    "private video",
+    "this video has been removed",
+    "this video is no longer available",
+    "account associated with this video has been terminated",
+    "members-only",
+    "unsupported url",
+    "incomplete youtube id",
+)
+
+_EXPIRE_RE = re.compile(r"[?&/]expire[=/](\d+)")
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+_cache: MetadataCache | None = None
+
+
+class _Flight:
+    """An extraction in progress that other callers can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.info: dict | None = None
+        self.error: BaseException | None = None
+
+
+_flights: dict[str, _Flight] = {}
+_failures: dict[str, tuple[float, str]] = {}  # key -> (expires, message)
+_flights_lock = threading.Lock()
+
+
+def configure_cache(cache: MetadataCache | None):
+    """Set the persistent cache used by :func:`extract_info` and :func:`lookup`.
+
+    Args:
+        cache: The cache to use, or None to disable caching
+    """
+    global _cache  # pylint: disable=global-statement
+    _cache = cache
+
+
+def video_id_from_url(url: str) -> str | None:
+    """Return the canonical YouTube video ID of a URL, if it names one.
+
+    Args:
+        url: A watch, shorts, live, embed or youtu.be URL
+
+    Returns:
+        The 11-character video ID, or None
+    """
+    parsed = parse_url(url)
+    return parsed.video_id if parsed else None
+
+
+def canonical_key(url: str) -> str:
+    """Return the key identifying the video behind a URL.
+
+    ``youtu.be/X``, ``watch?v=X&t=30`` and ``shorts/X`` all share the key
+    ``X``; URLs that name no video ID are keyed by themselves.
+
+    Args:
+        url: Any queued URL
+
+    Returns:
+        The video ID, or the stripped URL
+    """
+    return video_id_from_url(url) or url.strip()
+
+
+def lookup(url: str) -> CachedMetadata | None:
+    """Return what the persistent cache knows about a URL, without network.
+
+    Args:
+        url: Video URL
+
+    Returns:
+        Cached metadata, or None if the video is not cached
+    """
+    video_id = video_id_from_url(url)
+    if not _cache or not video_id:
+        return None
+    return _cache.get(video_id)
+
+
+def is_permanent_error(message: str) -> bool:
+    """Check whether an extraction error will repeat on every attempt.
+
+    Args:
+        message: Error message raised by yt-dlp
+
+    Returns:
+        True for unavailable, private or removed videos and unusable URLs
+    """
+    message = message.lower()
+    return any(marker in message for marker in PERMANENT_ERRORS)
+
+
+def extract_info(url: str, refresh: bool = False) -> dict | None:
+    """Extract metadata for a URL without downloading anything.
+
+    Callers asking for the same video at the same time share one
+    extraction, and a recent definitive failure is raised again without
+    network access.
+
+    Args:
+        url: Video URL to extract
+        refresh: Ignore the persistent cache (e.g. after a stream URL
+            turned out to be stale)
+
+    Returns:
+        A sanitized info dict that can be fed to ``process_ie_result``,
+        or None if yt-dlp returned nothing.
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the extraction failed.
+    """
+    key = video_id_from_url(url) or url
+    with _flights_lock:
+        failure = _failures.get(key)
+        if failure and failure[0] > time.time():
+            # pylint: disable=import-outside-toplevel
+            from yt_dlp.utils import DownloadError
+            raise DownloadError(failure[1])
+        _failures.pop(key, None)
+
+    if not refresh:
+        cached = lookup(url)
+        if cached and is_fresh(cached.info, PREFETCH_MARGIN):
+            return cached.info
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if flight is None:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error:
+            raise flight.error
+        return flight.info
+
+    try:
+        flight.info = _extract(url)
+        return flight.info
+    except Exception as e:
+        flight.error = e
+        if is_permanent_error(str(e)):
+            now = time.time()
+            with _flights_lock:
+                for expired in [k for k, (expires, _) in _failures.items()
+                                if expires <= now]:
+                    del _failures[expired]
+                _failures[key] = (now + NEGATIVE_TTL, str(e))
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def _extract(url: str) -> dict | None:
+    """Run yt-dlp and store the result in the persistent cache."""
+    import yt_dlp  # pylint: disable=import-outside-toplevel
+
+    with yt_dlp.YoutubeDL(EXTRACT_OPTS) as ydl:  # type: ignore[arg-type]
+        info = ydl.extract_info(url, download=False)
+    if not info:
+        return None
+    # Drop the format selection made for the default format so the
+    # download can select again with its own options
+    info = yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+
+    video_id = info.get("id")
+    if _cache and isinstance(video_id, str) and _VIDEO_ID_RE.match(video_id):
+        _cache.put(video_id, info, format_sizes(info), stream_expiry(info))
+    return info
+
+
+def stream_expiry(info: dict) -> float:
+    """Return the UNIX time at which the info's stream URLs stop working.
+
+    Args:
+        info: Info dict returned by :func:`extract_info`
+
+    Returns:
+        The earliest expiry advertised by any format URL, or the extraction
+        time plus DEFAULT_STREAM_TTL if none is advertised.
+    """
+    expiries = []
+    for fmt in info.get("formats") or [info]:
+        for key in ("url", "manifest_url"):
+            match = _EXPIRE_RE.search(fmt.get(key) or "")
+            if match:
+                expiries.append(int(match.group(1)))
+    if expiries:
+        return float(min(expiries))
+    return float(info.get("epoch") or 0) + DEFAULT_STREAM_TTL
+
+
+def is_fresh(info: dict | None, margin: float = EXPIRY_MARGIN) -> bool:
+    """Check whether an info dict can still be used to start a download.
+
+    Args:
+        info: Info dict returned by :func:`extract_info`, or None
+        margin: Seconds of validity the stream URLs must still have
+
+    Returns:
+        True if the stream URLs stay valid for at least ``margin`` seconds
+    """
+    if not info:
+        return False
+    return stream_expiry(info) > time.time() + margin
+
+
+def format_sizes(info: dict) -> list[dict]:
+    """Build the format size table shown in the format dropdown.
+
+    Args:
+        info: Info dict returned by :func:`extract_info`
+
+    Returns:
+        List of dicts with format_id, ext, resolution and size_mb keys
+    """
+    formats_list = []
+    duration = info.get("duration")
+    for f in info.get("formats") or []:
+        fmt_id = f["format_id"]
+        ext = f["ext"]
+        res = f.get("height") or "audio"
+
+        # Calculate approximate size
+        size = f.get("filesize") or f.get("filesize_approx")
+        if not size:
+            tbr = f.get("tbr")  # total bitrate in kbps
+            if duration and tbr:
+                size = duration * tbr * 1000 / 8  # convert kbps * sec → bytes
+
+        # ensure numeric
+        size_mb = round(size / (1024 * 1024), 1) if size else 0
+
+        formats_list.append(
+            {
+                "format_id": fmt_id,
+                "ext": ext,
+                "resolution": res,
+                "size_mb": size_mb,
+            }
+        )
+    return formats_list
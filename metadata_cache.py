@@ -0,0 +1,194 @@
+"""Persistent on-disk cache of video metadata.
+
+This module provides a MetadataCache class that keeps yt-dlp extraction
+results in an SQLite file next to the download history database, keyed by
+video ID. Stable fields (title, duration, format table) are kept for weeks,
+while the full info dict with its short-lived stream URLs expires with them.
+The cache is bounded in size and evicts the least recently used videos.
+
+Lookups only read the database, so they are cheap enough for the GUI
+thread; access times are kept in memory and written with the next put(),
+which is also when expired entries are cleaned up.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+# How long titles, durations and format tables are trusted
+STABLE_TTL = 30 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class CachedMetadata:
+    """Metadata known about a video without touching the network."""
+    video_id: str
+    title: str
+    duration: float | None
+    formats: list[dict]
+    info: dict | None = None  # None once the stream URLs have expired
+
+
+class MetadataCache:
+    """SQLite-backed metadata cache with TTLs and LRU eviction."""
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            db_path (str): Path to the cache database file.
+            max_bytes (int): Size cap for the stored entries.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        # video_id -> last access not written yet
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            # Lookups keep reading while a worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metadata (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    duration REAL,
+                    stable TEXT,
+                    stable_fetched REAL,
+                    info BLOB,
+                    info_expires REAL,
+                    size INTEGER,
+                    last_access REAL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metadata_last_access "
+                "ON metadata (last_access)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the cache usable from
+        # any worker thread
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, video_id: str) -> CachedMetadata | None:
+        """Look up a video, leaving out whatever part of it has expired.
+
+        Args:
+            video_id (str): Canonical video ID.
+
+        Returns:
+            The cached metadata, or None if the video is unknown, its
+            stable fields are too old or its entry can't be read.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT title, duration, stable, stable_fetched, info, "
+                "info_expires FROM metadata WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        title, duration, stable, fetched, blob, expires = row
+        if fetched + STABLE_TTL < now:
+            return None
+        try:
+            formats = json.loads(stable)["formats"]
+        except (ValueError, TypeError, KeyError):
+            return None
+        info = None
+        if blob is not None and expires > now:
+            try:
+                info = json.loads(zlib.decompress(blob))
+            except (zlib.error, ValueError):
+                info = None  # corrupt; the next extraction replaces it
+
+        with self._lock:
+            self._accessed[video_id] = now
+        return CachedMetadata(
+            video_id=video_id,
+            title=title,
+            duration=duration,
+            formats=formats,
+            info=info,
+        )
+
+    def put(self, video_id: str, info: dict, formats: list[dict],
+            info_expires: float):
+        """Store a fresh extraction result.
+
+        Args:
+            video_id (str): Canonical video ID.
+            info (dict): Sanitized yt-dlp info dict.
+            formats (list): Format size table derived from the info dict.
+            info_expires (float): UNIX time at which the stream URLs expire.
+        """
+        now = time.time()
+        stable = json.dumps({"formats": formats})
+        blob = zlib.compress(json.dumps(info).encode("utf-8"))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO metadata (video_id, title, "
+                    "duration, stable, stable_fetched, info, info_expires, "
+                    "size, last_access) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        video_id,
+                        info.get("title") or "",
+                        info.get("duration"),
+                        stable,
+                        now,
+                        blob,
+                        info_expires,
+                        len(stable) + len(blob),
+                        now,
+                    ),
+                )
+                self._write_accesses(conn)
+                self._prune(conn, now)
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def _write_accesses(self, conn: sqlite3.Connection):
+        """Write the access times recorded by get() since the last put."""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        conn.executemany(
+            "UPDATE metadata SET last_access = ? WHERE video_id = ?",
+            [(when, video_id) for video_id, when in accessed.items()],
+        )
+
+    @staticmethod
+    def _prune(conn: sqlite3.Connection, now: float):
+        """Delete stale entries and the info dicts whose URLs are dead."""
+        conn.execute(
+            "DELETE FROM metadata WHERE stable_fetched < ?",
+            (now - STABLE_TTL,))
+        conn.execute(
+            "UPDATE metadata SET info = NULL, size = LENGTH(stable) "
+            "WHERE info IS NOT NULL AND info_expires <= ?",
+            (now,))
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries until under the size cap."""
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM metadata").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT video_id, size FROM metadata ORDER BY last_access")
+        doomed = []
+        for video_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((video_id,))
+            total -= size
+        conn.executemany("DELETE FROM metadata WHERE video_id = ?", doomed)
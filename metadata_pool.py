@@ -0,0 +1,141 @@
+"""Bounded worker pool for background metadata extraction.
+
+This module provides a MetadataWorkerPool that runs metadata extractions on
+a fixed number of threads fed from a pending queue. Pending requests can be
+cancelled, and completed results are collected so the UI can pick them up in
+batches instead of handling one signal per URL.
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+import metadata
+
+DEFAULT_METADATA_WORKERS = 4
+
+
+@dataclass
+class MetadataResult:
+    """Outcome of one metadata extraction."""
+    url: str
+    info: dict | None = None
+    error: str = ""
+
+
+class MetadataWorkerPool:
+    """Runs metadata extractions on a fixed number of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_METADATA_WORKERS,
+        fetch: Callable[[str], dict | None] = metadata.extract_info,
+    ):
+        """Initialize the pool. Threads are started on first use.
+
+        Args:
+            workers (int): Maximum number of concurrent extractions.
+            fetch (callable): Function extracting the info dict for a URL.
+        """
+        self.workers = max(1, workers)
+        self.fetch = fetch
+        self._pending: deque[str] = deque()
+        # Same URLs as _pending, for constant-time membership checks
+        self._pending_set: set[str] = set()
+        self._in_flight: set[str] = set()
+        self._results: list[MetadataResult] = []
+        self._threads: list[threading.Thread] = []
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def submit(self, url: str, urgent: bool = False):
+        """Queue a URL for extraction unless it is already queued or running.
+
+        Args:
+            url (str): Video URL to extract.
+            urgent (bool): Put the URL at the front of the pending queue.
+        """
+        with self._cond:
+            if url in self._in_flight:
+                return
+            if url in self._pending_set:
+                if not urgent:
+                    return
+                # Rare: a prefetch moving an already queued URL forward
+                self._pending.remove(url)
+            self._pending_set.add(url)
+            if urgent:
+                self._pending.appendleft(url)
+            else:
+                self._pending.append(url)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name="metadata-worker", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+
+    def cancel(self, url: str) -> bool:
+        """Drop a URL from the pending queue.
+
+        Extractions that already started run to completion; their result
+        is simply never routed anywhere.
+
+        Args:
+            url (str): Video URL to cancel.
+
+        Returns:
+            bool: True if the URL was still pending.
+        """
+        with self._cond:
+            if url not in self._pending_set:
+                return False
+            self._pending_set.discard(url)
+            self._pending.remove(url)
+            return True
+
+    def is_busy(self, url: str) -> bool:
+        """Return True if the URL is pending or being extracted."""
+        with self._cond:
+            return url in self._in_flight or url in self._pending_set
+
+    def has_work(self) -> bool:
+        """Return True while anything is pending, running or undelivered."""
+        with self._cond:
+            return bool(self._pending or self._in_flight or self._results)
+
+    def drain(self) -> list[MetadataResult]:
+        """Take every result completed since the previous call."""
+        with self._cond:
+            results, self._results = self._results, []
+            return results
+
+    def shutdown(self):
+        """Discard pending work and let the worker threads exit."""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._pending_set.clear()
+            self._cond.notify_all()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                url = self._pending.popleft()
+                self._pending_set.discard(url)
+                self._in_flight.add(url)
+
+            try:
+                info = self.fetch(url)
+                result = MetadataResult(
+                    url, info, "" if info else "No video info found")
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                result = MetadataResult(url, error=str(e))
+
+            with self._cond:
+                self._in_flight.discard(url)
+                self._results.append(result)
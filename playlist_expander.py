@@ -0,0 +1,81 @@
+"""Background expansion of playlist and channel URLs into queue entries.
+
+This module provides a PlaylistExpander thread that runs a PlaylistListing
+(see playlist_listing.py) and emits its entries in small pages, so the
+queue can start downloading the first videos while the rest are still
+being listed.
+"""
+import time
+
+from loguru import logger
+from PyQt5.QtCore import QThread, pyqtSignal  # pylint: disable=no-name-in-module
+
+from playlist_listing import PlaylistEntry, PlaylistListing, PlaylistOptions
+
+# Entries per page handed to the queue
+PAGE_SIZE = 50
+# A partial page is handed over after this long, so the first downloads
+# don't wait for a slow listing to fill a whole page
+PAGE_INTERVAL = 0.5
+
+
+class PlaylistExpander(QThread):
+    """Background thread listing a playlist or channel page by page."""
+
+    # Signal emitted for every page of entries: (list[PlaylistEntry])
+    page_ready = pyqtSignal(object)
+    # Signal emitted at the end: (playlist title, entries listed, error)
+    listing_finished = pyqtSignal(str, int, str)
+
+    def __init__(self, url: str, options: PlaylistOptions | None = None,
+                 format_selection: str = ""):
+        """Initialize the expander.
+
+        Args:
+            url: Playlist or channel URL
+            options: Range and filters applied to the entries
+            format_selection: Format preset the entries are queued with
+        """
+        super().__init__()
+        self.url = url
+        self.listing = PlaylistListing(url, options)
+        self.format_selection = format_selection
+        # Entries that made it into the queue, counted by the receiver
+        self.queued = 0
+        self._cancelled = False
+        self._page: list[PlaylistEntry] = []
+        self._page_started = 0.0
+        self._count = 0
+
+    def cancel(self):
+        """Stop listing after the current entry."""
+        self._cancelled = True
+
+    def run(self):
+        """List the URL and emit its entries in pages."""
+        error = ""
+        try:
+            for entry in self.listing.entries(lambda: self._cancelled):
+                self._add(entry)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Listing {self.url} failed: {e}")
+            error = str(e)
+        self._flush()
+        self.listing_finished.emit(self.listing.title, self._count, error)
+
+    def _add(self, entry: PlaylistEntry):
+        """Add an entry to the current page, handing it over when due."""
+        if not self._page:
+            self._page_started = time.monotonic()
+        self._page.append(entry)
+        self._count += 1
+        # The first entry goes out on its own so its download can start
+        if (self._count == 1 or len(self._page) >= PAGE_SIZE
+                or time.monotonic() - self._page_started >= PAGE_INTERVAL):
+            self._flush()
+
+    def _flush(self):
+        """Emit the current page, if any."""
+        if self._page:
+            page, self._page = self._page, []
+            self.page_ready.emit(page)
@@ -0,0 +1,148 @@
+"""Lazy listing of playlist and channel URLs, without GUI dependencies.
+
+This module lists a playlist or channel with yt-dlp's flat extraction:
+entries are read page by page as yt-dlp follows the listing's
+continuations, and only their ID, title and duration are looked at. Range
+and filter options are applied to the flat entries, so videos that won't
+be downloaded are never resolved.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import metadata
+from url_parser import parse_url
+
+# How deep channel tabs (Videos, Shorts, Live) are followed
+MAX_NESTING = 2
+
+FLAT_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "extract_flat": "in_playlist",
+    "lazy_playlist": True,
+}
+
+
+def is_collection_url(url: str) -> bool:
+    """Check whether a URL names a playlist or a channel.
+
+    Args:
+        url: URL entered or pasted by the user
+
+    Returns:
+        True for playlist, @handle, channel, c/ and user/ URLs
+    """
+    parsed = parse_url(url)
+    return parsed is not None and parsed.is_collection
+
+
+@dataclass
+class PlaylistOptions:
+    """Which entries of a playlist to queue."""
+    items: str = ""  # yt-dlp playlist_items syntax, e.g. "1-20,25"
+    title_filter: str = ""  # regex the title must match
+    max_duration: int = 0  # seconds; 0 means no limit
+
+    def ydl_params(self) -> dict:
+        """Return the yt-dlp options selecting the range of entries."""
+        return {"playlist_items": self.items} if self.items else {}
+
+    def accepts(self, entry: dict) -> bool:
+        """Check a flat entry against the title and duration filters.
+
+        Entries whose duration is unknown are kept.
+
+        Args:
+            entry: Flat playlist entry as listed by yt-dlp
+        """
+        if self.title_filter and not re.search(
+                self.title_filter, entry.get("title") or "", re.IGNORECASE):
+            return False
+        duration = entry.get("duration")
+        return not (self.max_duration and duration is not None
+                    and duration > self.max_duration)
+
+
+@dataclass
+class PlaylistEntry:
+    """One video listed by a playlist."""
+    url: str
+    title: str
+    index: int
+    duration: float | None = None
+
+
+class PlaylistListing:
+    """Lists the videos of a playlist or channel as they are fetched."""
+
+    def __init__(self, url: str, options: PlaylistOptions | None = None):
+        """Initialize the listing.
+
+        Args:
+            url: Playlist or channel URL
+            options: Range and filters applied to the entries
+        """
+        self.url = url
+        self.options = options or PlaylistOptions()
+        self.title = ""  # known once the first page has been fetched
+
+    def entries(
+        self, cancelled: Callable[[], bool] = lambda: False
+    ) -> Iterator[PlaylistEntry]:
+        """Yield the selected videos, fetching pages only as needed.
+
+        Args:
+            cancelled: Checked between entries to stop listing
+
+        Raises:
+            yt_dlp.utils.DownloadError: If the listing failed.
+        """
+        import yt_dlp  # pylint: disable=import-outside-toplevel
+
+        params = {**FLAT_OPTS, **self.options.ydl_params()}
+        # type: ignore[arg-type]
+        with yt_dlp.YoutubeDL(params) as ydl:
+            yield from self._expand(ydl, self.url, 0, cancelled)
+
+    def _expand(self, ydl, url: str, depth: int, cancelled):
+        """List one playlist, following nested tabs up to MAX_NESTING."""
+        # pylint: disable=import-outside-toplevel
+        from yt_dlp.utils import PlaylistEntries
+
+        # process=False returns the entries as a lazy generator instead of
+        # resolving every one of them up front
+        result = ydl.extract_info(url, download=False, process=False)
+        while result and result.get("_type") in ("url", "url_transparent"):
+            result = ydl.extract_info(
+                result["url"], download=False, process=False,
+                ie_key=result.get("ie_key"))
+        if not result or "entries" not in result:
+            return
+        if not self.title:
+            self.title = result.get("title") or url
+
+        # Range selection is lazy: entries past the range are never listed
+        for index, entry in PlaylistEntries(ydl, result).get_requested_items():
+            if cancelled():
+                return
+            if not entry:
+                continue
+            entry_url = entry.get("url") or entry.get("webpage_url") or ""
+            video_id = metadata.video_id_from_url(entry_url) or (
+                entry.get("id") if entry.get("ie_key") == "Youtube" else None)
+            if not video_id:
+                if entry.get("_type") in ("url", "playlist") and (
+                        depth < MAX_NESTING and entry_url):
+                    yield from self._expand(
+                        ydl, entry_url, depth + 1, cancelled)
+                continue
+            if not self.options.accepts(entry):
+                continue
+            yield PlaylistEntry(
+                f"https://www.youtube.com/watch?v={video_id}",
+                entry.get("title") or "",
+                index,
+                entry.get("duration"),
+            )
@@ -0,0 +1,73 @@
+"""Post-processing stage shared by the GUI and the command line.
+
+Merging video and audio or converting to MP3 keeps the CPU busy but not
+the network. Download workers hand jobs whose streams are on disk to this
+stage (see DownloadJob.needs_processing) and move on to the next item,
+while a pool sized to the CPU count runs FFmpeg.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from download_engine import DownloadJob, DownloadResult
+
+# Each job runs in its own FFmpeg process. Audio encoders such as LAME use a
+# single core, so one job per core keeps them all busy; remuxes are mostly
+# disk-bound and finish quickly either way.
+DEFAULT_PROCESSING_WORKERS = max(1, os.cpu_count() or 1)
+
+
+class ProcessingStage:
+    """Runs deferred post-processing on a bounded pool of threads."""
+
+    def __init__(self, max_workers: int = DEFAULT_PROCESSING_WORKERS):
+        """Initialize the stage.
+
+        Args:
+            max_workers: Number of jobs processed at once; the others wait
+                in the pool's queue
+        """
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="postprocess")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        job: "DownloadJob",
+        on_done: Callable[["DownloadResult"], None],
+    ) -> Future:
+        """Queue a job's post-processing.
+
+        Args:
+            job: Job whose run() left post-processing pending
+            on_done: Called on a pool thread with the final result
+        """
+        with self._lock:
+            self._pending += 1
+
+        def work():
+            try:
+                on_done(job.process())
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+        return self._executor.submit(work)
+
+    def pending_count(self) -> int:
+        """Return the number of jobs queued or being processed."""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop accepting jobs, by default waiting for the queued ones.
+
+        Args:
+            wait: Block until the jobs still to run are done
+            cancel_futures: Drop the jobs that haven't started yet
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
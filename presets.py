@@ -0,0 +1,128 @@
+"""Format presets and the yt-dlp options they translate to.
+
+This module holds the format presets offered in the GUI's format dropdown
+and by the command line, and builds the yt-dlp options for a download with
+a given preset. It has no GUI dependencies.
+"""
+import os
+
+from loguru import logger
+
+from fragment_tuning import DEFAULT_FRAGMENT_MODE
+from segmented_download import DEFAULT_CONNECTIONS
+
+# -------------video + audio codec number defined here
+FORMAT_PRESETS = {
+    "Mp4-High (720p)": {"video": "136", "audio": "140"},
+    "Mp4-HD (1080p)": {"video": "137", "audio": "251"},
+    "Mkv-High (720p)": {"video": "247", "audio": "251"},
+    "Mkv-HD (1080p)": {"video": "248", "audio": "251"},
+    "WebM-High (720p)": {"video": "247", "audio": "251"},
+    "WebM-HD (1080p)": {"video": "248", "audio": "251"},
+    "Super High WebM": "bestvideo+bestaudio",
+    "Audio Only (MP3)": "bestaudio",
+    "Audio Only (M4A)": "bestaudio",
+}
+
+
+def preset_name(selection: str) -> str:
+    """Return the preset name of a format dropdown entry."""
+    if "~" in selection:
+        selection = selection.split(" ~")[0]  # remove size suffix
+    return selection.strip()
+
+
+def build_ydl_opts(
+    preset: str,
+    output_folder: str,
+    ffmpeg_path: str | None = None,
+    fragment_mode: str = DEFAULT_FRAGMENT_MODE,
+    segment_connections: int = DEFAULT_CONNECTIONS,
+) -> dict:
+    """Build the yt-dlp options for a download with the given preset.
+
+    Args:
+        preset: Name of a FORMAT_PRESETS entry; anything else leaves the
+            format choice to yt-dlp
+        output_folder: Folder the file is saved to
+        ffmpeg_path: Path of the FFmpeg executable, if known
+        fragment_mode: Fragment parallelism mode for DASH/HLS formats
+        segment_connections: Byte ranges fetched in parallel for
+            non-fragmented formats (1 disables segmenting)
+
+    Returns:
+        The options dict passed to DownloadThread / DownloadJob
+    """
+    codes = FORMAT_PRESETS.get(preset)
+
+    ydl_opts = {
+        "outtmpl": os.path.join(output_folder, "%(title).200B.%(ext)s"),
+        "restrictfilenames": True,  # Sanitize filenames to prevent path traversal
+        "quiet": True,
+        "noprogress": False,  # enables the progress hooks
+        # <-- directory only
+        "ffmpeg_location": (
+            os.path.dirname(ffmpeg_path) if ffmpeg_path else None
+        ),
+        "logger": logger,
+        "continuedl": True,
+        "retries": 10,
+        "fragment_retries": 10,
+        "max_retries": 3,
+        # Tuned to the fragment count by the download engine
+        "fragment_mode": fragment_mode,
+        # Byte ranges fetched in parallel for non-fragmented formats
+        "segment_connections": segment_connections,
+    }
+
+    # --- Map selection to yt-dlp format codes ---
+    if preset == "Super High WebM":
+        ydl_opts["format"] = "bestvideo+bestaudio/best"
+    elif preset == "Audio Only (MP3)":
+        ydl_opts["format"] = "bestaudio/best"
+        ydl_opts["postprocessors"] = [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }
+        ]
+    elif preset == "Audio Only (M4A)":
+        # YouTube's m4a streams are AAC already: kept as they are, without
+        # re-encoding. Other sources are converted to AAC.
+        ydl_opts["format"] = "bestaudio[ext=m4a]/bestaudio/best"
+        ydl_opts["postprocessors"] = [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "m4a",
+            }
+        ]
+    else:
+        # Use flexible format selection with fallback
+        # Instead of hardcoded format IDs, use quality-based selection
+        if isinstance(codes, dict):
+            # Try specific format codes first, but fall back to quality selector
+            video_code = codes.get("video", "")
+            audio_code = codes.get("audio", "")
+
+            # Determine target resolution from selection
+            if "1080p" in preset:
+                quality_fallback = (
+                    "bestvideo[height<=1080]+bestaudio/"
+                    "best[height<=1080]"
+                )
+            elif "720p" in preset:
+                quality_fallback = (
+                    "bestvideo[height<=720]+bestaudio/"
+                    "best[height<=720]"
+                )
+            else:
+                quality_fallback = "bestvideo+bestaudio/best"
+
+            # Try specific codes first, then fall back
+            if video_code and audio_code:
+                ydl_opts["format"] = f"{video_code}+{audio_code}/{quality_fallback}"
+            else:
+                ydl_opts["format"] = quality_fallback
+
+    return ydl_opts
@@ -0,0 +1,136 @@
+"""Structured, rate-limited download progress reporting.
+
+Download workers describe their progress with a compact ProgressEvent and
+push it through a ProgressCoalescer, which forwards at most a fixed number
+of events per second and sends the last one held back when asked. Turning
+events into text is left to the GUI side via the formatting helpers at the
+bottom of this module.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+DEFAULT_MAX_RATE_HZ = 10
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Snapshot of one download's progress."""
+    item_id: int
+    downloaded: int
+    total: int | None = None
+    speed: float | None = None  # bytes/sec
+    eta: float | None = None  # seconds remaining
+    fragment_index: int | None = None  # fragmented (DASH/HLS) formats only
+    fragment_count: int | None = None
+    fragment_workers: int = 1  # fragments fetched in parallel
+    partial_path: str = ""  # file being written, kept if interrupted
+
+    @property
+    def percent(self) -> int:
+        """Progress clamped to 0-100 (0 while the size is unknown)."""
+        if not self.total:
+            return 0
+        return min(max(int(self.downloaded * 100 / self.total), 0), 100)
+
+
+class ProgressCoalescer:
+    """Forwards progress hook calls at no more than a fixed rate.
+
+    yt-dlp calls progress hooks once per received chunk. A call is forwarded
+    if the previous one was forwarded at least an interval ago, and dropped
+    otherwise; the last dropped call is kept until flush() sends it, e.g.
+    when the transfer pauses or stops, so the UI never stays behind.
+    """
+
+    def __init__(
+        self,
+        item_id: int,
+        emit: Callable[[ProgressEvent], None],
+        max_rate_hz: float = DEFAULT_MAX_RATE_HZ,
+    ):
+        """Initialize the coalescer.
+
+        Args:
+            item_id: Queue item the events belong to
+            emit: Called with each event that gets through
+            max_rate_hz: Maximum number of events per second
+        """
+        self.item_id = item_id
+        self.emit = emit
+        self.interval = 1.0 / max_rate_hz
+        self.fragment_workers = 1  # set once the fragment tuning is known
+        self._next_due = 0.0
+        self._dropped: dict | None = None
+        self._lock = threading.Lock()
+
+    def offer(self, d: dict, force: bool = False):
+        """Forward a yt-dlp progress dict if its time slot has come.
+
+        Args:
+            d: The dict passed to a yt-dlp progress hook
+            force: Forward regardless of the rate limit (final update)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now < self._next_due:
+                self._dropped = d
+                return
+            self._next_due = now + self.interval
+            self._dropped = None
+        self.emit(self._event(d))
+
+    def flush(self):
+        """Forward the last call the rate limit dropped, if any."""
+        with self._lock:
+            d, self._dropped = self._dropped, None
+            if d is None:
+                return
+            self._next_due = time.monotonic() + self.interval
+        self.emit(self._event(d))
+
+    def _event(self, d: dict) -> ProgressEvent:
+        return ProgressEvent(
+            self.item_id,
+            d.get("downloaded_bytes") or 0,
+            d.get("total_bytes") or d.get("total_bytes_estimate"),
+            d.get("speed"),
+            d.get("eta"),
+            d.get("fragment_index"),
+            d.get("fragment_count"),
+            self.fragment_workers,
+            d.get("tmpfilename") or d.get("filename") or "",
+        )
+
+
+# ----------------------- GUI-side formatting -----------------------
+def format_bytes(b: float | None) -> str:
+    """Format a byte count for display."""
+    b = float(b or 0)
+    for unit in ["B", "KB", "MB", "GB"]:
+        if b < 1024:
+            return f"{b:.1f}{unit}"
+        b /= 1024
+    return f"{b:.1f}TB"
+
+
+def format_eta(seconds: float | None) -> str:
+    """Format a remaining time for display."""
+    if not seconds:
+        return "--"
+    return f"{int(seconds // 60)}m {int(seconds % 60)}s"
+
+
+def describe(event: ProgressEvent) -> str:
+    """Build the status line shown for a progress event."""
+    text = (
+        f"{event.percent}% | {format_bytes(event.downloaded)}/"
+        f"{format_bytes(event.total)} "
+        f"| Speed: {format_bytes(event.speed)}/s | ETA: {format_eta(event.eta)}"
+    )
+    if event.fragment_count:
+        text += f" | Frag {event.fragment_index or 0}/{event.fragment_count}"
+        if event.fragment_workers > 1:
+            text += f" x{event.fragment_workers}"
+    return text
@@ -1,12 +1,17 @@
 """Queue item data structure for download queue management."""
-from dataclasses import dataclass
+import itertools
+from dataclasses import dataclass, field
 from enum import Enum
 
+_item_ids = itertools.count(1)
+
 
 class QueueStatus(Enum):
     """Status of a queue item."""
     WAITING = "waiting"
     DOWNLOADING = "downloading"
+    PROCESSING = "processing"  # downloaded, being merged or converted
+    PAUSED = "paused"
     COMPLETED = "completed"
     FAILED = "failed"
 
@@ -20,6 +25,16 @@ class QueueItem:
     status: QueueStatus = QueueStatus.WAITING
     file_size: str = ""
     error_message: str = ""
+    progress: int = 0
+    status_text: str = ""
+    # Stable identity used to route worker signals back to this item
+    item_id: int = field(default_factory=lambda: next(_item_ids))
+    # Sanitized yt-dlp info dict, reused for the download if still fresh
+    info: dict | None = field(default=None, repr=False)
+    # File the download is writing to; yt-dlp resumes from it
+    partial_path: str = ""
+    # Download even if the video is in the archive (the user asked to)
+    ignore_archive: bool = False
 
     def get_display_text(self) -> str:
         """Get formatted display text for the queue list."""
@@ -32,7 +47,13 @@ class QueueItem:
             parts.append(f"Format: {self.format_selection}")
         if self.file_size:
             parts.append(f"Size: {self.file_size}")
-        parts.append(f"Status: {self.status.value.title()}")
+        if (self.status in (QueueStatus.DOWNLOADING, QueueStatus.PROCESSING)
+                and self.status_text):
+            parts.append(self.status_text)
+        elif self.status == QueueStatus.FAILED and self.error_message:
+            parts.append(f"Status: Failed ({self.error_message})")
+        else:
+            parts.append(f"Status: {self.status.value.title()}")
 
         status_line = " | ".join(parts)
 
@@ -43,6 +64,8 @@ class QueueItem:
         icons = {
             QueueStatus.WAITING: "🟡",
             QueueStatus.DOWNLOADING: "🔵",
+            QueueStatus.PROCESSING: "🟣",
+            QueueStatus.PAUSED: "⏸",
             QueueStatus.COMPLETED: "🟢",
             QueueStatus.FAILED: "🔴",
         }
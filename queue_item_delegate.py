@@ -0,0 +1,84 @@
+"""Delegate painting the rows of the download queue."""
+from PyQt5.QtCore import QEvent, QRect, QSize, Qt, pyqtSignal  # type: ignore
+from PyQt5.QtGui import QColor, QCursor, QFont  # type: ignore
+from PyQt5.QtWidgets import (  # type: ignore
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+)
+
+# Height of a row, enough for the two lines of an item's text
+ROW_HEIGHT = 50
+BUTTON_SIZE = 16
+MARGIN = 4
+
+
+class QueueItemDelegate(QStyledItemDelegate):
+    """Paints queue rows with a clickable remove button.
+
+    Nothing is created per row: the button and text are painted straight
+    from the model's data, so rows cost nothing until they are visible.
+    """
+
+    # Signal emitted when remove button is clicked
+    remove_clicked = pyqtSignal(int)  # Emits the row index
+
+    def _button_rect(self, rect: QRect) -> QRect:
+        return QRect(
+            rect.left() + MARGIN,
+            rect.top() + (rect.height() - BUTTON_SIZE) // 2,
+            BUTTON_SIZE,
+            BUTTON_SIZE,
+        )
+
+    def paint(self, painter, option, index):
+        """Paint the row background, remove button and text."""
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ""  # the background only; the text is wrapped below
+        widget = opt.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+
+        # Remove button (×)
+        button = self._button_rect(opt.rect)
+        hovered = (opt.state & QStyle.State_MouseOver and widget is not None
+                   and button.contains(
+                       widget.viewport().mapFromGlobal(QCursor.pos())))
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#FF0000" if hovered else "#CC0000"))
+        painter.drawRoundedRect(button, 4, 4)
+        font = QFont(opt.font)
+        font.setBold(True)
+        font.setPixelSize(14)
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        painter.drawText(button.adjusted(0, -2, 0, 0), Qt.AlignCenter, "×")
+
+        # Text
+        text_rect = opt.rect.adjusted(
+            BUTTON_SIZE + 3 * MARGIN, MARGIN // 2, -MARGIN, -MARGIN // 2)
+        painter.setFont(opt.font)
+        painter.setPen(Qt.black)
+        painter.drawText(
+            text_rect, Qt.AlignVCenter | Qt.AlignLeft | Qt.TextWordWrap, text)
+        painter.restore()
+
+    def sizeHint(self, option, index):  # pylint: disable=invalid-name
+        """Return the fixed row size."""
+        return QSize(0, ROW_HEIGHT)
+
+    # pylint: disable=invalid-name
+    def editorEvent(self, event, model, option, index):
+        """Emit remove_clicked when the button is clicked."""
+        if (event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton
+                and self._button_rect(option.rect).contains(event.pos())):
+            self.remove_clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -1,20 +1,32 @@
 """Queue management module for YouTube Downloader.
 
 This module handles all queue-related operations including display updates,
-title fetching, and context menu actions.
+title fetching, and context menu actions. The items are shown through a
+QueueModel (see queue_model.py), which repaints only the rows that change,
+and once a QueueStore is attached every change is also saved to disk.
 """
-from PyQt5.QtCore import QObject, QSize, pyqtSignal  # type: ignore
+from itertools import islice
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal  # type: ignore
 from PyQt5.QtWidgets import (  # type: ignore
     QAction,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMenu,
     QMessageBox,
 )
 
+import metadata
+from metadata_pool import MetadataResult, MetadataWorkerPool
 from queue_item import QueueItem, QueueStatus
-from queue_item_widget import QueueItemWidget
-from title_fetch_thread import TitleFetchThread
+from queue_item_delegate import QueueItemDelegate
+from queue_model import QueueModel
+
+if TYPE_CHECKING:
+    from queue_store import QueueStore
+
+# How often finished title fetches are collected and shown
+RESULT_BATCH_INTERVAL_MS = 200
 
 
 class QueueManager(QObject):
@@ -22,46 +34,133 @@ class QueueManager(QObject):
 
     # Signal emitted when queue is updated
     queue_updated = pyqtSignal()
+    # Signal emitted when an item leaves the queue: (item_id)
+    item_removed = pyqtSignal(int)
+    # Signal emitted when the user pauses or resumes an item: (item_id, paused)
+    pause_requested = pyqtSignal(int, bool)
 
-    def __init__(self, queue_list_widget: QListWidget, parent=None):
+    def __init__(self, queue_list_view: QListView, parent=None):
         """Initialize queue manager.
 
         Args:
-            queue_list_widget: The QListWidget to display queue items
+            queue_list_view: The QListView to display queue items
             parent: Parent QObject
         """
         super().__init__(parent)
-        self.queue_list = queue_list_widget
+        self.queue_list = queue_list_view
         self.download_queue: list[QueueItem] = []
-        self.title_fetch_threads: list[TitleFetchThread] = []
-
-    def update_display(self):
-        """Update the queue list widget to show current queue state."""
-        self.queue_list.clear()
-        for index, item in enumerate(self.download_queue):
-            icon = item.get_status_icon()
-            text = item.get_display_text()
-            display_text = f"#{index + 1} {icon} {text}"
+        self.model = QueueModel(self.download_queue, self)
+        self.delegate = QueueItemDelegate(self.queue_list)
+        self.delegate.remove_clicked.connect(self._on_remove_clicked)
+        self.queue_list.setModel(self.model)
+        self.queue_list.setItemDelegate(self.delegate)
+        # All rows have the delegate's height; lets the view skip measuring
+        self.queue_list.setUniformItemSizes(True)
+        # Queued items by canonical video key (see metadata.canonical_key),
+        # so URL variants of one video are found without scanning the queue
+        self._by_key: dict[str, list[QueueItem]] = {}
+        # No row above this one holds a waiting item; pop_next starts here
+        self._next_waiting = 0
+        # Saves the queue for the next session; set by restore()
+        self.store: "QueueStore | None" = None
+        self.metadata_pool = MetadataWorkerPool()
+
+        # Title fetch results are delivered in batches by this timer
+        self.result_timer = QTimer(self)
+        self.result_timer.setInterval(RESULT_BATCH_INTERVAL_MS)
+        self.result_timer.timeout.connect(self._deliver_fetch_results)
+
+    def refresh_item(self, item_id: int):
+        """Redraw a single queue row.
 
-            # Create list item
-            list_item = QListWidgetItem(self.queue_list)
-            # Set height for the widget to fit 2 lines
-            list_item.setSizeHint(QSize(0, 50))
-
-            # Create custom widget
-            widget = QueueItemWidget(index, display_text)
-            widget.remove_clicked.connect(self._on_remove_clicked)
+        Args:
+            item_id: Identifier of the item whose row changed
+        """
+        row = self.model.row_of(item_id)
+        if row >= 0:
+            self.model.refresh_row(row)
+            if self.store:
+                self.store.save(self.download_queue[row])
+
+    def _items_for(self, url: str) -> list[QueueItem]:
+        """Return the queued items for the video behind a URL."""
+        return self._by_key.get(metadata.canonical_key(url), [])
+
+    def _index(self, items: list[QueueItem]):
+        """Add appended items to the key index."""
+        for item in items:
+            self._by_key.setdefault(
+                metadata.canonical_key(item.url), []).append(item)
+
+    def _unindex(self, item: QueueItem):
+        """Drop a removed item from the key index."""
+        key = metadata.canonical_key(item.url)
+        same = [other for other in self._by_key.get(key, []) if other is not item]
+        if same:
+            self._by_key[key] = same
+        else:
+            self._by_key.pop(key, None)
+
+    def _waiting_from(self, row: int):
+        """Note that the item at row may now be waiting."""
+        self._next_waiting = min(self._next_waiting, row)
+
+    def _swapped(self, row: int, below: int):
+        """Persist two adjacent rows trading places."""
+        if self.store:
+            self.store.swap(self.download_queue[row], self.download_queue[below])
+
+    def restore(self, items: list[QueueItem], store: "QueueStore"):
+        """Put back the queue of the last session and start saving changes.
 
-            # Add widget to list item
-            self.queue_list.setItemWidget(list_item, widget)
+        Args:
+            items: Items loaded by the store, in queue order
+            store: Store that loaded them
+        """
+        # Items queued while the store was loading are saved too
+        pending = list(self.download_queue)
+        self.store = store
+        restored = []
+        for item in items:
+            if metadata.canonical_key(item.url) in self._by_key:
+                store.remove(item)
+                continue
+            cached = metadata.lookup(item.url)
+            if cached:
+                item.info = cached.info
+            restored.append(item)
+        if restored:
+            self.model.append(restored)
+            self._index(restored)
+            self._waiting_from(len(self.download_queue) - len(restored))
+        store.add(pending)
+        self.queue_updated.emit()
 
+    def current_row(self) -> int:
+        """Return the selected row, or -1 if none."""
+        return self.queue_list.currentIndex().row()
+
+    def _remove_at(self, index: int):
+        """Remove the item at index and notify listeners."""
+        item = self.model.remove_row(index)
+        self._unindex(item)
+        if self.store:
+            self.store.remove(item)
+        if index < self._next_waiting:
+            self._next_waiting -= 1
+        self._cancel_fetch(item.url)
         self.queue_updated.emit()
+        self.item_removed.emit(item.item_id)
+
+    def _cancel_fetch(self, url: str):
+        """Cancel a pending title fetch nobody in the queue needs anymore."""
+        if not self.has_duplicate(url):
+            self.metadata_pool.cancel(url)
 
     def _on_remove_clicked(self, index: int):
         """Handle remove button click."""
         if 0 <= index < len(self.download_queue):
-            self.download_queue.pop(index)
-            self.update_display()
+            self._remove_at(index)
 
     def add_item(self, queue_item: QueueItem):
         """Add an item to the queue.
@@ -69,49 +168,134 @@ class QueueManager(QObject):
         Args:
             queue_item: The QueueItem to add
         """
-        self.download_queue.append(queue_item)
-        self.update_display()
-        self.fetch_video_title(queue_item)
+        cached = None if queue_item.info else metadata.lookup(queue_item.url)
+        if cached:
+            # Known video: title from the persistent cache, stream URLs too
+            # if they haven't expired (prefetch refreshes them otherwise)
+            queue_item.title = cached.title or queue_item.url
+            queue_item.info = cached.info
+        elif queue_item.info:
+            # Metadata already extracted (e.g. by the format preview)
+            queue_item.title = queue_item.info.get("title") or queue_item.url
+        self.model.append([queue_item])
+        self._index([queue_item])
+        if self.store:
+            self.store.add([queue_item])
+        self.queue_updated.emit()
+        if not queue_item.info and not cached:
+            self.fetch_video_title(queue_item)
+
+    def add_items(self, queue_items: list[QueueItem]) -> int:
+        """Add several items at once, inserting their rows in one go.
+
+        The items are expected to carry a title already (e.g. from a
+        playlist listing), so no title fetch is started; their metadata is
+        prefetched once they get close to a download slot. URLs already in
+        the queue are skipped.
 
-    def fetch_video_title(self, queue_item: QueueItem):
-        """Fetch video title in background thread.
+        Args:
+            queue_items: The QueueItems to add
+
+        Returns:
+            Number of items actually added
+        """
+        queued: set[str] = set()
+        added = []
+        for queue_item in queue_items:
+            key = metadata.canonical_key(queue_item.url)
+            if key in queued or key in self._by_key:
+                continue
+            queued.add(key)
+            cached = metadata.lookup(queue_item.url)
+            if cached:
+                queue_item.title = cached.title or queue_item.title
+                queue_item.info = cached.info
+            added.append(queue_item)
+        if added:
+            self.model.append(added)
+            self._index(added)
+            if self.store:
+                self.store.add(added)
+            self.queue_updated.emit()
+        return len(added)
+
+    def fetch_video_title(self, queue_item: QueueItem, urgent: bool = False):
+        """Queue a background metadata fetch for an item.
 
         Args:
             queue_item: The queue item to fetch title for
+            urgent: Fetch before items queued earlier (used by prefetch)
         """
-        thread = TitleFetchThread(queue_item.url)
-        thread.title_fetched.connect(self.on_title_fetched)
-        thread.fetch_failed.connect(self.on_title_fetch_failed)
-        thread.finished.connect(
-            lambda: self.title_fetch_threads.remove(thread))
-        self.title_fetch_threads.append(thread)
-        thread.start()
+        self.metadata_pool.submit(queue_item.url, urgent)
+        if not self.result_timer.isActive():
+            self.result_timer.start()
+
+    def _deliver_fetch_results(self):
+        """Apply every finished title fetch to the rows it concerns."""
+        for result in self.metadata_pool.drain():
+            self._apply_fetch_result(result)
+        if not self.metadata_pool.has_work():
+            self.result_timer.stop()
+
+    def _apply_fetch_result(self, result: MetadataResult):
+        """Route one fetch result to the queue items for its URL."""
+        if result.info:
+            self.on_title_fetched(
+                result.url,
+                result.info.get("title", "Unknown Title"),
+                result.info,
+            )
+        else:
+            self.on_title_fetch_failed(result.url, result.error)
+
+    def prefetch_ahead(self, count: int):
+        """Extract metadata for the next waiting items in the background.
+
+        Runs while earlier items download so that, by the time an item gets a
+        download slot, its stream URLs are already known and fresh.
 
-    def on_title_fetched(self, url: str, title: str):
+        Args:
+            count: Number of waiting items to look ahead
+        """
+        for item in islice(self.download_queue, self._next_waiting, None):
+            if count <= 0:
+                break
+            if item.status != QueueStatus.WAITING:
+                continue
+            count -= 1
+            # Failed fetches are tried again: metadata remembers the
+            # definitive failures, so only transient ones reach the network
+            if (
+                self.metadata_pool.is_busy(item.url)
+                or metadata.is_fresh(item.info, metadata.PREFETCH_MARGIN)
+            ):
+                continue
+            self.fetch_video_title(item, urgent=True)
+
+    def on_title_fetched(self, url: str, title: str, info: dict | None = None):
         """Handle successful title fetch.
 
         Args:
             url: The video URL
             title: The fetched title
+            info: The full extraction result, kept for the download
         """
-        for item in self.download_queue:
-            if item.url == url:
-                item.title = title
-                self.update_display()
-                break
+        for item in self._items_for(url):
+            item.title = title
+            if info and item.status == QueueStatus.WAITING:
+                item.info = info
+            self.refresh_item(item.item_id)
 
     def on_title_fetch_failed(self, url: str, _error: str):
         """Handle failed title fetch.
 
         Args:
             url: The video URL
-            _error: Error message (unused but required by signal)
+            _error: Error message (unused)
         """
-        for item in self.download_queue:
-            if item.url == url:
-                item.title = url  # Fallback to showing URL
-                self.update_display()
-                break
+        for item in self._items_for(url):
+            item.title = item.url  # Fallback to showing URL
+            self.refresh_item(item.item_id)
 
     def show_context_menu(self, position):
         """Show context menu for queue list.
@@ -119,17 +303,31 @@ class QueueManager(QObject):
         Args:
             position: Position where menu was requested
         """
-        if not self.queue_list.itemAt(position):
+        if not self.queue_list.indexAt(position).isValid():
             return
 
         menu = QMenu()
-        current_row = self.queue_list.currentRow()
+        current_row = self.current_row()
 
         # Remove action
         remove_action = QAction("🗑️ Remove from Queue", self.queue_list)
         remove_action.triggered.connect(self.remove_selected)
         menu.addAction(remove_action)
 
+        # Pause/resume action
+        if 0 <= current_row < len(self.download_queue):
+            item = self.download_queue[current_row]
+            if item.status == QueueStatus.PAUSED:
+                resume_action = QAction("▶ Resume", self.queue_list)
+                resume_action.triggered.connect(
+                    lambda: self.pause_requested.emit(item.item_id, False))
+                menu.addAction(resume_action)
+            elif item.status in (QueueStatus.WAITING, QueueStatus.DOWNLOADING):
+                pause_action = QAction("⏸ Pause", self.queue_list)
+                pause_action.triggered.connect(
+                    lambda: self.pause_requested.emit(item.item_id, True))
+                menu.addAction(pause_action)
+
         menu.addSeparator()
 
         # Move up/down actions
@@ -154,30 +352,27 @@ class QueueManager(QObject):
 
     def remove_selected(self):
         """Remove the selected item from queue."""
-        current_row = self.queue_list.currentRow()
+        current_row = self.current_row()
         if 0 <= current_row < len(self.download_queue):
-            self.download_queue.pop(current_row)
-            self.update_display()
+            self._remove_at(current_row)
 
     def move_item_up(self):
         """Move selected queue item up."""
-        current_row = self.queue_list.currentRow()
+        current_row = self.current_row()
         if current_row > 0:
-            self.download_queue[current_row], self.download_queue[current_row - 1] = \
-                self.download_queue[current_row -
-                                    1], self.download_queue[current_row]
-            self.update_display()
-            self.queue_list.setCurrentRow(current_row - 1)
+            self.model.move_row(current_row, current_row - 1)
+            self._swapped(current_row - 1, current_row)
+            self._waiting_from(current_row - 1)
+            self.queue_updated.emit()
 
     def move_item_down(self):
         """Move selected queue item down."""
-        current_row = self.queue_list.currentRow()
-        if current_row < len(self.download_queue) - 1:
-            self.download_queue[current_row], self.download_queue[current_row + 1] = \
-                self.download_queue[current_row +
-                                    1], self.download_queue[current_row]
-            self.update_display()
-            self.queue_list.setCurrentRow(current_row + 1)
+        current_row = self.current_row()
+        if 0 <= current_row < len(self.download_queue) - 1:
+            self.model.move_row(current_row, current_row + 1)
+            self._swapped(current_row, current_row + 1)
+            self._waiting_from(current_row)
+            self.queue_updated.emit()
 
     def clear_all(self):
         """Clear all items from queue."""
@@ -190,33 +385,120 @@ class QueueManager(QObject):
                 QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                self.download_queue.clear()
-                self.update_display()
+                removed = [item.item_id for item in self.download_queue]
+                urls = [item.url for item in self.download_queue]
+                self.model.clear()
+                self._by_key.clear()
+                self._next_waiting = 0
+                if self.store:
+                    self.store.clear()
+                for url in urls:
+                    self.metadata_pool.cancel(url)
+                self.queue_updated.emit()
+                for item_id in removed:
+                    self.item_removed.emit(item_id)
 
     def has_duplicate(self, url: str) -> bool:
-        """Check if URL already exists in queue.
+        """Check if the video behind a URL is already in the queue.
+
+        Any URL variant of a queued video counts, e.g. ``youtu.be/X`` for a
+        queued ``watch?v=X``.
 
         Args:
             url: URL to check
 
         Returns:
-            True if URL exists in queue
+            True if the video is already queued
+        """
+        return metadata.canonical_key(url) in self._by_key
+
+    def get_item(self, item_id: int) -> QueueItem | None:
+        """Look up a queue item by its identifier.
+
+        Args:
+            item_id: Identifier assigned when the item was created
+
+        Returns:
+            The matching QueueItem or None if it is no longer queued
         """
-        return any(item.url == url for item in self.download_queue)
+        row = self.model.row_of(item_id)
+        return self.download_queue[row] if row >= 0 else None
 
     def pop_next(self) -> QueueItem | None:
-        """Pop the next item from queue.
+        """Claim the next waiting item for download.
+
+        The item stays in the queue (so its progress remains visible) and
+        is marked as downloading.
 
         Returns:
-            Next QueueItem or None if queue is empty
+            Next waiting QueueItem or None if nothing is waiting
         """
-        if self.download_queue:
-            item = self.download_queue.pop(0)
-            item.status = QueueStatus.DOWNLOADING
-            self.update_display()
-            return item
+        queue = self.download_queue
+        while self._next_waiting < len(queue):
+            item = queue[self._next_waiting]
+            self._next_waiting += 1
+            if item.status == QueueStatus.WAITING:
+                item.status = QueueStatus.DOWNLOADING
+                item.progress = 0
+                item.status_text = ""
+                self.refresh_item(item.item_id)
+                return item
         return None
 
+    def requeue(self, item_id: int):
+        """Put an item back in line for download, e.g. when resumed.
+
+        Args:
+            item_id: Identifier of the item
+        """
+        item = self.get_item(item_id)
+        if not item:
+            return
+        item.status = QueueStatus.WAITING
+        self._waiting_from(self.model.row_of(item_id))
+        self.refresh_item(item_id)
+
+    def mark_processing(self, item_id: int):
+        """Record that an item is downloaded and being post-processed.
+
+        Args:
+            item_id: Identifier of the downloaded item
+        """
+        item = self.get_item(item_id)
+        if not item:
+            return
+        item.status = QueueStatus.PROCESSING
+        item.progress = 100
+        item.status_text = "Processing..."
+        self.refresh_item(item_id)
+
+    def mark_finished(self, item_id: int, success: bool, message: str = ""):
+        """Record the final state of a downloaded item.
+
+        Args:
+            item_id: Identifier of the finished item
+            success: Whether the download succeeded
+            message: Error message shown for failed items
+        """
+        item = self.get_item(item_id)
+        if not item:
+            return
+        item.status = QueueStatus.COMPLETED if success else QueueStatus.FAILED
+        item.progress = 100 if success else item.progress
+        item.status_text = ""
+        item.error_message = "" if success else message[:80]
+        self.refresh_item(item_id)
+
+    def has_waiting(self) -> bool:
+        """Check if any item is still waiting to be downloaded.
+
+        Returns:
+            True if at least one item is waiting
+        """
+        return any(
+            item.status == QueueStatus.WAITING
+            for item in islice(self.download_queue, self._next_waiting, None))
+
     def is_empty(self) -> bool:
         """Check if queue is empty.
 
@@ -0,0 +1,116 @@
+"""Item model behind the download queue view.
+
+This module provides a QueueModel exposing the queue's QueueItems to a
+QListView. Rows are rendered on demand by the view's delegate (see
+queue_item_delegate.py), and every change is reported for the affected rows
+only, so a queue of tens of thousands of items stays responsive.
+"""
+from PyQt5.QtCore import (  # type: ignore
+    QAbstractListModel,
+    QModelIndex,
+    Qt,
+)
+
+from queue_item import QueueItem
+
+# Data role returning the QueueItem of a row
+ITEM_ROLE = Qt.UserRole + 1
+
+
+class QueueModel(QAbstractListModel):
+    """List model over the queue items, in queue order."""
+
+    def __init__(self, items: list[QueueItem], parent=None):
+        """Initialize the model.
+
+        Args:
+            items: The queue's list; the model changes it in place, so all
+                structural changes must go through the model
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.items = items
+        # Row of every item, by item_id
+        self._rows: dict[int, int] = {
+            item.item_id: row for row, item in enumerate(items)}
+
+    def row_of(self, item_id: int) -> int:
+        """Return the row of an item, or -1 if it isn't queued."""
+        return self._rows.get(item_id, -1)
+
+    # pylint: disable=invalid-name
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Return the number of queue items."""
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return the display text, tooltip or QueueItem of a row."""
+        if not index.isValid() or index.row() >= len(self.items):
+            return None
+        item = self.items[index.row()]
+        if role == Qt.DisplayRole:
+            return (f"#{index.row() + 1} {item.get_status_icon()} "
+                    f"{item.get_display_text()}")
+        if role == Qt.ToolTipRole:
+            return item.url
+        if role == ITEM_ROLE:
+            return item
+        return None
+
+    def append(self, items: list[QueueItem]):
+        """Add items at the end of the queue."""
+        if not items:
+            return
+        first = len(self.items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.items.extend(items)
+        for row, item in enumerate(items, first):
+            self._rows[item.item_id] = row
+        self.endInsertRows()
+
+    def remove_row(self, row: int) -> QueueItem:
+        """Remove and return the item at a row."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        item = self.items.pop(row)
+        del self._rows[item.item_id]
+        self._reindex(row)
+        self.endRemoveRows()
+        self._renumber(row)
+        return item
+
+    def move_row(self, row: int, to: int):
+        """Move the item at row to position to."""
+        if row == to or not 0 <= to < len(self.items):
+            return
+        # Qt's destination is the row the item is inserted before
+        destination = to + 1 if to > row else to
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+        self.items.insert(to, self.items.pop(row))
+        self._reindex(min(row, to), max(row, to))
+        self.endMoveRows()
+        self._renumber(min(row, to), max(row, to))
+
+    def clear(self):
+        """Remove every item."""
+        self.beginResetModel()
+        self.items.clear()
+        self._rows.clear()
+        self.endResetModel()
+
+    def refresh_row(self, row: int):
+        """Repaint the row of an item whose state changed."""
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def _reindex(self, first: int, last: int | None = None):
+        """Record the rows of items that moved."""
+        last = len(self.items) - 1 if last is None else last
+        for row in range(first, last + 1):
+            self._rows[self.items[row].item_id] = row
+
+    def _renumber(self, first: int, last: int | None = None):
+        """Repaint rows whose "#n" position changed."""
+        last = len(self.items) - 1 if last is None else last
+        if first <= last:
+            self.dataChanged.emit(
+                self.index(first), self.index(last), [Qt.DisplayRole])
@@ -0,0 +1,141 @@
+"""Persistence of the download queue across sessions.
+
+This module provides a QueueStore that mirrors the QueueManager's items in
+the ``queue`` table of the history database, one row per video. Every
+change is written as it happens, through the DatabaseWriter, and only for
+the rows concerned: adding, removing or moving items, and status, title or
+partial file changes. Items are ordered by a position column, so a move
+only rewrites the two rows that swap places. On startup the queue is loaded
+back with its titles, and interrupted downloads are put back in line.
+"""
+import metadata
+from database_handler import DatabaseManager
+from db_writer import DatabaseWriter
+from queue_item import QueueItem, QueueStatus
+
+# Statuses meaning a download was running when the app stopped
+_INTERRUPTED = (QueueStatus.DOWNLOADING.value, QueueStatus.PROCESSING.value)
+
+
+class QueueStore:
+    """Writes queue changes to SQLite as they happen."""
+
+    def __init__(self, writer: DatabaseWriter):
+        """Initialize the store.
+
+        Args:
+            writer: Applies the writes off the GUI thread
+        """
+        self.writer = writer
+        # Per queued item (by item_id): its row key and position, and the
+        # persisted fields as last written
+        self._keys: dict[int, str] = {}
+        self._positions: dict[int, float] = {}
+        self._saved: dict[int, tuple] = {}
+        self._next_position = 0.0
+
+    @staticmethod
+    def _fields(item: QueueItem) -> tuple:
+        return (item.url, item.title, item.format_selection,
+                item.status.value, item.error_message, item.partial_path,
+                item.ignore_archive)
+
+    def _row(self, item: QueueItem) -> tuple:
+        return (self._keys[item.item_id], self._positions[item.item_id],
+                *self._fields(item))
+
+    def load(self, db_path: str) -> tuple[list[QueueItem], bool]:
+        """Read the queue saved by the last session.
+
+        Downloads that were running are put back to waiting; yt-dlp resumes
+        them from their partial files.
+
+        Args:
+            db_path: Path to the history database file
+
+        Returns:
+            The items in queue order, and whether any download was
+            interrupted
+        """
+        with DatabaseManager(db_path) as db:
+            rows = db.queue_rows()
+        items = []
+        interrupted = False
+        for (key, position, url, title, format_selection, status,
+             error_message, partial_path, ignore_archive) in rows:
+            if status in _INTERRUPTED:
+                interrupted = True
+                status = QueueStatus.WAITING.value
+            try:
+                queue_status = QueueStatus(status)
+            except ValueError:
+                queue_status = QueueStatus.WAITING
+            item = QueueItem(
+                url=url,
+                title=title or url,
+                format_selection=format_selection or "",
+                status=queue_status,
+                error_message=error_message or "",
+                partial_path=partial_path or "",
+                ignore_archive=bool(ignore_archive),
+            )
+            if queue_status == QueueStatus.COMPLETED:
+                item.progress = 100
+            self._keys[item.item_id] = key
+            self._positions[item.item_id] = position
+            self._saved[item.item_id] = self._fields(item)
+            self._next_position = max(self._next_position, position + 1)
+            items.append(item)
+        return items, interrupted
+
+    def add(self, items: list[QueueItem]):
+        """Persist items appended to the queue."""
+        if not items:
+            return
+        for item in items:
+            self._keys[item.item_id] = metadata.canonical_key(item.url)
+            self._positions[item.item_id] = self._next_position
+            self._next_position += 1
+            self._saved[item.item_id] = self._fields(item)
+        rows = [self._row(item) for item in items]
+        self.writer.submit(lambda db: db.save_queue_rows(rows))
+
+    def save(self, item: QueueItem):
+        """Persist an item's fields if they changed since the last write.
+
+        Cheap enough to call on every progress update.
+        """
+        if item.item_id not in self._keys:
+            return
+        fields = self._fields(item)
+        if self._saved.get(item.item_id) == fields:
+            return
+        self._saved[item.item_id] = fields
+        row = self._row(item)
+        self.writer.submit(lambda db: db.save_queue_rows([row]))
+
+    def remove(self, item: QueueItem):
+        """Delete a removed item's row."""
+        key = self._keys.pop(item.item_id, None)
+        self._positions.pop(item.item_id, None)
+        self._saved.pop(item.item_id, None)
+        if key is not None:
+            self.writer.submit(lambda db: db.delete_queue_rows([key]))
+
+    def swap(self, first: QueueItem, second: QueueItem):
+        """Persist two items trading places."""
+        if first.item_id not in self._keys or second.item_id not in self._keys:
+            return
+        positions = self._positions
+        positions[first.item_id], positions[second.item_id] = (
+            positions[second.item_id], positions[first.item_id])
+        pairs = [(positions[item.item_id], self._keys[item.item_id])
+                 for item in (first, second)]
+        self.writer.submit(lambda db: db.set_queue_positions(pairs))
+
+    def clear(self):
+        """Delete every row."""
+        self._keys.clear()
+        self._positions.clear()
+        self._saved.clear()
+        self.writer.submit(lambda db: db.delete_queue_rows())
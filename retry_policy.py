@@ -0,0 +1,161 @@
+"""Retry policy for failed downloads.
+
+This module classifies download errors and decides what to do about them:
+give up straight away on errors that will repeat, retry once with a relaxed
+format selector when the requested format doesn't exist, and back off
+exponentially (with jitter) on transient network errors.
+"""
+import random
+from dataclasses import dataclass
+from enum import Enum
+
+import metadata
+
+RELAXED_FORMAT = "bestvideo*+bestaudio/best"
+RELAXED_AUDIO_FORMAT = "bestaudio/best"
+
+_FORMAT_ERRORS = (
+    "requested format is not available",
+    "requested format not available",
+)
+_TRANSIENT_ERRORS = (
+    "timed out",
+    "timeout",
+    "connection reset",
+    "connection aborted",
+    "connection refused",
+    "remote end closed",
+    "incompleteread",
+    "temporary failure in name resolution",
+    "name or service not known",
+    "network is unreachable",
+    "http error 403",  # expired stream URL; fixed by re-extracting
+    "http error 429",
+    "http error 5",
+    "unable to download webpage",
+)
+
+
+class ErrorKind(Enum):
+    """Category of a download error."""
+    CANCELLED = "cancelled"
+    PERMANENT = "not retryable"
+    FORMAT = "format unavailable"
+    TRANSIENT = "network error"
+    UNKNOWN = "unknown error"
+
+
+class RetryAction(Enum):
+    """What to do after a failed attempt."""
+    GIVE_UP = "give up"
+    RELAX_FORMAT = "relax format"
+    BACKOFF = "backoff"
+
+
+@dataclass
+class RetryDecision:
+    """Outcome of the retry policy for one failed attempt."""
+    action: RetryAction
+    kind: ErrorKind
+    delay: float = 0.0
+    reason: str = ""
+
+
+def relaxed_format(selector: str) -> str:
+    """Return the fallback for a format selector that matched nothing.
+
+    Args:
+        selector: The yt-dlp format selector that failed
+
+    Returns:
+        A selector that accepts any format of the same kind
+    """
+    if selector.startswith("bestaudio"):
+        return RELAXED_AUDIO_FORMAT
+    return RELAXED_FORMAT
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """Put a download error into one of the ErrorKind categories.
+
+    Args:
+        error: Exception raised by yt-dlp during an attempt
+
+    Returns:
+        The matching ErrorKind
+    """
+    # pylint: disable=import-outside-toplevel
+    from yt_dlp.utils import DownloadCancelled
+
+    if isinstance(error, DownloadCancelled):
+        return ErrorKind.CANCELLED
+    message = str(error).lower()
+    if any(marker in message for marker in _FORMAT_ERRORS):
+        return ErrorKind.FORMAT
+    if metadata.is_permanent_error(message):
+        return ErrorKind.PERMANENT
+    if any(marker in message for marker in _TRANSIENT_ERRORS):
+        return ErrorKind.TRANSIENT
+    return ErrorKind.UNKNOWN
+
+
+class RetryPolicy:
+    """Decides whether and when a failed download is attempted again."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        """Initialize the policy.
+
+        Args:
+            max_attempts: Attempts allowed for transient or unknown errors
+            base_delay: Backoff before the second attempt, in seconds
+            max_delay: Upper bound for a single backoff, in seconds
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay to wait after the given attempt."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def decide(
+        self, attempt: int, error: BaseException, format_relaxed: bool
+    ) -> RetryDecision:
+        """Decide what to do after a failed attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first)
+            error: Exception raised by the failed attempt
+            format_relaxed: Whether the relaxed format is already in use
+
+        Returns:
+            The RetryDecision for the next step
+        """
+        kind = classify_error(error)
+        if kind in (ErrorKind.CANCELLED, ErrorKind.PERMANENT):
+            return RetryDecision(RetryAction.GIVE_UP, kind, reason=kind.value)
+        if kind == ErrorKind.FORMAT:
+            if format_relaxed:
+                return RetryDecision(
+                    RetryAction.GIVE_UP, kind,
+                    reason="no usable format")
+            return RetryDecision(
+                RetryAction.RELAX_FORMAT, kind,
+                reason="falling back to best available format")
+        if attempt >= self.max_attempts:
+            return RetryDecision(
+                RetryAction.GIVE_UP, kind,
+                reason=f"{kind.value}, gave up after {attempt} attempts")
+        delay = self.backoff(attempt)
+        return RetryDecision(
+            RetryAction.BACKOFF, kind, delay,
+            reason=(
+                f"{kind.value}, retry {attempt + 1}/{self.max_attempts} "
+                f"in {delay:.1f}s"
+            ))
@@ -0,0 +1,186 @@
+"""Qt-free download scheduler for headless runs.
+
+This module provides a DownloadScheduler that runs queued items on a fixed
+number of worker threads with DownloadJob, extracting the metadata of the
+next waiting items ahead of time. Merging and conversion run on a separate
+ProcessingStage, so a worker takes the next item as soon as its download is
+on disk. Items whose video is in the DownloadArchive are finished as skipped
+without touching the network. Items can be added while it runs; it returns
+once the queue has been closed and drained.
+"""
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+
+import metadata
+from download_archive import SKIPPED_MESSAGE, SKIPPED_STATUS
+from metadata_pool import MetadataWorkerPool
+from postprocessing import DEFAULT_PROCESSING_WORKERS, ProcessingStage
+from progress_events import ProgressEvent
+from queue_item import QueueItem, QueueStatus
+
+if TYPE_CHECKING:
+    from download_archive import DownloadArchive
+    from download_engine import DownloadJob, DownloadResult
+
+DEFAULT_MAX_WORKERS = 3
+MAX_WORKERS_LIMIT = 8
+# Waiting items whose metadata is extracted ahead of their download
+DEFAULT_PREFETCH_DEPTH = 2
+
+
+class DownloadScheduler:
+    """Runs queued downloads on a bounded number of worker threads."""
+
+    def __init__(
+        self,
+        opts_factory: Callable[[QueueItem], dict],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        on_progress: Callable[[ProgressEvent], None] | None = None,
+        on_status: Callable[[int, str], None] | None = None,
+        on_finished: Callable[[QueueItem, "DownloadResult"], None] | None = None,
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+        processing_workers: int = DEFAULT_PROCESSING_WORKERS,
+        archive: "DownloadArchive | None" = None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            opts_factory: Builds the yt-dlp options for a queue item
+            max_workers: Number of downloads allowed to run at once
+            on_progress: Called with every ProgressEvent
+            on_status: Called with (item_id, message) for status lines
+            on_finished: Called with each item and its DownloadResult
+            prefetch_depth: Number of upcoming items to extract in advance
+            processing_workers: Number of merges/conversions run at once
+            archive: Videos to skip because they are already downloaded
+        """
+        self.opts_factory = opts_factory
+        self.max_workers = max(1, min(int(max_workers), MAX_WORKERS_LIMIT))
+        self.on_progress = on_progress
+        self.on_status = on_status or (lambda item_id, message: None)
+        self.on_finished = on_finished or (lambda item, result: None)
+        self.prefetch_depth = max(0, prefetch_depth)
+        self.metadata_pool = MetadataWorkerPool()
+        self.processing = ProcessingStage(processing_workers)
+        self.archive = archive
+        self.results: list["DownloadResult"] = []
+        self._waiting: deque[QueueItem] = deque()
+        self._jobs: dict[int, "DownloadJob"] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._cancelled = False
+
+    def add(self, item: QueueItem):
+        """Queue an item; it starts as soon as a worker is free."""
+        with self._cond:
+            self._waiting.append(item)
+            self._cond.notify()
+
+    def close(self):
+        """Declare that no more items will be added."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def cancel_all(self):
+        """Drop waiting items and cancel every running download."""
+        with self._cond:
+            self._cancelled = True
+            self._closed = True
+            self._waiting.clear()
+            jobs = list(self._jobs.values())
+            self._cond.notify_all()
+        for job in jobs:
+            job.cancel()
+        self.metadata_pool.shutdown()
+
+    def run(self) -> list["DownloadResult"]:
+        """Process the queue until it is closed and drained.
+
+        Returns:
+            The result of every download, in completion order
+        """
+        workers = [
+            threading.Thread(
+                target=self._work, name=f"download-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.processing.shutdown()
+        self.metadata_pool.shutdown()
+        return self.results
+
+    def _next_item(self) -> QueueItem | None:
+        """Wait for the next waiting item; None once the queue is done."""
+        with self._cond:
+            while not self._waiting and not self._closed:
+                self._cond.wait()
+            if not self._waiting:
+                return None
+            item = self._waiting.popleft()
+            item.status = QueueStatus.DOWNLOADING
+            upcoming = list(self._waiting)[:self.prefetch_depth]
+
+        # Overlap the next items' extraction with the running downloads
+        for result in self.metadata_pool.drain():
+            for waiting in upcoming + [item]:
+                if waiting.url == result.url and result.info:
+                    waiting.info = result.info
+        for waiting in upcoming:
+            if (self.archive and not waiting.ignore_archive
+                    and self.archive.contains(waiting.url)):
+                continue
+            if not metadata.is_fresh(waiting.info, metadata.PREFETCH_MARGIN):
+                self.metadata_pool.submit(waiting.url, urgent=True)
+        return item
+
+    def _work(self):
+        # Loads yt-dlp; kept out of module import so the GUI can import the
+        # worker constants without it
+        # pylint: disable=import-outside-toplevel
+        from download_engine import DownloadJob, DownloadResult
+
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            if (self.archive and not item.ignore_archive
+                    and self.archive.contains(item.url)):
+                self._finish(item, DownloadResult(
+                    True, SKIPPED_MESSAGE, item.url, item.title,
+                    status=SKIPPED_STATUS))
+                continue
+            job = DownloadJob(
+                item.url,
+                self.opts_factory(item),
+                item.info,
+                item.item_id,
+                self.on_progress,
+                lambda message, i=item.item_id: self.on_status(i, message),
+                defer_postprocessing=True,
+            )
+            with self._cond:
+                if self._cancelled:
+                    return
+                self._jobs[item.item_id] = job
+            result = job.run()
+            with self._cond:
+                del self._jobs[item.item_id]
+            if job.needs_processing():
+                item.status = QueueStatus.PROCESSING
+                self.processing.submit(
+                    job, lambda result, item=item: self._finish(item, result))
+            else:
+                self._finish(item, result)
+
+    def _finish(self, item: QueueItem, result: "DownloadResult"):
+        with self._cond:
+            self.results.append(result)
+        item.status = (
+            QueueStatus.COMPLETED if result.success else QueueStatus.FAILED)
+        item.error_message = "" if result.success else result.message
+        self.on_finished(item, result)
@@ -0,0 +1,317 @@
+"""Multi-connection HTTP range downloader for progressive formats.
+
+This module splits a single file into byte ranges and fetches them over
+several connections at once, writing each range at its offset into a
+preallocated file. Progress of every segment is saved next to the file, so
+an interrupted download resumes each segment where it stopped.
+
+SegmentedDownload only needs a callable that opens a ranged request; the
+SegmentedHttpFD downloader in ydl_extensions.py plugs it into yt-dlp for
+plain HTTP(S) formats.
+"""
+import http.client
+import json
+import math
+import os
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+DEFAULT_CONNECTIONS = 4
+MAX_CONNECTIONS = 16
+# Smaller files aren't worth splitting further
+MIN_SEGMENT_SIZE = 1024 * 1024
+# More segments than connections, so a slow connection doesn't hold up the
+# end of the download while the others sit idle
+SEGMENTS_PER_CONNECTION = 4
+CHUNK_SIZE = 64 * 1024
+SEGMENT_RETRIES = 3
+# Minimum time between two saves of the segment state
+STATE_SAVE_INTERVAL = 1.0
+
+_CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+# Opens a request for the given headers; the response needs status,
+# headers, read() and close()
+Opener = Callable[[dict], object]
+
+
+class RangeNotSupported(Exception):
+    """The server can't serve byte ranges of the file."""
+
+
+class SegmentError(OSError):
+    """A segment's response ended early or covered the wrong range."""
+
+
+@dataclass
+class Segment:
+    """One byte range of the file, inclusive on both ends."""
+    start: int
+    end: int
+    done: int = 0
+
+    @property
+    def size(self) -> int:
+        """Number of bytes in the range."""
+        return self.end - self.start + 1
+
+    @property
+    def complete(self) -> bool:
+        """Whether every byte of the range has been written."""
+        return self.done >= self.size
+
+
+def plan_segments(
+    size: int, connections: int, min_segment: int = MIN_SEGMENT_SIZE
+) -> list[Segment]:
+    """Split a file into byte ranges.
+
+    Args:
+        size: File size in bytes
+        connections: Number of connections the ranges are spread over
+        min_segment: Smallest range worth a request of its own
+
+    Returns:
+        Contiguous segments covering the whole file
+    """
+    if size <= 0:
+        return []
+    count = max(1, min(
+        connections * SEGMENTS_PER_CONNECTION,
+        math.ceil(size / max(1, min_segment))))
+    step = math.ceil(size / count)
+    return [
+        Segment(start, min(start + step, size) - 1)
+        for start in range(0, size, step)
+    ]
+
+
+def urllib_opener(url: str, headers: dict | None = None) -> Opener:
+    """Return an opener that requests ``url`` with urllib."""
+    def open_range(range_headers: dict):
+        request = urllib.request.Request(
+            url, headers={**(headers or {}), **range_headers})
+        return urllib.request.urlopen(request, timeout=20)
+    return open_range
+
+
+def _content_range(response) -> tuple[int, int, int | None] | None:
+    """Parse the Content-Range header of a 206 response."""
+    match = _CONTENT_RANGE_RE.match(
+        response.headers.get("Content-Range") or "")
+    if not match:
+        return None
+    total = match.group(3)
+    return (
+        int(match.group(1)),
+        int(match.group(2)),
+        None if total == "*" else int(total),
+    )
+
+
+class SegmentedDownload:
+    """Downloads one file over several ranged connections."""
+
+    def __init__(
+        self,
+        opener: Opener,
+        filename: str,
+        connections: int = DEFAULT_CONNECTIONS,
+        progress: Callable[[int, int], None] | None = None,
+        min_segment: int = MIN_SEGMENT_SIZE,
+        resume: bool = True,
+        transient_errors: tuple = (OSError, http.client.HTTPException),
+    ):
+        """Initialize the download.
+
+        Args:
+            opener: Opens a request with the given (Range) headers
+            filename: File to write; it is preallocated to the full size
+            connections: Number of ranges fetched at the same time
+            progress: Called with (downloaded, total) after every chunk,
+                from one thread at a time. Exceptions it raises abort the
+                download.
+            min_segment: Smallest range worth a request of its own
+            resume: Continue from a previously saved segment state
+            transient_errors: Errors after which a segment is retried from
+                its current offset
+        """
+        self.opener = opener
+        self.filename = filename
+        self.state_filename = filename + ".segments"
+        self.connections = max(1, min(connections, MAX_CONNECTIONS))
+        self.progress = progress
+        self.min_segment = min_segment
+        self.resume = resume
+        self.transient_errors = transient_errors
+        self.size = 0
+        self.segments: list[Segment] = []
+        self._lock = threading.Lock()
+        self._progress_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._saved_at = 0.0
+
+    @property
+    def downloaded(self) -> int:
+        """Bytes written so far, including resumed ones."""
+        return sum(min(s.done, s.size) for s in self.segments)
+
+    def probe(self) -> int:
+        """Ask for the first byte to learn the size and range support.
+
+        Returns:
+            The file size in bytes
+
+        Raises:
+            RangeNotSupported: If the server ignores ranges or doesn't
+                tell the size.
+        """
+        response = self.opener({"Range": "bytes=0-0"})
+        try:
+            content_range = _content_range(response)
+            if getattr(response, "status", 200) != 206 or not content_range:
+                raise RangeNotSupported("server ignored the Range header")
+            if not content_range[2]:
+                raise RangeNotSupported("server didn't report the file size")
+            return content_range[2]
+        finally:
+            response.close()
+
+    def run(self) -> int:
+        """Download the file, resuming saved segments.
+
+        Returns:
+            The file size in bytes
+
+        Raises:
+            RangeNotSupported: If the file can't be fetched in ranges.
+            Exception: The first unrecoverable error of any segment.
+        """
+        self.size = self.probe()
+        self.segments = self._load_state() or plan_segments(
+            self.size, self.connections, self.min_segment)
+        self._preallocate()
+
+        pending = deque(s for s in self.segments if not s.complete)
+        errors: list[BaseException] = []
+
+        def work():
+            while not self._stop.is_set():
+                with self._lock:
+                    if not pending:
+                        return
+                    segment = pending.popleft()
+                try:
+                    self._fetch_segment(segment)
+                except BaseException as e:  # pylint: disable=broad-exception-caught
+                    with self._lock:
+                        errors.append(e)
+                    self._stop.set()
+                    return
+
+        workers = min(self.connections, len(pending))
+        try:
+            if workers:
+                with ThreadPoolExecutor(
+                        workers, thread_name_prefix="segment") as pool:
+                    for _ in range(workers):
+                        pool.submit(work)
+        finally:
+            self._save_state(force=True)
+        if errors:
+            raise errors[0]
+        os.remove(self.state_filename)
+        return self.size
+
+    def _fetch_segment(self, segment: Segment):
+        """Fetch the rest of a segment, retrying transient errors."""
+        attempt = 0
+        while not segment.complete and not self._stop.is_set():
+            try:
+                self._fetch_range(segment)
+            except self.transient_errors:
+                attempt += 1
+                if attempt > SEGMENT_RETRIES or self._stop.is_set():
+                    raise
+                time.sleep(min(2 ** attempt / 4, 2))
+
+    def _fetch_range(self, segment: Segment):
+        """Request a segment from its current offset and write it out."""
+        offset = segment.start + segment.done
+        response = self.opener({"Range": f"bytes={offset}-{segment.end}"})
+        try:
+            content_range = _content_range(response)
+            if (getattr(response, "status", 200) != 206
+                    or not content_range or content_range[0] != offset):
+                raise RangeNotSupported("server stopped honouring ranges")
+            # Unbuffered, so bytes counted as done have reached the OS
+            with open(self.filename, "r+b", buffering=0) as f:
+                f.seek(offset)
+                while not segment.complete:
+                    if self._stop.is_set():
+                        return
+                    data = response.read(
+                        min(CHUNK_SIZE, segment.size - segment.done))
+                    if not data:
+                        raise SegmentError(
+                            f"connection closed at byte {offset}")
+                    f.write(data)
+                    offset += len(data)
+                    with self._lock:
+                        segment.done += len(data)
+                    self._report()
+        finally:
+            response.close()
+
+    def _report(self):
+        """Forward progress and save the segment state now and then."""
+        if self.progress:
+            # One caller at a time: the callback may sleep (bandwidth
+            # limit) or block (pause), which then holds every connection
+            with self._progress_lock:
+                self.progress(self.downloaded, self.size)
+        self._save_state()
+
+    def _preallocate(self):
+        """Create the file at its full size unless resuming into it."""
+        if (os.path.isfile(self.filename)
+                and os.path.getsize(self.filename) == self.size
+                and any(s.done for s in self.segments)):
+            return
+        with open(self.filename, "wb") as f:
+            f.truncate(self.size)
+
+    def _load_state(self) -> list[Segment] | None:
+        """Return the saved segments if they belong to this file."""
+        if not self.resume or not os.path.isfile(self.filename):
+            return None
+        try:
+            with open(self.state_filename, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("size") != self.size:
+                return None
+            return [Segment(*s) for s in state["segments"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_state(self, force: bool = False):
+        """Write the segment progress to the state file."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._saved_at < STATE_SAVE_INTERVAL:
+                return
+            self._saved_at = now
+            state = {
+                "size": self.size,
+                "segments": [[s.start, s.end, s.done] for s in self.segments],
+            }
+            tmp = self.state_filename + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_filename)
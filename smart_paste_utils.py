@@ -4,7 +4,6 @@ This module provides custom widgets to validate and paste YouTube URLs
 from the clipboard automatically.
 """
 # pylint: disable=no-name-in-module
-import re
 from typing import Optional
 
 from PyQt5.QtCore import Qt, pyqtSignal  # type: ignore
@@ -16,6 +15,8 @@ from PyQt5.QtWidgets import (  # type: ignore
     QWidget,
 )
 
+from url_parser import parse_url
+
 
 class UrlLineEdit(QLineEdit):
     """Custom QLineEdit that performs smart paste validation for YouTube URLs."""
@@ -58,17 +59,8 @@ class UrlLineEdit(QLineEdit):
 
         This avoids the heavy network overhead of initializing yt-dlp.
         """
-        # Basic check for http/https
-        if not text.lower().startswith(("http://", "https://")):
-            return False
-
-        # Optional: More ergonomic check for YouTube domains
-        # (Matches standard validation logic in main_window.py)
-        youtube_pattern = (
-            r"^https?://(www\.)?"
-            r"(youtube\.com/(watch\?v=|shorts/|live/|embed/|v/)|youtu\.be/).+"
-        )
-        return bool(re.match(youtube_pattern, text, re.IGNORECASE))
+        # Same rules as validate_url in main_window.py
+        return parse_url(text) is not None
 
     def _get_parent_widget(self) -> Optional[QWidget]:
         """Retrieve the closest QWidget parent."""
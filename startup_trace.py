@@ -0,0 +1,155 @@
+"""Startup phase timing.
+
+This module records how long each phase of the application launch takes
+(imports of heavy modules, window construction, first paint) on a single
+monotonic clock, and reports it to the log or to a JSON file. With a
+budget, it tells which phases got slower than allowed, so ``app.py
+--check-startup`` can fail a test run on a startup regression.
+"""
+import importlib
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from types import ModuleType
+from typing import Callable, Iterator
+
+# Upper bounds in seconds: phase durations, or for milestones the time since
+# launch. Generous enough for a cold start on a slow machine.
+STARTUP_BUDGETS = {
+    "import PyQt5.QtWidgets": 0.5,
+    "import loguru": 0.3,
+    "import main_window": 1.0,
+    "YouTubeDownloader.__init__": 0.5,
+    "init_ui": 0.4,
+    "finish_startup": 0.3,
+    "first paint": 2.0,
+}
+
+
+@dataclass
+class Phase:
+    """One timed step of the startup."""
+    name: str
+    start: float  # seconds since the trace origin
+    duration: float = 0.0
+    milestone: bool = False  # a point in time rather than a span
+    thread: str = "MainThread"
+
+    @property
+    def end(self) -> float:
+        """Seconds since the trace origin at which the phase ended."""
+        return self.start + self.duration
+
+
+class StartupTrace:
+    """Collects the phases of one launch."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """Initialize the trace; its origin is the time of creation.
+
+        Args:
+            clock: Monotonic clock returning seconds
+        """
+        self.clock = clock
+        self.origin = clock()
+        self.phases: list[Phase] = []
+        self._lock = threading.Lock()
+
+    def _add(self, phase: Phase):
+        with self._lock:
+            self.phases.append(phase)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a phase."""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._add(Phase(
+                name, start - self.origin, self.clock() - start,
+                thread=threading.current_thread().name))
+
+    def mark(self, name: str):
+        """Record a milestone, such as the first paint."""
+        self._add(Phase(
+            name, self.clock() - self.origin, milestone=True,
+            thread=threading.current_thread().name))
+
+    def timed_import(self, name: str) -> ModuleType:
+        """Import a module, recording its cost if it wasn't loaded yet."""
+        if name in sys.modules:
+            return sys.modules[name]
+        with self.phase(f"import {name}"):
+            return importlib.import_module(name)
+
+    def find(self, name: str) -> Phase | None:
+        """Return the first phase recorded under the given name."""
+        with self._lock:
+            return next((p for p in self.phases if p.name == name), None)
+
+    def report(self) -> dict:
+        """Return the trace as a JSON-serializable dict."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p.start)
+        return {
+            "total": round(max((p.end for p in phases), default=0.0), 4),
+            "phases": [
+                {**asdict(p), "start": round(p.start, 4),
+                 "duration": round(p.duration, 4)}
+                for p in phases
+            ],
+        }
+
+    def format_report(self) -> str:
+        """Return the trace as a human-readable table."""
+        lines = []
+        for p in self.report()["phases"]:
+            took = "" if p["milestone"] else f"{p['duration'] * 1000:8.1f} ms"
+            where = "" if p["thread"] == "MainThread" else f"  [{p['thread']}]"
+            lines.append(
+                f"{p['start'] * 1000:8.1f} ms  {took:>11}  {p['name']}{where}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str):
+        """Write the report to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def over_budget(self, budgets: dict[str, float]) -> list[str]:
+        """List the phases that took longer than their budget.
+
+        Args:
+            budgets: Seconds allowed per phase name; milestones are checked
+                against the time since launch, phases against their duration.
+                Phases that were not recorded are ignored.
+
+        Returns:
+            One message per exceeded budget; empty if all are met
+        """
+        violations = []
+        for name, budget in budgets.items():
+            phase = self.find(name)
+            if phase is None:
+                continue
+            took = phase.start if phase.milestone else phase.duration
+            if took > budget:
+                violations.append(
+                    f"{name}: {took * 1000:.0f} ms > {budget * 1000:.0f} ms")
+        return violations
+
+
+def load_budgets(path: str | None) -> dict[str, float]:
+    """Return the default budgets, overridden by a JSON file if given."""
+    budgets = dict(STARTUP_BUDGETS)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            budgets.update({k: float(v) for k, v in json.load(f).items()})
+    return budgets
+
+
+# Started when this module is first imported; app.py imports it first
+trace = StartupTrace()
@@ -0,0 +1,5 @@
+"""Shared test setup."""
+import os
+
+# The Qt tests don't need a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,88 @@
+"""Tests for the shared bandwidth budget."""
+import pytest
+
+import bandwidth
+from bandwidth import BandwidthGovernor
+
+
+class FakeTime:
+    """Stands in for the time module; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+        self.on_sleep = None
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+        if self.on_sleep:
+            self.on_sleep()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(bandwidth, "time", fake)
+    return fake
+
+
+def test_unlimited_never_sleeps(clock):
+    governor = BandwidthGovernor()
+    handle = governor.register()
+    governor.throttle(handle, 10_000_000)
+    assert clock.slept == 0
+    assert governor.share() == 0
+
+
+def test_throttle_holds_the_download_to_its_rate(clock):
+    governor = BandwidthGovernor(1000)
+    handle = governor.register()
+    governor.throttle(handle, 2000)
+    assert clock.slept == pytest.approx(2.0)
+    # Idle time earns a burst of half a second's worth at most
+    clock.now += 10
+    clock.slept = 0
+    governor.throttle(handle, 500)
+    assert clock.slept == 0
+    governor.throttle(handle, 1000)
+    assert clock.slept == pytest.approx(1.0)
+
+
+def test_budget_is_shared_between_downloads(clock):
+    governor = BandwidthGovernor(1000)
+    first = governor.register()
+    second = governor.register()
+    assert governor.share() == 500
+    governor.throttle(first, 1000)
+    assert clock.slept == pytest.approx(2.0)
+
+    governor.unregister(second)
+    assert governor.share() == 1000
+    clock.slept = 0
+    governor.throttle(first, 1000)
+    assert clock.slept == pytest.approx(1.0)
+    # Unknown handles are not limited
+    governor.throttle(second, 1000)
+    assert clock.slept == pytest.approx(1.0)
+
+
+def test_limit_changes_apply_while_waiting(clock):
+    governor = BandwidthGovernor(100)
+    handle = governor.register()
+    clock.on_sleep = lambda: governor.set_limit(0)
+    governor.throttle(handle, 10_000)
+    assert clock.slept == pytest.approx(0.25)
+    assert governor.limit == 0
+
+
+def test_cancel_stops_waiting(clock):
+    governor = BandwidthGovernor(100)
+    handle = governor.register()
+    sleeps = []
+    clock.on_sleep = lambda: sleeps.append(clock.now)
+    governor.throttle(handle, 10_000, lambda: len(sleeps) >= 2)
+    assert len(sleeps) == 2
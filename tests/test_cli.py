@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from cli import build_parser, parse_rate
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_cli_does_not_import_qt():
+    code = "import sys, cli; print('PyQt5' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, check=True,
+        capture_output=True, text=True).stdout
+    assert output.strip() == "False"
+
+
+def test_parse_rate():
+    assert parse_rate("500K") == 500 * 1024
+    assert parse_rate("2MB/s") == 2 * 1024 * 1024
+    assert parse_rate("1000") == 1000
+
+
+def test_presets_match_case_insensitively():
+    args = build_parser().parse_args(["-f", "mp4-hd (1080p)"])
+    assert args.format == "Mp4-HD (1080p)"
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["-f", "8K"])
@@ -0,0 +1,103 @@
+"""Tests for the schema migrations and the database writer."""
+import sqlite3
+
+import pytest
+
+import database_handler
+from database_handler import MIGRATIONS, init_db
+from db_writer import DatabaseWriter
+
+URL = "https://youtu.be/dQw4w9WgXcQ"
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    with sqlite3.connect(db_path) as conn:
+        # History table as created before retry notes existed
+        conn.execute(
+            "CREATE TABLE history (id INTEGER PRIMARY KEY, url TEXT, "
+            "title TEXT, path TEXT, status TEXT, "
+            "timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO history (url) VALUES (?)", (URL,))
+
+    init_db(db_path)
+    init_db(db_path)  # already up to date: nothing to do
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute(
+        "SELECT video_id, notes FROM history").fetchall() == [
+            ("dQw4w9WgXcQ", None)]
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM history WHERE video_id = ?",
+        ("x",)).fetchall()
+    assert "idx_history_video_id" in str(plan)
+    conn.close()
+
+
+def test_interrupted_migration_is_rolled_back(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "downloads.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE history (id INTEGER PRIMARY KEY, url TEXT, "
+            "title TEXT, path TEXT, status TEXT, "
+            "timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO history (url) VALUES (?)", (URL,))
+
+    def killed_midway(cursor):
+        cursor.execute("ALTER TABLE history ADD COLUMN video_id TEXT")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(
+        database_handler, "MIGRATIONS", [MIGRATIONS[0], killed_midway])
+    with pytest.raises(KeyboardInterrupt):
+        init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        # Version 1 was committed, the ALTER of version 2 was not
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(history)")]
+        assert "video_id" not in columns
+
+    monkeypatch.undo()
+    init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute(
+            "PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        assert conn.execute("SELECT video_id FROM history").fetchall() == [
+            ("dQw4w9WgXcQ",)]
+
+
+def test_writer_commits_queued_writes(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    init_db(db_path)
+    writer = DatabaseWriter(db_path)
+    for i in range(500):
+        writer.record_history(URL, f"Video {i}", "", "Completed")
+    writer.start()
+    assert writer.flush(timeout=10)
+    writer.record_history(URL, "Last", "", "Failed")
+    writer.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 501
+
+
+def test_writer_survives_a_failing_write(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    init_db(db_path)
+    writer = DatabaseWriter(db_path, batch_delay=0)
+    writer.start()
+
+    def broken(db):
+        raise KeyError("no such field")
+
+    writer.submit(broken)
+    assert writer.flush(timeout=10)
+    writer.record_history(URL, "After", "", "Completed")
+    assert writer.flush(timeout=10)
+    writer.close()
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT title FROM history").fetchall() == [
+            ("After",)]
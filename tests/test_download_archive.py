@@ -0,0 +1,59 @@
+"""Tests for the download archive and its folder scan."""
+import os
+
+from database_handler import DatabaseManager, init_db
+from db_writer import DatabaseWriter
+from download_archive import DownloadArchive
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_scan_seeds_archive_from_history_and_file_names(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    folder = tmp_path / "videos"
+    folder.mkdir()
+    old = folder / "Old download.mp4"
+    old.write_bytes(b"x")
+    (folder / "Other [abcdefghijk].mkv").write_bytes(b"y")
+    (folder / "Unknown.mp4.part").write_bytes(b"z")
+    init_db(db_path)
+    with DatabaseManager(db_path) as db:
+        db.record_history(URL, "Old", str(old), "Completed")
+
+    archive = DownloadArchive(db_path)
+    assert archive.scan(str(folder)) == 2
+    assert archive.contains("https://youtu.be/dQw4w9WgXcQ?t=5")
+    assert archive.contains("https://youtube.com/shorts/abcdefghijk")
+    # Unchanged files are not looked at again
+    assert archive.scan(str(folder)) == 0
+
+    # The archive survives a restart; deleting the file forgets the video
+    archive = DownloadArchive(db_path)
+    assert archive.contains(URL)
+    os.remove(old)
+    archive.scan(str(folder))
+    assert not archive.contains(URL)
+    assert not DownloadArchive(db_path).contains(URL)
+
+
+def test_completed_download_is_archived(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    archive = DownloadArchive(db_path)
+    assert not archive.contains(URL)
+    archive.add(URL, "Title", str(tmp_path / "Title.mp4"))
+    assert DownloadArchive(db_path).contains(URL)
+
+
+def test_scan_writes_through_the_writer(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    folder = tmp_path / "videos"
+    folder.mkdir()
+    (folder / "Video [abcdefghijk].mp4").write_bytes(b"x")
+    writer = DatabaseWriter(db_path)
+    archive = DownloadArchive(db_path, writer)
+    assert archive.scan(str(folder)) == 1
+    assert archive.contains("https://youtu.be/abcdefghijk")
+    with DatabaseManager(db_path) as db:
+        assert db.archived_videos() == {}  # still queued in the writer
+    writer.close()
+    assert DownloadArchive(db_path).contains("https://youtu.be/abcdefghijk")
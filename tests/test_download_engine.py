@@ -0,0 +1,194 @@
+"""Tests for DownloadJob, with yt-dlp's download step replaced."""
+import threading
+import time
+
+import pytest
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.utils import PostProcessingError
+
+import metadata
+from download_engine import DownloadJob
+from postprocessing import ProcessingStage
+from ydl_extensions import AppYoutubeDL
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def video_info(expire: float) -> dict:
+    return {
+        "id": "dQw4w9WgXcQ", "title": "Video", "ext": "mp4",
+        "webpage_url": URL, "extractor": "youtube", "epoch": int(time.time()),
+        "formats": [{"format_id": "18", "ext": "mp4",
+                     "url": f"https://example.com/v?expire={int(expire)}"}],
+    }
+
+
+@pytest.fixture(name="downloads")
+def fixture_downloads(monkeypatch):
+    """Replace the download with three progress hook calls."""
+    calls = []
+
+    def process_ie_result(ydl, info, download=True):
+        calls.append(info)
+        for hook in ydl.params["progress_hooks"]:
+            for done in (100, 200, 300):
+                hook({"status": "downloading", "downloaded_bytes": done,
+                      "total_bytes": 300, "filename": "Video.mp4"})
+        return info
+
+    monkeypatch.setattr(AppYoutubeDL, "process_ie_result", process_ie_result)
+    return calls
+
+
+class RecordingPP(PostProcessor):
+    """Stands in for a merge: renames the download to .mkv."""
+
+    def __init__(self):
+        super().__init__()
+        self.ran: list[str] = []
+        self.fail = False
+
+    def run(self, information):
+        self.ran.append(information["filepath"])
+        if self.fail:
+            raise PostProcessingError("ffmpeg exited with code 1")
+        information["filepath"] = information["filepath"][:-4] + ".mkv"
+        return [], information
+
+
+@pytest.fixture(name="postprocessor")
+def fixture_postprocessor(monkeypatch):
+    """Replace the download with one that ends in post-processing."""
+    pp = RecordingPP()
+
+    def process_ie_result(ydl, info, download=True):
+        ydl.add_post_processor(pp, when="post_process")
+        return ydl.post_process(ydl.prepare_filename(info), info)
+
+    monkeypatch.setattr(AppYoutubeDL, "process_ie_result", process_ie_result)
+    return pp
+
+
+def deferred_job(tmp_path, **kwargs) -> DownloadJob:
+    return DownloadJob(URL, {"paths": {"home": str(tmp_path)}},
+                       video_info(time.time() + 6 * 3600),
+                       defer_postprocessing=True, **kwargs)
+
+
+def start(job: DownloadJob) -> tuple[threading.Thread, list]:
+    results = []
+    thread = threading.Thread(target=lambda: results.append(job.run()))
+    thread.start()
+    return thread, results
+
+
+@pytest.fixture(name="extractions")
+def fixture_extractions(monkeypatch):
+    """Count metadata extractions, returning a fresh info dict."""
+    calls = []
+
+    def extract_info(url, refresh=False):
+        calls.append((url, refresh))
+        return video_info(time.time() + 6 * 3600)
+
+    monkeypatch.setattr(metadata, "extract_info", extract_info)
+    return calls
+
+
+@pytest.mark.parametrize("expires_in, extracted", [
+    (6 * 3600, 0),
+    (metadata.EXPIRY_MARGIN / 2, 1),
+    (-60, 1),
+])
+def test_stale_info_is_extracted_again(
+        downloads, extractions, tmp_path, expires_in, extracted):
+    job = DownloadJob(URL, {"paths": {"home": str(tmp_path)}},
+                      video_info(time.time() + expires_in))
+    result = job.run()
+
+    assert result.status == "Completed"
+    assert len(extractions) == extracted
+    assert len(downloads) == 1
+    # The download always gets URLs that are still valid
+    assert metadata.is_fresh(downloads[0])
+
+
+def test_pause_holds_the_transfer(downloads, tmp_path):
+    statuses = []
+    job = DownloadJob(URL, {"paths": {"home": str(tmp_path)}},
+                      video_info(time.time() + 6 * 3600),
+                      on_status=statuses.append)
+    job.pause()
+    thread, results = start(job)
+    time.sleep(0.3)
+    assert thread.is_alive()
+    assert job.is_paused()
+    assert statuses == ["Paused"]
+
+    job.resume()
+    thread.join(5)
+    assert results[0].status == "Completed"
+    assert len(downloads) == 1
+
+
+def test_cancel_while_paused(downloads, tmp_path):
+    job = DownloadJob(URL, {"paths": {"home": str(tmp_path)}},
+                      video_info(time.time() + 6 * 3600))
+    job.pause()
+    thread, results = start(job)
+    time.sleep(0.3)
+    job.cancel()
+    thread.join(5)
+    assert results[0].status == "Cancelled"
+
+
+def test_run_leaves_postprocessing_pending(postprocessor, tmp_path):
+    job = deferred_job(tmp_path)
+    result = job.run()
+
+    assert result.status == "Completed"
+    assert job.needs_processing()
+    assert postprocessor.ran == []
+
+    statuses = []
+    job.on_status = statuses.append
+    final = job.process()
+    assert statuses == ["Processing"]
+    assert len(postprocessor.ran) == 1
+    assert final.status == "Completed"
+    assert final.path == str(tmp_path / "Video [dQw4w9WgXcQ].mkv")
+    assert not job.needs_processing()
+
+
+def test_failed_postprocessing(postprocessor, tmp_path):
+    postprocessor.fail = True
+    job = deferred_job(tmp_path)
+    job.run()
+
+    result = job.process()
+    assert result.status == "Failed"
+    assert not result.success
+    assert "ffmpeg exited" in result.message
+
+
+def test_postprocessing_runs_inline_unless_deferred(postprocessor, tmp_path):
+    job = DownloadJob(URL, {"paths": {"home": str(tmp_path)}},
+                      video_info(time.time() + 6 * 3600))
+    result = job.run()
+
+    assert len(postprocessor.ran) == 1
+    assert not job.needs_processing()
+    assert result.status == "Completed"
+
+
+def test_processing_stage(postprocessor, tmp_path):
+    job = deferred_job(tmp_path)
+    job.run()
+    stage = ProcessingStage(max_workers=1)
+    done = []
+
+    stage.submit(job, done.append).result(5)
+    stage.shutdown()
+    assert [r.status for r in done] == ["Completed"]
+    assert stage.pending_count() == 0
+    assert len(postprocessor.ran) == 1
@@ -0,0 +1,166 @@
+"""Tests for the download pool's dispatching, with stub download threads."""
+import pytest
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QListView
+
+import download_thread
+from download_archive import SKIPPED_STATUS
+from download_pool import DownloadPool
+from queue_item import QueueItem, QueueStatus
+from queue_manager import QueueManager
+
+
+class StubJob:
+    def needs_processing(self):
+        return False
+
+
+class StubThread(QObject):
+    """Stands in for DownloadThread; the test decides when it finishes."""
+
+    progress = pyqtSignal(object)
+    status = pyqtSignal(str)
+    finished = pyqtSignal(bool, str, str, str, str, str, str)
+    started: list["StubThread"] = []
+
+    def __init__(self, url, _ydl_opts, _info=None, item_id=0,
+                 defer_postprocessing=False):
+        super().__init__()
+        self.url = url
+        self.item_id = item_id
+        self.defer_postprocessing = defer_postprocessing
+        self.job = StubJob()
+        self.running = False
+        self.paused = False
+        self.cancelled = False
+
+    def start(self):
+        self.running = True
+        StubThread.started.append(self)
+
+    def finish(self, status="Completed"):
+        self.running = False
+        self.finished.emit(True, "done", self.url, "Title", "", status, "")
+
+    def isRunning(self):  # pylint: disable=invalid-name
+        return self.running
+
+    def wait(self, _timeout=None):
+        return not self.running
+
+    def cancel(self):
+        self.cancelled = True
+        self.running = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def is_paused(self):
+        return self.paused
+
+
+class FakeArchive:
+    def __init__(self, urls):
+        self.urls = set(urls)
+
+    def contains(self, url):
+        return url in self.urls
+
+
+@pytest.fixture(name="make_pool")
+def fixture_make_pool(qtbot, monkeypatch):
+    monkeypatch.setattr(download_thread, "DownloadThread", StubThread)
+    StubThread.started = []
+
+    def make_pool(count, max_workers=2):
+        view = QListView()
+        qtbot.addWidget(view)
+        manager = QueueManager(view)
+        items = [QueueItem(url=f"https://youtu.be/video{i:06d}")
+                 for i in range(count)]
+        manager.add_items(items)
+        pool = DownloadPool(manager, lambda item: {}, max_workers,
+                            prefetch_depth=0)
+        return pool, items
+
+    return make_pool
+
+
+def started_urls():
+    return [thread.url for thread in StubThread.started]
+
+
+def test_dispatch_fills_only_free_slots(make_pool):
+    pool, items = make_pool(5, max_workers=2)
+    pool.start()
+    assert started_urls() == [items[0].url, items[1].url]
+    assert pool.active_count() == 2
+
+    StubThread.started[0].finish()
+    assert started_urls()[-1] == items[2].url
+    assert pool.active_count() == 2
+
+
+def test_archived_items_are_skipped(make_pool):
+    pool, items = make_pool(3, max_workers=2)
+    pool.archive = FakeArchive([items[0].url, items[1].url])
+    items[1].ignore_archive = True  # "Download Anyway"
+    finished = []
+    pool.item_finished.connect(lambda *args: finished.append(args))
+    pool.start()
+    assert finished[0][0] == items[0].item_id
+    assert finished[0][6] == SKIPPED_STATUS
+    assert started_urls() == [items[1].url, items[2].url]
+
+
+def test_all_finished_waits_for_open_feeds(make_pool, qtbot):
+    pool, _ = make_pool(1)
+    pool.feed_opened()
+    pool.start()
+    with qtbot.assertNotEmitted(pool.all_finished):
+        StubThread.started[0].finish()
+    assert pool.running
+    with qtbot.waitSignal(pool.all_finished, timeout=1000):
+        pool.feed_closed()
+    assert not pool.running
+
+
+def test_resume_waits_for_a_free_slot(make_pool):
+    pool, items = make_pool(4, max_workers=2)
+    pool.start()
+    first, second = StubThread.started
+    pool.pause(items[0].item_id)
+    third = StubThread.started[2]  # took the freed slot
+    pool.pause(items[1].item_id)
+    fourth = StubThread.started[3]
+
+    pool.resume(items[0].item_id)
+    pool.resume(items[1].item_id)
+    assert first.paused and second.paused
+    assert pool.transferring_count() == 2
+    assert pool.resume_waiting == [items[0].item_id, items[1].item_id]
+
+    # Resumed downloads go before anything new
+    third.finish()
+    assert not first.paused and second.paused
+    fourth.finish()
+    assert not second.paused
+    assert len(StubThread.started) == 4
+    assert pool.transferring_count() == 2
+
+
+def test_shutdown_stops_running_downloads(make_pool):
+    pool, items = make_pool(3)
+    finished = []
+    pool.item_finished.connect(lambda *args: finished.append(args))
+    pool.start()
+    pool.shutdown(timeout=100)
+    assert all(thread.cancelled for thread in StubThread.started)
+    # Late results are not reported, and nothing else starts
+    StubThread.started[0].finish("Cancelled")
+    assert not finished
+    assert len(StubThread.started) == 2
+    assert items[2].status == QueueStatus.WAITING
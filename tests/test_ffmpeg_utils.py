@@ -0,0 +1,52 @@
+"""Tests for the cached FFmpeg resolution."""
+import os
+import sys
+
+import pytest
+
+import ffmpeg_utils
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """An executable answering ``-version`` like FFmpeg does."""
+    if sys.platform == "win32":
+        pytest.skip("uses a shell script as the fake binary")
+    binary = tmp_path / "ffmpeg"
+    binary.write_text(
+        "#!/bin/sh\necho 'ffmpeg version 7.1-static Copyright (c) 2000-2024'\n")
+    binary.chmod(0o755)
+    calls = []
+
+    def find():
+        calls.append(1)
+        return str(binary)
+
+    monkeypatch.setattr(ffmpeg_utils, "get_ffmpeg_path", find)
+    return binary, calls
+
+
+def test_resolve_caches_path_and_version(tmp_path, fake_ffmpeg):
+    binary, calls = fake_ffmpeg
+    cache = str(tmp_path / "ffmpeg.json")
+
+    info = ffmpeg_utils.resolve_ffmpeg(cache)
+    assert (info.path, info.version) == (str(binary), "7.1-static")
+    # The second launch only stats the cached binary
+    assert ffmpeg_utils.resolve_ffmpeg(cache) == info
+    assert len(calls) == 1
+
+
+def test_changed_binary_is_resolved_again(tmp_path, fake_ffmpeg):
+    binary, calls = fake_ffmpeg
+    cache = str(tmp_path / "ffmpeg.json")
+    ffmpeg_utils.resolve_ffmpeg(cache)
+
+    stat = binary.stat()
+    os.utime(binary, (stat.st_atime, stat.st_mtime + 10))
+    assert ffmpeg_utils.load_cached_ffmpeg(cache) is None
+    ffmpeg_utils.resolve_ffmpeg(cache)
+    assert len(calls) == 2
+
+    binary.unlink()
+    assert ffmpeg_utils.load_cached_ffmpeg(cache) is None
@@ -0,0 +1,44 @@
+"""Tests for the fragment concurrency of DASH/HLS formats."""
+import pytest
+
+from fragment_tuning import (
+    MAX_FRAGMENT_WORKERS,
+    concurrency_for,
+    count_fragments,
+)
+
+
+@pytest.mark.parametrize("fragment_count, workers", [
+    (2, 1),
+    (20, 1),
+    (21, 2),
+    (100, 5),
+    (160, 8),
+    (5000, MAX_FRAGMENT_WORKERS),
+])
+def test_auto_adds_a_worker_per_twenty_fragments(fragment_count, workers):
+    assert concurrency_for("Auto", fragment_count) == workers
+
+
+@pytest.mark.parametrize("mode", ["Auto", "Off", "4", "8"])
+def test_single_fragment_is_sequential(mode):
+    assert concurrency_for(mode, 0) == 1
+    assert concurrency_for(mode, 1) == 1
+
+
+def test_off_is_sequential():
+    assert concurrency_for("Off", 500) == 1
+
+
+def test_fixed_mode_is_capped_by_fragments():
+    assert concurrency_for("4", 500) == 4
+    assert concurrency_for("8", 3) == 3
+    assert concurrency_for("bogus", 500) == 1
+
+
+def test_count_fragments():
+    assert count_fragments({"fragments": [{}] * 12}, 600) == 12
+    # HLS fragment lists are only known at download time
+    assert count_fragments({"protocol": "m3u8_native"}, 601) == 121
+    assert count_fragments({"protocol": "m3u8_native"}, None) == 0
+    assert count_fragments({"protocol": "https"}, 600) == 0
@@ -0,0 +1,118 @@
+"""Tests for URL canonicalization and the shared extraction."""
+import threading
+import time
+
+import pytest
+from yt_dlp.utils import DownloadError
+
+import metadata
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_url_variants_share_a_canonical_key():
+    variants = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?si=abc",
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30&list=PL123",
+        "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+        " https://www.youtube.com/embed/dQw4w9WgXcQ ",
+    ]
+    assert {metadata.canonical_key(url) for url in variants} == {"dQw4w9WgXcQ"}
+    assert metadata.canonical_key(" https://example.com/v.mp4 ") == (
+        "https://example.com/v.mp4")
+
+
+class FakeExtract:
+    """Stands in for metadata._extract, blocking until released."""
+
+    def __init__(self, error: Exception | None = None):
+        self.calls = 0
+        self.error = error
+        self.release = threading.Event()
+
+    def __call__(self, url):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return {"id": "dQw4w9WgXcQ", "title": "Video"}
+
+
+@pytest.fixture(name="extract")
+def fixture_extract(monkeypatch):
+    monkeypatch.setattr(metadata, "_cache", None)
+    monkeypatch.setattr(metadata, "_failures", {})
+    monkeypatch.setattr(metadata, "_flights", {})
+
+    def install(error=None):
+        fake = FakeExtract(error)
+        monkeypatch.setattr(metadata, "_extract", fake)
+        return fake
+
+    return install
+
+
+def extract_concurrently(count):
+    outcomes = [None] * count
+
+    def ask(i):
+        try:
+            outcomes[i] = metadata.extract_info(URL)
+        except DownloadError as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+@pytest.mark.parametrize("error", [None, DownloadError("HTTP Error 429")])
+def test_concurrent_requests_share_one_extraction(extract, error):
+    fake = extract(error)
+    threads, outcomes = extract_concurrently(4)
+    time.sleep(0.2)  # every thread is waiting on the first one
+    fake.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert fake.calls == 1
+    if error:
+        assert all(outcome is error for outcome in outcomes)
+    else:
+        assert all(outcome["title"] == "Video" for outcome in outcomes)
+
+
+def test_permanent_failures_are_remembered(extract, monkeypatch):
+    fake = extract(DownloadError("ERROR: [youtube] dQw4w9WgXcQ: Private video"))
+    fake.release.set()
+    for _ in range(3):
+        with pytest.raises(DownloadError, match="Private video"):
+            metadata.extract_info("https://youtu.be/dQw4w9WgXcQ")
+    assert fake.calls == 1
+
+    later = time.time() + metadata.NEGATIVE_TTL + 1
+    monkeypatch.setattr(metadata.time, "time", lambda: later)
+    with pytest.raises(DownloadError):
+        metadata.extract_info(URL)
+    assert fake.calls == 2
+
+
+def test_transient_failures_are_not_remembered(extract):
+    fake = extract(DownloadError("ERROR: The read operation timed out"))
+    fake.release.set()
+    for _ in range(2):
+        with pytest.raises(DownloadError):
+            metadata.extract_info(URL)
+    assert fake.calls == 2
+    assert not metadata._failures  # pylint: disable=protected-access
+
+
+def test_expired_failures_are_dropped(extract):
+    # pylint: disable=protected-access
+    metadata._failures["gone"] = (time.time() - 1, "Private video")
+    fake = extract(DownloadError("Video unavailable"))
+    fake.release.set()
+    with pytest.raises(DownloadError):
+        metadata.extract_info(URL)
+    assert set(metadata._failures) == {"dQw4w9WgXcQ"}
@@ -0,0 +1,113 @@
+"""Tests for the persistent metadata cache."""
+import sqlite3
+
+import pytest
+
+import metadata_cache
+from metadata_cache import STABLE_TTL, MetadataCache
+
+FORMATS = [{"format_id": "18", "ext": "mp4", "resolution": 360,
+            "size_mb": 1.5}]
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(metadata_cache, "time", fake)
+    return fake
+
+
+def info(video_id):
+    return {"id": video_id, "title": f"Title {video_id}", "duration": 60,
+            "formats": []}
+
+
+def test_stable_fields_expire(tmp_path, clock):
+    cache = MetadataCache(str(tmp_path / "cache.db"))
+    cache.put("aaaaaaaaaaa", info("aaaaaaaaaaa"), FORMATS, clock.now + 3600)
+    assert cache.get("aaaaaaaaaaa").formats == FORMATS
+    clock.now += STABLE_TTL + 1
+    assert cache.get("aaaaaaaaaaa") is None
+    assert cache.get("unknown0000") is None
+
+
+def test_info_expires_before_the_title(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = MetadataCache(path)
+    cache.put("aaaaaaaaaaa", info("aaaaaaaaaaa"), FORMATS, clock.now + 3600)
+    assert cache.get("aaaaaaaaaaa").info["title"] == "Title aaaaaaaaaaa"
+
+    clock.now += 3601
+    cached = cache.get("aaaaaaaaaaa")
+    assert cached.info is None
+    assert cached.title == "Title aaaaaaaaaaa"
+    # The dead blob is dropped by the next write
+    cache.put("bbbbbbbbbbb", info("bbbbbbbbbbb"), FORMATS, clock.now + 3600)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute(
+            "SELECT info FROM metadata WHERE video_id = 'aaaaaaaaaaa'"
+        ).fetchone() == (None,)
+
+
+def test_lookups_are_read_only(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = MetadataCache(path)
+    cache.put("aaaaaaaaaaa", info("aaaaaaaaaaa"), FORMATS, clock.now + 3600)
+    written = clock.now
+    clock.now += 10
+    cache.get("aaaaaaaaaaa")
+    assert last_access(path, "aaaaaaaaaaa") == written
+    # The access time goes out with the next write
+    cache.put("bbbbbbbbbbb", info("bbbbbbbbbbb"), FORMATS, clock.now + 3600)
+    assert last_access(path, "aaaaaaaaaaa") == written + 10
+
+
+def test_corrupt_info_is_ignored(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = MetadataCache(path)
+    cache.put("aaaaaaaaaaa", info("aaaaaaaaaaa"), FORMATS, clock.now + 3600)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE metadata SET info = X'00010203'")
+    cached = cache.get("aaaaaaaaaaa")
+    assert cached.info is None
+    assert cached.title == "Title aaaaaaaaaaa"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = MetadataCache(path)
+    for video_id in ("aaaaaaaaaaa", "bbbbbbbbbbb"):
+        clock.now += 1
+        cache.put(video_id, info(video_id), FORMATS, clock.now + 3600)
+    clock.now += 1
+    cache.get("aaaaaaaaaaa")  # now used more recently than bbb
+
+    # Room for two entries of this size
+    size = entry_size(path, "aaaaaaaaaaa")
+    cache.max_bytes = 2 * size + size // 2
+    clock.now += 1
+    cache.put("ccccccccccc", info("ccccccccccc"), FORMATS, clock.now + 3600)
+    assert cache.get("bbbbbbbbbbb") is None
+    assert cache.get("aaaaaaaaaaa") and cache.get("ccccccccccc")
+
+
+def last_access(path, video_id):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT last_access FROM metadata WHERE video_id = ?",
+            (video_id,)).fetchone()[0]
+
+
+def entry_size(path, video_id):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT size FROM metadata WHERE video_id = ?",
+            (video_id,)).fetchone()[0]
@@ -0,0 +1,82 @@
+"""Tests for the background metadata worker pool."""
+import threading
+import time
+
+from metadata_pool import MetadataWorkerPool
+
+
+class GatedFetch:
+    """Fetch function that holds every extraction until released."""
+
+    def __init__(self):
+        self.order = []
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def __call__(self, url):
+        self.order.append(url)
+        self.started.release()
+        self.release.wait(5)
+        if url.endswith("bad"):
+            raise ValueError("no such video")
+        return {"title": url}
+
+
+def wait_for_results(pool, count):
+    results = []
+    for _ in range(500):
+        results += pool.drain()
+        if len(results) >= count:
+            break
+        time.sleep(0.01)
+    return results
+
+
+def test_duplicates_are_fetched_once():
+    fetch = GatedFetch()
+    pool = MetadataWorkerPool(workers=1, fetch=fetch)
+    pool.submit("a")
+    assert fetch.started.acquire(timeout=5)
+    pool.submit("a")  # running
+    pool.submit("b")
+    pool.submit("b")  # pending
+    assert pool.is_busy("a") and pool.is_busy("b") and not pool.is_busy("c")
+    fetch.release.set()
+    results = wait_for_results(pool, 2)
+    assert fetch.order == ["a", "b"]
+    assert sorted(result.url for result in results) == ["a", "b"]
+    pool.shutdown()
+
+
+def test_urgent_urls_go_first_and_pending_ones_can_be_cancelled():
+    fetch = GatedFetch()
+    pool = MetadataWorkerPool(workers=1, fetch=fetch)
+    pool.submit("running")
+    assert fetch.started.acquire(timeout=5)
+    for url in ("b", "c", "d", "e"):
+        pool.submit(url)
+    pool.submit("d", urgent=True)
+    pool.submit("f", urgent=True)
+    assert pool.cancel("c")
+    assert not pool.cancel("c")
+    assert not pool.cancel("running")  # already started
+    fetch.release.set()
+    wait_for_results(pool, 5)
+    assert fetch.order == ["running", "f", "d", "b", "e"]
+    assert not pool.is_busy("c")
+    pool.shutdown()
+
+
+def test_drain_returns_each_result_once():
+    fetch = GatedFetch()
+    fetch.release.set()
+    pool = MetadataWorkerPool(workers=2, fetch=fetch)
+    pool.submit("good")
+    pool.submit("bad")
+    results = {result.url: result for result in wait_for_results(pool, 2)}
+    assert results["good"].info == {"title": "good"}
+    assert results["bad"].info is None
+    assert results["bad"].error == "no such video"
+    assert pool.drain() == []
+    assert not pool.has_work()
+    pool.shutdown()
@@ -0,0 +1,53 @@
+"""Tests for playlist listing, with yt-dlp's flat extraction replaced."""
+import pytest
+import yt_dlp
+
+from playlist_listing import PlaylistListing, PlaylistOptions
+
+PLAYLIST = "https://www.youtube.com/playlist?list=PLtest"
+VIDEO_IDS = [f"video{i:06d}" for i in range(1, 7)]
+DURATIONS = [60, 600, None, 120, 900, 30]
+
+
+@pytest.fixture(autouse=True)
+def flat_playlist(monkeypatch):
+    def extract_info(_ydl, url, download=True, process=True, ie_key=None):
+        assert url == PLAYLIST and not download and not process
+        return {
+            "_type": "playlist",
+            "title": "Test playlist",
+            "entries": [
+                {"_type": "url", "ie_key": "Youtube", "id": video_id,
+                 "url": f"https://www.youtube.com/watch?v={video_id}",
+                 "title": f"Part {i}", "duration": duration}
+                for i, (video_id, duration)
+                in enumerate(zip(VIDEO_IDS, DURATIONS), 1)
+            ],
+        }
+
+    monkeypatch.setattr(yt_dlp.YoutubeDL, "extract_info", extract_info)
+
+
+def listed(options):
+    listing = PlaylistListing(PLAYLIST, options)
+    entries = list(listing.entries())
+    assert listing.title == "Test playlist"
+    return [(entry.index, entry.title) for entry in entries]
+
+
+def test_all_entries_are_listed():
+    assert listed(None) == [(i, f"Part {i}") for i in range(1, 7)]
+
+
+def test_item_range():
+    assert listed(PlaylistOptions(items="1-3")) == [
+        (1, "Part 1"), (2, "Part 2"), (3, "Part 3")]
+
+
+def test_duration_and_title_filters():
+    # Unknown durations are kept
+    assert listed(PlaylistOptions(max_duration=120)) == [
+        (1, "Part 1"), (3, "Part 3"), (4, "Part 4"), (6, "Part 6")]
+    assert listed(PlaylistOptions(
+        items="2-6", title_filter=r"part [45]", max_duration=600)) == [
+            (4, "Part 4")]
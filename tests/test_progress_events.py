@@ -0,0 +1,64 @@
+"""Tests for the progress rate limit."""
+import pytest
+
+import progress_events
+from progress_events import ProgressCoalescer
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(progress_events, "time", fake)
+    return fake
+
+
+def progress(downloaded):
+    return {"status": "downloading", "downloaded_bytes": downloaded,
+            "total_bytes": 1000, "filename": "video.mp4"}
+
+
+def test_calls_within_an_interval_are_dropped(clock):
+    events = []
+    coalescer = ProgressCoalescer(7, events.append, max_rate_hz=10)
+    for downloaded in (100, 200, 300):
+        coalescer.offer(progress(downloaded))
+        clock.now += 0.04
+    clock.now += 0.1
+    coalescer.offer(progress(400))
+    assert [e.downloaded for e in events] == [100, 400]
+    assert events[0].item_id == 7
+    assert events[0].percent == 10
+
+
+def test_force_ignores_the_rate_limit(clock):
+    events = []
+    coalescer = ProgressCoalescer(1, events.append, max_rate_hz=10)
+    coalescer.offer(progress(100))
+    coalescer.offer(progress(200))
+    coalescer.offer(progress(1000), force=True)
+    assert [e.downloaded for e in events] == [100, 1000]
+    # The forced call superseded the one dropped before it
+    coalescer.flush()
+    assert len(events) == 2
+
+
+def test_flush_sends_the_last_dropped_call(clock):
+    events = []
+    coalescer = ProgressCoalescer(1, events.append, max_rate_hz=10)
+    coalescer.offer(progress(100))
+    coalescer.offer(progress(200))
+    coalescer.offer(progress(300))
+    coalescer.flush()
+    coalescer.flush()  # nothing left
+    assert [e.downloaded for e in events] == [100, 300]
+    # Flushing uses up the slot
+    coalescer.offer(progress(400))
+    assert len(events) == 2
@@ -0,0 +1,58 @@
+"""Tests for the queue manager."""
+import time
+
+from PyQt5.QtWidgets import QListView
+
+from queue_item import QueueItem, QueueStatus
+from queue_manager import QueueManager
+
+
+class RecordingPool:
+    """Stands in for the MetadataWorkerPool."""
+
+    def __init__(self, busy=()):
+        self.busy = set(busy)
+        self.submitted = []
+
+    def submit(self, url, urgent=False):
+        self.submitted.append((url, urgent))
+
+    def is_busy(self, url):
+        return url in self.busy
+
+    def has_work(self):
+        return False
+
+    def drain(self):
+        return []
+
+    def shutdown(self):
+        pass
+
+
+def fresh_info():
+    expires = int(time.time()) + 6 * 3600
+    return {"formats": [{"url": f"https://example.com/v?expire={expires}"}]}
+
+
+def test_prefetch_ahead_takes_the_next_waiting_items(qtbot):
+    view = QListView()
+    qtbot.addWidget(view)
+    manager = QueueManager(view)
+    manager.metadata_pool.shutdown()
+    items = [QueueItem(url=f"https://youtu.be/video{i:06d}") for i in range(8)]
+    manager.add_items(items)
+    items[0].status = QueueStatus.COMPLETED
+    items[2].status = QueueStatus.DOWNLOADING
+    items[3].info = fresh_info()
+    pool = manager.metadata_pool = RecordingPool(busy=[items[4].url])
+
+    manager.prefetch_ahead(4)
+    # Waiting items 1, 3, 4 and 5 are looked at; 3 is fresh, 4 is running
+    assert pool.submitted == [(items[1].url, True), (items[5].url, True)]
+
+    # A failed fetch is tried again next time
+    manager.on_title_fetch_failed(items[1].url, "timed out")
+    pool.submitted.clear()
+    manager.prefetch_ahead(1)
+    assert pool.submitted == [(items[1].url, True)]
@@ -0,0 +1,81 @@
+"""Tests for the queue view's model and delegate."""
+import pytest
+from PyQt5.QtCore import QPoint, Qt  # type: ignore
+from PyQt5.QtWidgets import QListView  # type: ignore
+
+from queue_item import QueueItem
+from queue_item_delegate import BUTTON_SIZE, MARGIN, QueueItemDelegate
+from queue_model import ITEM_ROLE, QueueModel
+
+
+def make_items(count: int) -> list[QueueItem]:
+    return [QueueItem(url=f"https://youtu.be/video{i:06d}")
+            for i in range(count)]
+
+
+@pytest.fixture(name="model")
+def fixture_model(qtbot):  # pylint: disable=unused-argument
+    return QueueModel(make_items(5))
+
+
+def assert_rows_consistent(model: QueueModel):
+    for row, item in enumerate(model.items):
+        assert model.row_of(item.item_id) == row
+        assert model.data(model.index(row), ITEM_ROLE) is item
+    assert model.rowCount() == len(model.items)
+
+
+def test_refresh_row_repaints_one_row(model, qtbot):
+    with qtbot.waitSignal(model.dataChanged) as blocker:
+        model.refresh_row(3)
+    top_left, bottom_right = blocker.args[:2]
+    assert top_left.row() == bottom_right.row() == 3
+
+
+def test_append_remove_and_move_keep_rows(model):
+    model.append(make_items(3))
+    assert_rows_consistent(model)
+
+    removed = model.remove_row(1)
+    assert model.row_of(removed.item_id) == -1
+    assert_rows_consistent(model)
+
+    moved = model.items[0]
+    model.move_row(0, 4)
+    assert model.row_of(moved.item_id) == 4
+    assert_rows_consistent(model)
+
+    moved = model.items[5]
+    model.move_row(5, 2)
+    assert model.row_of(moved.item_id) == 2
+    assert_rows_consistent(model)
+
+
+def test_remove_updates_the_numbers_below(model, qtbot):
+    with qtbot.waitSignal(model.dataChanged) as blocker:
+        model.remove_row(1)
+    top_left, bottom_right = blocker.args[:2]
+    assert (top_left.row(), bottom_right.row()) == (1, 3)
+    assert model.data(model.index(1)).startswith("#2 ")
+
+
+def test_delegate_remove_click(model, qtbot):
+    view = QListView()
+    qtbot.addWidget(view)
+    view.setModel(model)
+    delegate = QueueItemDelegate(view)
+    view.setItemDelegate(delegate)
+    view.resize(400, 400)
+    view.show()
+    qtbot.waitExposed(view)
+
+    rect = view.visualRect(model.index(2))
+    button = QPoint(rect.left() + MARGIN + BUTTON_SIZE // 2,
+                    rect.center().y())
+    with qtbot.waitSignal(delegate.remove_clicked) as blocker:
+        qtbot.mouseClick(view.viewport(), Qt.LeftButton, pos=button)
+    assert blocker.args == [2]
+
+    # A click on the text doesn't remove anything
+    with qtbot.assertNotEmitted(delegate.remove_clicked):
+        qtbot.mouseClick(view.viewport(), Qt.LeftButton, pos=rect.center())
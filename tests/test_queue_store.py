@@ -0,0 +1,36 @@
+"""Tests for the persistent queue."""
+from database_handler import init_db
+from db_writer import DatabaseWriter
+from queue_item import QueueItem, QueueStatus
+from queue_store import QueueStore
+
+
+def test_queue_survives_restart(tmp_path):
+    db_path = str(tmp_path / "downloads.db")
+    init_db(db_path)
+    writer = DatabaseWriter(db_path)
+    writer.start()
+    store = QueueStore(writer)
+    items = [
+        QueueItem(url=f"https://youtu.be/video{i:06d}", title=f"Video {i}",
+                  format_selection="Audio Only (MP3)")
+        for i in range(4)
+    ]
+    store.add(items)
+    items[0].status = QueueStatus.COMPLETED
+    items[1].status = QueueStatus.DOWNLOADING
+    items[1].partial_path = "/tmp/Video 1.mp4.part"
+    items[1].ignore_archive = True
+    store.save(items[0])
+    store.save(items[1])
+    store.swap(items[2], items[3])
+    store.remove(items[0])
+    writer.close()
+
+    items, interrupted = QueueStore(DatabaseWriter(db_path)).load(db_path)
+    assert interrupted
+    assert [item.title for item in items] == ["Video 1", "Video 3", "Video 2"]
+    assert items[0].status == QueueStatus.WAITING
+    assert items[0].partial_path == "/tmp/Video 1.mp4.part"
+    assert items[0].ignore_archive and not items[1].ignore_archive
+    assert items[1].format_selection == "Audio Only (MP3)"
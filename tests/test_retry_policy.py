@@ -0,0 +1,92 @@
+"""Tests for the classification and handling of failed downloads."""
+import pytest
+from yt_dlp.utils import DownloadCancelled, DownloadError
+
+from retry_policy import (
+    RELAXED_AUDIO_FORMAT,
+    RELAXED_FORMAT,
+    ErrorKind,
+    RetryAction,
+    RetryPolicy,
+    classify_error,
+    relaxed_format,
+)
+
+# Messages as yt-dlp reports them
+FORMAT = ("ERROR: [youtube] dQw4w9WgXcQ: Requested format is not available. "
+          "Use --list-formats for a list of available formats")
+PRIVATE = ("ERROR: [youtube] dQw4w9WgXcQ: Private video. Sign in if you've "
+           "been granted access to this video")
+RATE_LIMITED = ("ERROR: unable to download video data: "
+                "HTTP Error 429: Too Many Requests")
+NO_DNS = ("ERROR: [youtube] dQw4w9WgXcQ: Unable to download API page: "
+          "Failed to resolve 'www.youtube.com' "
+          "([Errno -2] Name or service not known)")
+
+
+@pytest.mark.parametrize("error, kind", [
+    (DownloadCancelled(), ErrorKind.CANCELLED),
+    (DownloadError(FORMAT), ErrorKind.FORMAT),
+    (DownloadError(PRIVATE), ErrorKind.PERMANENT),
+    (DownloadError("ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. "
+                   "This video has been removed by the uploader"),
+     ErrorKind.PERMANENT),
+    (DownloadError("ERROR: Unsupported URL: https://example.com/"),
+     ErrorKind.PERMANENT),
+    (DownloadError(RATE_LIMITED), ErrorKind.TRANSIENT),
+    (DownloadError("ERROR: unable to download video data: "
+                   "HTTP Error 403: Forbidden"), ErrorKind.TRANSIENT),
+    (DownloadError("ERROR: unable to download video data: "
+                   "HTTP Error 503: Service Unavailable"), ErrorKind.TRANSIENT),
+    (DownloadError(NO_DNS), ErrorKind.TRANSIENT),
+    (DownloadError("ERROR: The read operation timed out"),
+     ErrorKind.TRANSIENT),
+    (DownloadError("ERROR: ('Connection aborted.', ConnectionResetError("
+                   "104, 'Connection reset by peer'))"), ErrorKind.TRANSIENT),
+    (DownloadError("ERROR: unable to download video data: "
+                   "HTTP Error 404: Not Found"), ErrorKind.UNKNOWN),
+    (DownloadError("ERROR: Postprocessing: ffprobe and ffmpeg not found. "
+                   "Please install or provide the path using "
+                   "--ffmpeg-location"), ErrorKind.UNKNOWN),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) is kind
+
+
+@pytest.mark.parametrize("attempt, message, relaxed, action", [
+    (1, PRIVATE, False, RetryAction.GIVE_UP),
+    (1, FORMAT, False, RetryAction.RELAX_FORMAT),
+    (2, FORMAT, True, RetryAction.GIVE_UP),
+    (1, RATE_LIMITED, False, RetryAction.BACKOFF),
+    (2, NO_DNS, True, RetryAction.BACKOFF),
+    (3, RATE_LIMITED, False, RetryAction.GIVE_UP),
+    (2, "ERROR: something new", False, RetryAction.BACKOFF),
+    (3, "ERROR: something new", False, RetryAction.GIVE_UP),
+])
+def test_decide(attempt, message, relaxed, action):
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=30.0)
+    decision = policy.decide(attempt, DownloadError(message), relaxed)
+    assert decision.action is action
+    assert decision.reason
+    if action is RetryAction.BACKOFF:
+        # Jittered within the upper half of 2^(attempt-1) seconds
+        ceiling = 2 ** (attempt - 1)
+        assert ceiling / 2 <= decision.delay <= ceiling
+    else:
+        assert decision.delay == 0
+
+
+def test_cancel_is_never_retried():
+    decision = RetryPolicy().decide(1, DownloadCancelled(), False)
+    assert decision.action is RetryAction.GIVE_UP
+    assert decision.kind is ErrorKind.CANCELLED
+
+
+@pytest.mark.parametrize("selector, relaxed", [
+    ("bestaudio/best", RELAXED_AUDIO_FORMAT),
+    ("bestaudio[ext=m4a]", RELAXED_AUDIO_FORMAT),
+    ("bestvideo[height<=1080]+bestaudio/best[height<=1080]", RELAXED_FORMAT),
+    ("", RELAXED_FORMAT),
+])
+def test_relaxed_format(selector, relaxed):
+    assert relaxed_format(selector) == relaxed
@@ -0,0 +1,182 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from yt_dlp.downloader.http import HttpFD
+
+from segmented_download import (
+    RangeNotSupported,
+    SegmentedDownload,
+    plan_segments,
+    urllib_opener,
+)
+from ydl_extensions import AppYoutubeDL, SegmentedHttpFD
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 123)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD, honouring Range headers unless ranges are off."""
+
+    ranges = True
+    probe_only = False
+    served = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        header = self.headers.get("Range")
+        if self.probe_only and header != "bytes=0-0":
+            header = None
+        if self.ranges and header:
+            start, end = header.split("=")[1].split("-")
+            start, end = int(start), min(int(end), len(PAYLOAD) - 1)
+            body = PAYLOAD[start:end + 1]
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients drop a 200 response once they see ranges are ignored
+            return
+        type(self).served += len(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url():
+    RangeHandler.ranges = True
+    RangeHandler.probe_only = False
+    RangeHandler.served = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/file"
+    server.shutdown()
+    server.server_close()
+
+
+def test_plan_segments_cover_the_file():
+    segments = plan_segments(10_000_001, 4, min_segment=1000)
+    assert len(segments) == 16
+    assert segments[0].start == 0
+    assert segments[-1].end == 10_000_000
+    for before, after in zip(segments, segments[1:]):
+        assert after.start == before.end + 1
+    assert len(plan_segments(500, 4, min_segment=1000)) == 1
+
+
+def test_download_in_segments(server_url, tmp_path):
+    target = str(tmp_path / "video.mp4")
+    reports = []
+    download = SegmentedDownload(
+        urllib_opener(server_url), target, connections=4,
+        progress=lambda done, total: reports.append((done, total)),
+        min_segment=256 * 1024)
+
+    assert download.run() == len(PAYLOAD)
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(download.state_filename)
+    assert reports[-1] == (len(PAYLOAD), len(PAYLOAD))
+
+
+def test_resume_fetches_only_missing_bytes(server_url, tmp_path):
+    target = str(tmp_path / "video.mp4")
+
+    def interrupt(done, _total):
+        if done > len(PAYLOAD) // 2:
+            raise KeyboardInterrupt
+
+    first = SegmentedDownload(
+        urllib_opener(server_url), target, connections=3,
+        progress=interrupt, min_segment=256 * 1024)
+    with pytest.raises(KeyboardInterrupt):
+        first.run()
+    assert os.path.exists(first.state_filename)
+
+    RangeHandler.served = 0
+    second = SegmentedDownload(
+        urllib_opener(server_url), target, connections=3,
+        min_segment=256 * 1024)
+    second.run()
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert RangeHandler.served < len(PAYLOAD) * 0.75
+
+
+def test_server_without_ranges(server_url, tmp_path):
+    RangeHandler.ranges = False
+    download = SegmentedDownload(
+        urllib_opener(server_url), str(tmp_path / "video.mp4"))
+    with pytest.raises(RangeNotSupported):
+        download.run()
+
+
+def download_with_ydl(url, target):
+    """Run AppYoutubeDL on a plain HTTP format, returning its hooks."""
+    hooks = []
+    params = {
+        "segment_connections": 4,
+        "progress_hooks": [hooks.append],
+        "quiet": True,
+        "noprogress": True,
+    }
+    info = {"id": "x", "url": url, "protocol": "http", "ext": "mp4"}
+    with AppYoutubeDL(params) as ydl:
+        assert ydl.dl(target, info)
+    return hooks
+
+
+def test_ydl_picks_the_segmented_downloader(server_url, tmp_path,
+                                            monkeypatch):
+    used = []
+    real_download = SegmentedHttpFD.real_download
+
+    def spy(fd, filename, info_dict):
+        used.append(type(fd))
+        return real_download(fd, filename, info_dict)
+
+    monkeypatch.setattr(SegmentedHttpFD, "real_download", spy)
+    target = str(tmp_path / "video.mp4")
+    hooks = download_with_ydl(server_url, target)
+
+    assert used == [SegmentedHttpFD]
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    finished = [h for h in hooks if h["status"] == "finished"]
+    assert len(finished) == 1
+    assert finished[0]["downloaded_bytes"] == len(PAYLOAD)
+    assert finished[0]["total_bytes"] == len(PAYLOAD)
+
+
+def test_ydl_falls_back_without_ranges(server_url, tmp_path, monkeypatch):
+    # The size probe succeeds, so the .part is preallocated before the
+    # first segment finds the server ignoring ranges
+    RangeHandler.probe_only = True
+    target = str(tmp_path / "video.mp4")
+    handed_over, leftovers = [], []
+    real_download = HttpFD.real_download
+
+    def spy(fd, filename, info_dict):
+        handed_over.append(type(fd))
+        part = fd.temp_name(filename)
+        leftovers.extend(
+            p for p in (part, part + ".segments") if os.path.exists(p))
+        return real_download(fd, filename, info_dict)
+
+    monkeypatch.setattr(HttpFD, "real_download", spy)
+    download_with_ydl(server_url, target)
+
+    assert handed_over == [SegmentedHttpFD]
+    assert leftovers == []
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
@@ -0,0 +1,74 @@
+"""Tests for the startup phase trace and its budget check."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from startup_trace import STARTUP_BUDGETS, StartupTrace, load_budgets
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases_and_milestones():
+    clock = FakeClock()
+    trace = StartupTrace(clock)
+    with trace.phase("init_ui"):
+        clock.now += 0.25
+    clock.now += 0.5
+    trace.mark("first paint")
+
+    report = trace.report()
+    assert report["total"] == 0.75
+    assert [p["name"] for p in report["phases"]] == ["init_ui", "first paint"]
+    assert trace.over_budget({"init_ui": 0.3, "first paint": 1.0}) == []
+    assert trace.over_budget({"init_ui": 0.2, "first paint": 0.7}) == [
+        "init_ui: 250 ms > 200 ms",
+        "first paint: 750 ms > 700 ms",
+    ]
+    # Phases that didn't run are not checked
+    assert trace.over_budget({"init_tray": 0.0}) == []
+
+
+def test_budget_file_overrides_defaults(tmp_path):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps({"init_ui": 1}))
+    budgets = load_budgets(str(path))
+    assert budgets["init_ui"] == 1.0
+    assert "first paint" in budgets
+
+
+def test_app_startup_is_traced(tmp_path):
+    """Run the real startup and check that its phases are traced.
+
+    Budgets depend on the machine, so they are not enforced here; run
+    ``python app.py --check-startup`` to check them.
+    """
+    pytest.importorskip("PyQt5.QtWidgets")
+    report = tmp_path / "startup.json"
+    budgets = tmp_path / "budgets.json"
+    budgets.write_text(json.dumps({name: 600 for name in STARTUP_BUDGETS}))
+    home = tmp_path / "home"
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen",
+           "HOME": str(home), "XDG_CONFIG_HOME": str(home / ".config")}
+    result = subprocess.run(
+        [sys.executable, str(APP), "--check-startup", str(budgets),
+         "--trace-startup", str(report)],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60,
+        check=False)
+    assert result.returncode == 0, result.stderr
+    names = {p["name"] for p in json.loads(report.read_text())["phases"]}
+    assert {"import main_window", "init_ui", "first paint"} <= names
+    # Neither settings nor an app folder were written
+    assert not (home / ".config" / "YouTubeDownloader").exists()
+    assert not (tmp_path / "My YT Downloads").exists()
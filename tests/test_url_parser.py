@@ -0,0 +1,47 @@
+"""Tests for the URL classifier."""
+import pytest
+
+from url_parser import ParsedUrl, UrlKind, parse_time, parse_url
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url, expected", [
+    (f"https://www.youtube.com/watch?v={VIDEO_ID}",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID)),
+    (f"https://youtu.be/{VIDEO_ID}?t=1m30s",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID, start_time=90)),
+    (f"https://m.youtube.com/watch?feature=share&v={VIDEO_ID}&list=PLabc123&t=42",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID, "PLabc123", 42)),
+    (f"https://youtube.com/shorts/{VIDEO_ID}",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID)),
+    (f"https://www.youtube.com/live/{VIDEO_ID}?si=x",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID)),
+    (f"https://www.youtube.com/embed/{VIDEO_ID}?start=15",
+     ParsedUrl(UrlKind.VIDEO, VIDEO_ID, start_time=15)),
+    ("https://www.youtube.com/playlist?list=PLabc123",
+     ParsedUrl(UrlKind.PLAYLIST, playlist_id="PLabc123")),
+    ("https://www.youtube.com/@SomeChannel/videos",
+     ParsedUrl(UrlKind.CHANNEL)),
+    ("https://www.youtube.com/channel/UC1234567890",
+     ParsedUrl(UrlKind.CHANNEL)),
+])
+def test_parse_url(url, expected):
+    assert parse_url(url) == expected
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=short",
+    "https://youtu.be/",
+    "https://www.youtube.com/feed/trending",
+    "https://example.com/watch?v=dQw4w9WgXcQ",
+    "youtube.com/watch?v=dQw4w9WgXcQ",
+])
+def test_rejects_other_urls(url):
+    assert parse_url(url) is None
+
+
+def test_parse_time():
+    assert parse_time("1h2m3s") == 3723
+    assert parse_time("90") == 90
+    assert parse_time("soon") == 0
@@ -100,7 +100,7 @@ QComboBox QAbstractItemView {
     border: 1px solid #7eb4ea;
 }
 
-QListWidget {
+QListWidget, QListView {
     background-color: #ffffff;
     color: #000000;
     border: 1px solid #7eb4ea;
@@ -110,17 +110,17 @@ QListWidget {
     padding: 2px;
 }
 
-QListWidget::item {
+QListWidget::item, QListView::item {
     padding: 4px;
     border-bottom: 1px solid #e0e0e0;
 }
 
-QListWidget::item:selected {
+QListWidget::item:selected, QListView::item:selected {
     background-color: #3399ff;
     color: white;
 }
 
-QListWidget::item:hover {
+QListWidget::item:hover, QListView::item:hover {
     background-color: #e5f3fb;
 }
 
@@ -0,0 +1,107 @@
+"""Fast classification of YouTube URLs, without yt-dlp.
+
+This module parses the URL forms the app accepts (watch, shorts, live,
+embed, youtu.be, playlist and channel URLs) into a ParsedUrl carrying the
+video ID, playlist ID and start time. Everything is done with precompiled
+patterns and string operations, so a URL is parsed in a few microseconds
+and bulk pastes, validation and duplicate checks never wait for yt-dlp.
+"""
+import re
+from dataclasses import dataclass
+from enum import Enum
+
+_URL_RE = re.compile(
+    r"^https?://(?:www\.|m\.|music\.)?(youtu\.be|youtube\.com)"
+    r"(/[^?#]*)?(?:\?([^#]*))?(?:#(.*))?$",
+    re.IGNORECASE,
+)
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_PLAYLIST_ID_RE = re.compile(r"^[A-Za-z0-9_-]{2,}$")
+_PARAM_RE = re.compile(r"(?:^|&)(v|list|t|start)=([^&]*)")
+_TIME_RE = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?$")
+
+# Path prefixes followed by a video ID
+_VIDEO_PATHS = frozenset(("shorts", "live", "embed", "v"))
+# Path prefixes naming a channel
+_CHANNEL_PATHS = frozenset(("channel", "c", "user"))
+
+
+class UrlKind(Enum):
+    """What a URL points at."""
+    VIDEO = "video"
+    PLAYLIST = "playlist"
+    CHANNEL = "channel"
+
+
+@dataclass(frozen=True)
+class ParsedUrl:
+    """A recognized YouTube URL."""
+    kind: UrlKind
+    video_id: str | None = None
+    playlist_id: str | None = None
+    start_time: int = 0  # seconds, from t= or start=
+
+    @property
+    def is_collection(self) -> bool:
+        """Whether the URL lists several videos (playlist or channel)."""
+        return self.kind is not UrlKind.VIDEO
+
+
+def parse_time(value: str) -> int:
+    """Convert a ``t=`` value such as ``90``, ``90s`` or ``1m30s`` to seconds.
+
+    Args:
+        value: The parameter value
+
+    Returns:
+        The offset in seconds, or 0 if it can't be read
+    """
+    match = _TIME_RE.match(value)
+    if not match:
+        return 0
+    hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_url(url: str) -> ParsedUrl | None:
+    """Classify a YouTube URL.
+
+    Args:
+        url: URL entered or pasted by the user
+
+    Returns:
+        The parsed URL, or None if it isn't a video, playlist or channel URL
+    """
+    match = _URL_RE.match(url.strip())
+    if not match:
+        return None
+    host, path, query, fragment = match.groups()
+    params = dict(_PARAM_RE.findall(query)) if query else {}
+    if fragment and fragment.startswith("t="):
+        params.setdefault("t", fragment[2:])
+    parts = path.strip("/").split("/") if path else [""]
+    head = parts[0]
+
+    video_id = None
+    if host.lower() == "youtu.be":
+        video_id = head
+    elif head == "watch":
+        video_id = params.get("v")
+    elif head in _VIDEO_PATHS and len(parts) > 1:
+        video_id = parts[1]
+    elif head.startswith("@") or (head in _CHANNEL_PATHS and len(parts) > 1):
+        return ParsedUrl(UrlKind.CHANNEL)
+
+    playlist_id = params.get("list")
+    if playlist_id is not None and not _PLAYLIST_ID_RE.match(playlist_id):
+        playlist_id = None
+    if video_id is not None:
+        if not _VIDEO_ID_RE.match(video_id):
+            return None
+        start = params.get("t") or params.get("start")
+        return ParsedUrl(
+            UrlKind.VIDEO, video_id, playlist_id,
+            parse_time(start) if start else 0)
+    if playlist_id and head in ("playlist", "watch"):
+        return ParsedUrl(UrlKind.PLAYLIST, playlist_id=playlist_id)
+    return None
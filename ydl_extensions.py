@@ -0,0 +1,205 @@
+"""yt-dlp extensions used by the download engine.
+
+This module holds the pieces that subclass yt-dlp classes, so importing the
+lightweight modules they build on (fragment_tuning, segmented_download)
+doesn't pull in yt-dlp:
+
+- FragmentTuningPP sets the fragment concurrency of DASH/HLS formats.
+- SegmentedHttpFD downloads plain HTTP(S) formats over several ranged
+  connections, falling back to HttpFD when the server ignores ranges.
+- AppYoutubeDL selects SegmentedHttpFD as the downloader for such formats,
+  and can hold post-processing back so it runs outside the download slot.
+"""
+import http.client
+import os
+import time
+from typing import Callable
+
+import yt_dlp
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import TransportError
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.utils.networking import HTTPHeaderDict
+
+from fragment_tuning import concurrency_for, count_fragments
+from segmented_download import RangeNotSupported, SegmentedDownload
+
+
+class FragmentTuningPP(PostProcessor):
+    """Sets the fragment concurrency once formats have been selected."""
+
+    def __init__(
+        self,
+        downloader,
+        mode: str,
+        on_tuned: Callable[[int, int], None] | None = None,
+    ):
+        """Initialize the post-processor.
+
+        Args:
+            downloader: The YoutubeDL instance that will run the download
+            mode: Fragment mode of the item's preset
+            on_tuned: Called with (concurrency, fragment_count)
+        """
+        super().__init__(downloader)
+        self.mode = mode
+        self.on_tuned = on_tuned
+
+    def run(self, information):
+        """Apply the concurrency for the selected formats."""
+        duration = information.get("duration")
+        selected = information.get("requested_formats") or [information]
+        fragment_count = max(
+            (count_fragments(f, duration) for f in selected), default=0)
+        workers = concurrency_for(self.mode, fragment_count)
+        # FileDownloader reads the shared params dict when it is created
+        self._downloader.params["concurrent_fragment_downloads"] = workers
+        if workers > 1:
+            self.to_screen(
+                f"Downloading {fragment_count} fragments, {workers} at a time")
+        if self.on_tuned:
+            self.on_tuned(workers, fragment_count)
+        return [], information
+
+
+class SegmentedHttpFD(HttpFD):
+    """yt-dlp downloader fetching plain HTTP(S) formats in byte ranges.
+
+    Falls back to yt-dlp's single-connection HttpFD whenever the server
+    doesn't support ranges.
+    """
+
+    FD_NAME = "segmented"
+
+    @staticmethod
+    def can_segment(info_dict: dict, params: dict) -> bool:
+        """Check whether a format can be downloaded in ranges."""
+        return (
+            int(params.get("segment_connections") or 1) > 1
+            and not params.get("test")
+            and info_dict.get("protocol") in ("http", "https")
+            and not info_dict.get("request_data")
+            and "Range" not in (info_dict.get("http_headers") or {})
+        )
+
+    def real_download(self, filename, info_dict):
+        if not self.can_segment(info_dict, self.params):
+            return super().real_download(filename, info_dict)
+
+        tmpfilename = self.temp_name(filename)
+        headers = HTTPHeaderDict(
+            {"Accept-Encoding": "identity"}, info_dict.get("http_headers"))
+
+        def open_range(range_headers):
+            return self.ydl.urlopen(Request(
+                info_dict["url"], headers={**headers, **range_headers}))
+
+        start = time.time()
+        resumed: list[int] = []
+
+        def progress(downloaded, total):
+            if not resumed:
+                resumed.append(downloaded)
+            now = time.time()
+            speed = self.calc_speed(start, now, downloaded - resumed[0])
+            self._hook_progress({
+                "status": "downloading",
+                "downloaded_bytes": downloaded,
+                "total_bytes": total,
+                "tmpfilename": tmpfilename,
+                "filename": filename,
+                "eta": self.calc_eta(speed, total - downloaded),
+                "speed": speed,
+                "elapsed": now - start,
+                "ctx_id": info_dict.get("ctx_id"),
+            }, info_dict)
+
+        download = SegmentedDownload(
+            open_range,
+            tmpfilename,
+            int(self.params["segment_connections"]),
+            progress,
+            resume=self.params.get("continuedl", True),
+            transient_errors=(OSError, http.client.HTTPException,
+                              TransportError),
+        )
+        self.report_destination(filename)
+        try:
+            size = download.run()
+        except RangeNotSupported as e:
+            self.write_debug(f"Not downloading in segments: {e}")
+            # A preallocated file would look complete to HttpFD
+            for path in (tmpfilename, download.state_filename):
+                if os.path.isfile(path):
+                    os.remove(path)
+            return super().real_download(filename, info_dict)
+
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            "status": "finished",
+            "downloaded_bytes": size,
+            "total_bytes": size,
+            "filename": filename,
+            "elapsed": time.time() - start,
+            "ctx_id": info_dict.get("ctx_id"),
+        }, info_dict)
+        return True
+
+
+class AppYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL using the app's own downloader for plain HTTP(S) formats.
+
+    SegmentedHttpFD is picked for every format yt-dlp would download with
+    HttpFD, as long as ``segment_connections`` is above one.
+
+    With the ``defer_postprocessing`` param, merges, conversions and fixups
+    are not run once the file is downloaded but recorded, to be run later by
+    run_deferred_postprocessing.
+    """
+
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        # (filename, info, files_to_move) of downloads awaiting processing
+        self.deferred_postprocessing: list[tuple[str, dict, dict]] = []
+
+    def post_process(self, filename, info, files_to_move=None):
+        pending = (info.get("__postprocessors")
+                   or self._pps["post_process"] or self._pps["after_move"])
+        if not self.params.get("defer_postprocessing") or not pending:
+            return super().post_process(filename, info, files_to_move)
+        self.deferred_postprocessing.append(
+            (filename, info, files_to_move or {}))
+        info["filepath"] = filename
+        return info
+
+    def run_deferred_postprocessing(self) -> dict | None:
+        """Run the post-processing held back during the download.
+
+        Returns:
+            The info dict of the last processed download, with the final
+            ``filepath``; None if nothing was pending
+        """
+        info = None
+        while self.deferred_postprocessing:
+            filename, pending, files_to_move = (
+                self.deferred_postprocessing.pop(0))
+            info = super().post_process(filename, pending, files_to_move)
+        return info
+
+    # pylint: disable=protected-access
+    def dl(self, name, info, subtitle=False, test=False):
+        if (test or subtitle or name == "-" or not info.get("url")
+                or get_suitable_downloader(info, self.params) is not HttpFD
+                or not SegmentedHttpFD.can_segment(info, self.params)):
+            return super().dl(name, info, subtitle, test)
+
+        fd = SegmentedHttpFD(self, self.params)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        self.write_debug(f'Invoking {fd.FD_NAME} downloader on "{info["url"]}"')
+        new_info = self._copy_infodict(info)
+        if new_info.get("http_headers") is None:
+            new_info["http_headers"] = self._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)